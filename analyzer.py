@@ -1,19 +1,286 @@
-import anthropic
+import asyncio
+import hashlib
 import json
-from typing import Dict, List
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional
 from datetime import datetime
 from collections import Counter
+import threading
+
+from llm_cache import LLMCache
+from prompt_budget import compact_json, estimate_tokens, fit_articles
+from metrics import metrics
+
+# The Anthropic SDK takes over a second to import, so it is imported when an analyzer is created
+if TYPE_CHECKING:
+    import anthropic
+
+# Characters of an article's full text (when scraped) included in theme prompts
+ARTICLE_EXCERPT_CHARS = 600
+
+# Default upper bound on the estimated size of each prompt, in tokens
+DEFAULT_PROMPT_TOKEN_BUDGET = 4000
+
+# Bookkeeping for incremental refreshes and deduplication, not part of the published analysis
+INTERNAL_ANALYSIS_KEYS = ("changed_sections",)
+INTERNAL_SECTION_KEYS = ("fingerprint", "cross_references")
+
+def public_analysis(analysis: Dict) -> Dict:
+    """
+    Copy of an analysis without the fields only the refresher and the web app use.
+    
+    Args:
+        analysis (Dict): Output of analyze_news_data() (or the pipeline)
+        
+    Returns:
+        Dict: The analysis with INTERNAL_ANALYSIS_KEYS and INTERNAL_SECTION_KEYS removed
+    """
+    if not analysis:
+        return analysis
+    public = {key: value for key, value in analysis.items() if key not in INTERNAL_ANALYSIS_KEYS}
+    if "sections" in analysis:
+        public["sections"] = {
+            section: {key: value for key, value in data.items() if key not in INTERNAL_SECTION_KEYS}
+            for section, data in analysis["sections"].items()
+        }
+    return public
+
+class UsageCounter:
+    """Thread-safe tally of Claude calls, tokens and latency per call kind"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, kind: str, input_tokens: int, output_tokens: int, latency: float,
+               estimated_input_tokens: int = 0) -> None:
+        """
+        Record one Claude call.
+        
+        Args:
+            kind (str): Call kind, e.g. "themes", "themes_batched" or "report"
+            input_tokens (int): Prompt tokens billed
+            output_tokens (int): Completion tokens billed
+            latency (float): Wall-clock seconds for the call
+            estimated_input_tokens (int): Prompt tokens estimated when the prompt was built
+        """
+        with self._lock:
+            stats = self._stats.setdefault(kind, Counter())
+            stats["calls"] += 1
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["estimated_input_tokens"] += estimated_input_tokens
+            stats["latency"] += latency
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return a copy of the per-kind totals"""
+        with self._lock:
+            return {kind: dict(stats) for kind, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        """Clear all totals"""
+        with self._lock:
+            self._stats = {}
+
+    def summary(self) -> str:
+        """One line per call kind with calls, billed prompt tokens (and the estimate) and completion tokens"""
+        return "\n".join(
+            f"{kind}: {stats['calls']} call(s), {stats['input_tokens']} prompt tokens "
+            f"(estimated {stats['estimated_input_tokens']}), {stats['output_tokens']} completion tokens"
+            for kind, stats in self.snapshot().items()
+        )
 
 class NewsAnalyzer:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_concurrency: int = 1, max_retries: int = 3,
+                 batch_themes: bool = False, cache: Optional[LLMCache] = None,
+                 prompt_token_budget: Optional[int] = DEFAULT_PROMPT_TOKEN_BUDGET):
         """
         Initialize the NewsAnalyzer with Claude API credentials.
         
         Args:
             api_key (str): Anthropic API key
+            max_concurrency (int): Maximum number of sections analyzed in parallel (1 = serial)
+            max_retries (int): Retries after a rate-limit response before giving up
+            batch_themes (bool): Extract all sections' themes with a single Claude call
+            cache (LLMCache, optional): Response cache consulted before every Claude call
+            prompt_token_budget (int, optional): Estimated tokens each prompt may use; articles
+                and headlines are trimmed to fit (None or 0 = no limit)
         """
-        self.client = anthropic.Client(api_key=api_key)
+        import anthropic
+        # Rate limits are retried by _complete with its own backoff, so the SDK must not retry as well
+        self.client = anthropic.Client(api_key=api_key, max_retries=0)
         self.model = "claude-3-5-sonnet-20241022"
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.batch_themes = batch_themes
+        self.cache = cache
+        self.prompt_token_budget = prompt_token_budget or None
+        self.usage = UsageCounter()
+
+    def _retry_delay(self, error: "anthropic.RateLimitError", attempt: int) -> float:
+        """Seconds to wait after a rate-limit error, honoring the retry-after header"""
+        retry_after = error.response.headers.get("retry-after") if error.response is not None else None
+        try:
+            return float(retry_after)
+        except (TypeError, ValueError):
+            return (2 ** attempt) + random.uniform(0, 1)
+
+    def _record_usage(self, kind: str, response, latency: float, prompt: str) -> None:
+        """Add a response's token usage, the prompt's estimated size and latency to the usage counter"""
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        self.usage.record(kind, input_tokens, output_tokens, latency, estimate_tokens(prompt))
+        metrics.record("claude", latency, kind=kind)
+        metrics.inc("claude_input_tokens_total", input_tokens, kind=kind)
+        metrics.inc("claude_output_tokens_total", output_tokens, kind=kind)
+
+    def _complete(self, prompt: str, max_tokens: int, kind: str = "completion") -> str:
+        """
+        Send a single-turn prompt to Claude and return the text of the reply.
+        
+        Identical requests are answered from the response cache when one is
+        configured. Rate-limit responses are retried with backoff up to
+        max_retries times.
+        
+        Args:
+            prompt (str): User prompt
+            max_tokens (int): Maximum tokens to generate
+            kind (str): Call kind used for usage accounting
+            
+        Returns:
+            str: Response text
+        """
+        import anthropic
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMCache.make_key(self.model, prompt, max_tokens=max_tokens)
+            cached = self.cache.get(cache_key)
+            metrics.inc("llm_cache_requests_total", result="hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                start = time.perf_counter()
+                response = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    messages=[{
+                        "role": "user",
+                        "content": prompt
+                    }]
+                )
+                self._record_usage(kind, response, time.perf_counter() - start, prompt)
+                text = response.content[0].text
+                if cache_key is not None:
+                    self.cache.set(cache_key, text)
+                return text
+            except anthropic.RateLimitError as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"Rate limited by Claude API, retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _stream_complete(self, prompt: str, max_tokens: int, kind: str = "completion") -> Iterator[str]:
+        """
+        Like _complete, but yield the reply as text deltas while Claude generates it.
+        
+        A cached reply is yielded as a single chunk, and the full reply is cached
+        once the stream completes. Rate-limit responses are retried as long as no
+        text has been yielded yet.
+        
+        Args:
+            prompt (str): User prompt
+            max_tokens (int): Maximum tokens to generate
+            kind (str): Call kind used for usage accounting
+            
+        Yields:
+            str: Response text deltas
+        """
+        import anthropic
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMCache.make_key(self.model, prompt, max_tokens=max_tokens)
+            cached = self.cache.get(cache_key)
+            metrics.inc("llm_cache_requests_total", result="hit" if cached is not None else "miss")
+            if cached is not None:
+                yield cached
+                return
+
+        for attempt in range(self.max_retries + 1):
+            parts = []
+            try:
+                start = time.perf_counter()
+                with self.client.messages.stream(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    messages=[{
+                        "role": "user",
+                        "content": prompt
+                    }]
+                ) as stream:
+                    for text in stream.text_stream:
+                        parts.append(text)
+                        yield text
+                    message = stream.get_final_message()
+                self._record_usage(kind, message, time.perf_counter() - start, prompt)
+                if cache_key is not None:
+                    self.cache.set(cache_key, "".join(parts))
+                return
+            except anthropic.RateLimitError as e:
+                if attempt == self.max_retries or parts:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"Rate limited by Claude API, retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _articles_budget(self, overhead: str) -> Optional[int]:
+        """Tokens left for articles next to a prompt's fixed text (None = no limit)"""
+        if self.prompt_token_budget is None:
+            return None
+        return max(0, self.prompt_token_budget - estimate_tokens(overhead))
+
+    def _fit_articles(self, articles: List[Dict], render, budget: Optional[int], label: str) -> List[tuple]:
+        """
+        Trim articles to a token budget, logging what was dropped.
+        
+        Returns:
+            List[tuple]: (article, with_excerpt) pairs, see prompt_budget.fit_articles
+        """
+        chosen, excerpts_dropped, articles_dropped = fit_articles(articles, render, budget)
+        if excerpts_dropped or articles_dropped:
+            print(f"Trimmed {label} to {budget} tokens: "
+                  f"dropped {excerpts_dropped} excerpt(s) and {articles_dropped} article(s)")
+        return chosen
+
+    @staticmethod
+    def _render_article(article: Dict, with_excerpt: bool) -> str:
+        """Prompt text for one article in a theme-extraction prompt"""
+        return (
+            f"Title: {article.get('title', '')}\n"
+            f"Abstract: {article.get('abstract', '')}\n"
+            + (f"Excerpt: {article['text'][:ARTICLE_EXCERPT_CHARS]}\n" if with_excerpt else "")
+        )
+
+    def _build_themes_prompt(self, articles: List[Dict]) -> str:
+        """Build the theme-extraction prompt for a list of articles, trimmed to the token budget"""
+        template = """Analyze these news articles and identify 3-4 key one-word themes. First describe each item in bullet points succinctly, then focus on major trends and patterns:
+
+{articles_text}
+
+Please provide the themes in a bullet-point format."""
+        chosen = self._fit_articles(articles, self._render_article, self._articles_budget(template), "theme prompt")
+        articles_text = "\n".join(self._render_article(article, with_excerpt) for article, with_excerpt in chosen)
+        return template.format(articles_text=articles_text)
+
+    def _parse_themes(self, text: str) -> List[str]:
+        """Split Claude's bullet-point reply into a list of themes"""
+        themes = text.split("\n")
+        return [theme.strip("• ").strip() for theme in themes if theme.strip()]
 
     def _extract_key_themes(self, articles: List[Dict]) -> List[str]:
         """
@@ -25,39 +292,200 @@ class NewsAnalyzer:
         Returns:
             List[str]: Extracted themes
         """
-        # Prepare prompt for Claude
-        articles_text = "\n".join([
-            f"Title: {article.get('title', '')}\n"
-            f"Abstract: {article.get('abstract', '')}\n"
-            for article in articles
-        ])
+        text = self._complete(self._build_themes_prompt(articles), max_tokens=300, kind="themes")
+        return self._parse_themes(text)
 
-        prompt = f"""Analyze these news articles and identify 3-4 key one-word themes. First describe each item in bullet points succinctly, then focus on major trends and patterns:
+    @staticmethod
+    def _article_payload(article: Dict, with_excerpt: bool) -> Dict:
+        """JSON object for one article in the batched themes prompt"""
+        return {
+            "title": article.get("title", ""),
+            "abstract": article.get("abstract", ""),
+            **({"excerpt": article["text"][:ARTICLE_EXCERPT_CHARS]} if with_excerpt else {})
+        }
+
+    def _build_batched_themes_prompt(self, sections: List[tuple]) -> str:
+        """Build one theme-extraction prompt covering every section, trimmed to the token budget shared across sections"""
+        header = """Analyze these news articles, grouped by section, and identify 3-4 key one-word themes for each section, focusing on major trends and patterns.
 
-        {articles_text}
+Respond with only a JSON object mapping each section name to a list of its themes, for example {"world": ["Conflict", "Diplomacy", "Elections"]}.
+
+"""
+        render = lambda article, with_excerpt: compact_json(self._article_payload(article, with_excerpt))
+        remaining = self._articles_budget(header)
+        chosen = {}
+        # Smallest sections first, so budget they leave unused goes to the larger ones
+        by_size = sorted(sections, key=lambda item: sum(estimate_tokens(render(a, bool(a.get("text")))) for a in item[1]))
+        for index, (section, articles) in enumerate(by_size):
+            budget = remaining // (len(by_size) - index) if remaining is not None else None
+            chosen[section] = self._fit_articles(articles, render, budget, f"{section} in the batched theme prompt")
+            if remaining is not None:
+                remaining -= sum(estimate_tokens(render(article, with_excerpt)) for article, with_excerpt in chosen[section])
+        payload = {
+            section: [self._article_payload(article, with_excerpt) for article, with_excerpt in chosen[section]]
+            for section, _ in sections
+        }
 
-        Please provide the themes in a bullet-point format."""
+        return header + compact_json(payload)
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=300,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
+    def _parse_batched_themes(self, text: str, section_names: List[str]) -> Dict[str, List[str]]:
+        """
+        Parse and validate a batched themes reply.
+        
+        Args:
+            text (str): Claude's reply
+            section_names (List[str]): Sections that were requested
+            
+        Returns:
+            Dict[str, List[str]]: Themes for every section that parsed correctly;
+                sections that are missing or malformed are left out
+        """
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+
+        parsed = {}
+        for section in section_names:
+            themes = data.get(section)
+            if not isinstance(themes, list):
+                continue
+            themes = [theme.strip() for theme in themes if isinstance(theme, str) and theme.strip()]
+            if themes:
+                parsed[section] = themes
+        return parsed
+
+    def _extract_themes_per_section(self, sections: List[tuple]) -> List[List[str]]:
+        """Extract themes with one Claude call per section, in parallel up to max_concurrency"""
+        if self.max_concurrency > 1 and len(sections) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(sections))) as executor:
+                return list(executor.map(lambda item: self._extract_key_themes(item[1]), sections))
+        return [self._extract_key_themes(articles) for _, articles in sections]
+
+    def _extract_themes_batched(self, sections: List[tuple]) -> List[List[str]]:
+        """
+        Extract every section's themes with a single Claude call.
+        
+        Sections whose themes are missing or malformed in the reply fall back
+        to the per-section path.
+        
+        Args:
+            sections (List[tuple]): (section, articles) pairs
+            
+        Returns:
+            List[List[str]]: Themes in the same order as sections
+        """
+        import anthropic
+        section_names = [section for section, _ in sections]
+        try:
+            text = self._complete(
+                self._build_batched_themes_prompt(sections),
+                max_tokens=100 + 60 * len(sections),
+                kind="themes_batched"
+            )
+            parsed = self._parse_batched_themes(text, section_names)
+        except anthropic.APIError as e:
+            print(f"Batched theme extraction failed, falling back to per-section calls: {e}")
+            parsed = {}
+
+        missing = [(section, articles) for section, articles in sections if section not in parsed]
+        if missing:
+            print(f"Re-analyzing {len(missing)} section(s) individually: {', '.join(s for s, _ in missing)}")
+            for (section, _), themes in zip(missing, self._extract_themes_per_section(missing)):
+                parsed[section] = themes
+
+        return [parsed[section] for section in section_names]
+
+    def analyze_section(self, articles: List[Dict]) -> Dict:
+        """
+        Analyze a single section's articles.
+        
+        Args:
+            articles (List[Dict]): Articles of one section
+            
+        Returns:
+            Dict: Section analysis (same shape as analysis["sections"][section])
+        """
+        return self._build_section_analysis(articles, self._extract_key_themes(articles))
+
+    def _fingerprint_section(self, articles: List[Dict]) -> str:
+        """Hash of a section's article URLs, publish dates and cross-references, used to detect changes"""
+        items = sorted(
+            f"{article.get('url', '')}|{article.get('published_date', '')}"
+            + (f"|{','.join(article['also_in'])}" if article.get('also_in') else "")
+            for article in articles
         )
+        return hashlib.sha256("\n".join(items).encode("utf-8")).hexdigest()
 
-        # Extract themes from Claude's response
-        themes = response.content[0].text.split("\n")
-        return [theme.strip("• ").strip() for theme in themes if theme.strip()]
+    def _reusable_section(self, previous_analysis: Optional[Dict], section: str,
+                          articles: List[Dict]) -> Optional[Dict]:
+        """
+        Return the previous analysis of a section if its article set is unchanged.
+        
+        Args:
+            previous_analysis (Dict, optional): Earlier output of analyze_news_data()
+            section (str): Section name
+            articles (List[Dict]): The section's current articles
+            
+        Returns:
+            Dict: The previous section analysis, or None if it must be recomputed
+        """
+        if not previous_analysis:
+            return None
+        previous = previous_analysis.get("sections", {}).get(section)
+        if previous and previous.get("fingerprint") == self._fingerprint_section(articles):
+            return previous
+        return None
+
+    def _mark_changed_sections(self, analysis: Dict, previous_analysis: Optional[Dict]) -> None:
+        """Record in analysis["changed_sections"] which sections' themes differ from the previous analysis"""
+        previous_sections = (previous_analysis or {}).get("sections", {})
+        current_sections = analysis["sections"]
+        analysis["changed_sections"] = [
+            section for section in list(current_sections) + [s for s in previous_sections if s not in current_sections]
+            if section not in previous_sections or section not in current_sections
+            or previous_sections[section].get("key_themes") != current_sections[section].get("key_themes")
+        ]
 
-    def analyze_news_data(self, news_data: Dict[str, List[Dict]]) -> Dict:
+    def _build_section_analysis(self, articles: List[Dict], themes: List[str]) -> Dict:
+        """Assemble the analysis entry for one section"""
+        return {
+            "fingerprint": self._fingerprint_section(articles),
+            "article_count": len(articles),
+            "recent_headlines": [
+                article["title"] for article in articles
+            ],
+            # Stories also listed under other sections (kept here only after deduplication)
+            "cross_references": [
+                {"title": article["title"], "also_in": article["also_in"]}
+                for article in articles if article.get("also_in")
+            ],
+            "key_themes": themes,
+            "date_range": {
+                "start": min(article["published_date"] for article in articles if article.get("published_date")),
+                "end": max(article["published_date"] for article in articles if article.get("published_date"))
+            }
+        }
+
+    def analyze_news_data(self, news_data: Dict[str, List[Dict]],
+                          previous_analysis: Optional[Dict] = None,
+                          sections: Optional[List[str]] = None) -> Dict:
         """
         Analyze news data and generate insights using Claude API.
 
+        When a previous analysis is given, sections whose article URLs and publish
+        dates are unchanged are carried forward without calling Claude.
+
         Args:
             news_data (Dict[str, List[Dict]]): Dictionary with sections as keys and lists of articles as values
                 Each article should have 'title', 'abstract', 'published_date', and 'url' fields
+            previous_analysis (Dict, optional): Earlier output of analyze_news_data() to update incrementally
+            sections (List[str], optional): Sections to analyze, in this order (default: every section of news_data)
 
         Returns:
             Dict: Analysis results including:
@@ -65,32 +493,35 @@ class NewsAnalyzer:
                 - Key themes per section
                 - Recent headlines
                 - Timeline analysis
+                - Sections whose themes changed since previous_analysis ("changed_sections")
         """
         analysis = {
             "timestamp": datetime.now().isoformat(),
             "sections": {}
         }
 
-        for section, articles in news_data.items():
-            if not articles:
-                continue
+        sections = [(section, news_data[section]) for section in (sections or news_data) if news_data.get(section)]
+        reused = {section: self._reusable_section(previous_analysis, section, articles) for section, articles in sections}
+        stale = [(section, articles) for section, articles in sections if reused[section] is None]
 
-            # Basic statistics
-            section_analysis = {
-                "article_count": len(articles),
-                "recent_headlines": [
-                    article["title"] for article in articles
-                ],
-                "key_themes": self._extract_key_themes(articles),
-                "date_range": {
-                    "start": min(article["published_date"] for article in articles if article.get("published_date")),
-                    "end": max(article["published_date"] for article in articles if article.get("published_date"))
-                }
-            }
+        # Theme extraction is either one request for everything or one independent request per section
+        if self.batch_themes and len(stale) > 1:
+            stale_themes = self._extract_themes_batched(stale)
+        else:
+            stale_themes = self._extract_themes_per_section(stale)
+        new_themes = {section: themes for (section, _), themes in zip(stale, stale_themes)}
+
+        for section, articles in sections:
+            if reused[section] is not None:
+                section_analysis = reused[section]
+            else:
+                # Basic statistics and themes
+                section_analysis = self._build_section_analysis(articles, new_themes[section])
 
             # Add to main analysis
             analysis["sections"][section] = section_analysis
 
+        self._mark_changed_sections(analysis, previous_analysis)
         return analysis
 
     def generate_summary_report(self, analysis: Dict) -> str:
@@ -106,25 +537,115 @@ class NewsAnalyzer:
         Returns:
             str: Formatted summary report
         """
-        prompt = f"""Based on this news analysis data, create a concise summary report highlighting the most important insights:
+        return self._complete(self._build_report_prompt(analysis), max_tokens=1000, kind="report")
+
+    def generate_summary_report_stream(self, analysis: Dict) -> Iterator[str]:
+        """
+        Streaming variant of generate_summary_report.
+        
+        Args:
+            analysis (Dict): Analysis output from analyze_news_data()
+            
+        Yields:
+            str: Report text deltas; joined they equal generate_summary_report's result
+        """
+        yield from self._stream_complete(self._build_report_prompt(analysis), max_tokens=1000, kind="report")
+
+    def _build_report_prompt(self, analysis: Dict) -> str:
+        """
+        Build the summary report prompt for an analysis.
+        
+        The data is compact JSON without empty fields. If it does not fit in the
+        token budget, fewer headlines per section are included (at least one).
+        """
+        # Only the content goes into the prompt; the timestamp would also make identical analyses uncacheable
+        sections = {
+            section: {key: value for key, value in data.items() if key != "fingerprint" and value not in ([], {}, None)}
+            for section, data in analysis.get("sections", {}).items()
+        }
+        template = """Based on this news analysis data, create a concise summary report highlighting the most important insights:
+
+{report_data}
 
-        {json.dumps(analysis, indent=2)}
+Format the report with sections for:
+1. Overall Coverage Summary
+2. Key Themes by Section
+3. Notable Recent Headlines
+4. Your expert reflection of the current world conditions based on today's news.
+5. Hidden trendes and opportunties for companies.
+"""
+        limit = max((len(data.get("recent_headlines", [])) for data in sections.values()), default=0)
+        full = limit
+        while True:
+            report_data = {"sections": {
+                section: {**data, "recent_headlines": data["recent_headlines"][:limit]} if "recent_headlines" in data else data
+                for section, data in sections.items()
+            }}
+            prompt = template.format(report_data=compact_json(report_data))
+            if self.prompt_token_budget is None or limit <= 1 or estimate_tokens(prompt) <= self.prompt_token_budget:
+                break
+            limit -= 1
+        if limit < full:
+            print(f"Trimmed report prompt to {self.prompt_token_budget} prompt tokens: at most {limit} headline(s) per section")
+        return prompt
 
-        Format the report with sections for:
-        1. Overall Coverage Summary
-        2. Key Themes by Section
-        3. Notable Recent Headlines
-        4. Your expert reflection of the current world conditions based on today's news.
-        5. Hidden trendes and opportunties for companies.
+
+class AsyncNewsAnalyzer:
+    def __init__(self, analyzer: NewsAnalyzer):
+        """
+        Initialize the AsyncNewsAnalyzer, an asyncio front end to a NewsAnalyzer.
+        
+        Claude calls go through the wrapped analyzer on worker threads, so
+        several sections can be in flight from one event loop.
+        
+        Args:
+            analyzer (NewsAnalyzer): Analyzer doing the work; its max_concurrency
+                bounds the Claude requests in flight
         """
+        self.analyzer = analyzer
+        self._semaphore = None
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=1000,
-            messages=[{
-                "role": "user",
-                "content": prompt
-            }]
-        )
+    def _limit(self) -> asyncio.Semaphore:
+        """Semaphore bounding the Claude requests in flight to max_concurrency"""
+        # Created lazily so the semaphore belongs to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.analyzer.max_concurrency)
+        return self._semaphore
+
+    async def analyze_section(self, articles: List[Dict]) -> Dict:
+        """Async version of NewsAnalyzer.analyze_section"""
+        async with self._limit():
+            return await asyncio.to_thread(self.analyzer.analyze_section, articles)
+
+    async def analyze_news_data(self, news_data: Dict[str, List[Dict]],
+                                previous_analysis: Optional[Dict] = None,
+                                sections: Optional[List[str]] = None) -> Dict:
+        """Async version of NewsAnalyzer.analyze_news_data"""
+        return await asyncio.to_thread(self.analyzer.analyze_news_data, news_data, previous_analysis, sections)
+
+    async def generate_summary_report(self, analysis: Dict) -> str:
+        """Async version of NewsAnalyzer.generate_summary_report"""
+        async with self._limit():
+            return await asyncio.to_thread(self.analyzer.generate_summary_report, analysis)
+
+    async def generate_summary_report_stream(self, analysis: Dict) -> AsyncIterator[str]:
+        """Async version of NewsAnalyzer.generate_summary_report_stream"""
+        async with self._limit():
+            deltas = self.analyzer.generate_summary_report_stream(analysis)
+            # A cancelled consumer can leave next() running on its worker thread; the lock
+            # makes close() wait for it instead of failing with "generator already executing"
+            lock = threading.Lock()
+
+            def step():
+                with lock:
+                    return next(deltas, None)
+
+            def close():
+                with lock:
+                    deltas.close()
 
-        return response.content[0].text
\ No newline at end of file
+            try:
+                while (text := await asyncio.to_thread(step)) is not None:
+                    yield text
+            finally:
+                await asyncio.to_thread(close)
@@ -1,12 +1,23 @@
-from flask import Flask, render_template, jsonify, request, session
-from scraper import get_all_articles
-from analyzer import NewsAnalyzer
-from voice_agent import VoiceAgent
+from flask import Flask, render_template, jsonify, request, session, Response, send_file, g
+from pipeline import run_pipeline
+from analyzer import public_analysis
+from scraper import ArticleEnricher, NYT_SECTIONS, section_label
+from article_store import ArticleStore
+from refresher import NewsRefresher
+from sections import SectionDemand
+from cache_backend import create_backend
+from warmup import AudioWarmer
+from report_stream import ReportBroadcast, sse_event
+from metrics import metrics, start_trace, finish_trace
+from llm_cache import LLMCache
+from audio_cache import AudioCache
+from voice_agent import VoiceAgent, voice_registry
+import itertools
 import os
+import threading
 from dotenv import load_dotenv
 import json
-import tempfile
-from elevenlabs import save
+import time
 import base64
 import traceback
 
@@ -25,73 +36,364 @@ VOICE_NAME = os.getenv('VOICE_NAME')
 VOICE_STABILITY = float(os.getenv('VOICE_STABILITY', '0.71'))
 VOICE_CLARITY = float(os.getenv('VOICE_CLARITY', '0.75'))
 VOICE_STYLE = float(os.getenv('VOICE_STYLE', '0.6'))
+NYT_FETCH_WORKERS = int(os.getenv('NYT_FETCH_WORKERS', '5'))
+NYT_TIMEOUT = float(os.getenv('NYT_TIMEOUT', '10'))
+CLAUDE_MAX_CONCURRENCY = int(os.getenv('CLAUDE_MAX_CONCURRENCY', '5'))
+CLAUDE_BATCH_THEMES = os.getenv('CLAUDE_BATCH_THEMES', 'false').lower() == 'true'
+NEWS_DEDUPE = os.getenv('NEWS_DEDUPE', 'true').lower() == 'true'
+CLAUDE_PROMPT_TOKEN_BUDGET = int(os.getenv('CLAUDE_PROMPT_TOKEN_BUDGET', '4000'))
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', '.cache/llm_cache.sqlite')
+LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', '86400'))
+LLM_CACHE_MAX_MB = float(os.getenv('LLM_CACHE_MAX_MB', '50'))
+AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', '.cache/audio')
+AUDIO_CACHE_MAX_MB = float(os.getenv('AUDIO_CACHE_MAX_MB', '200'))
+TTS_MAX_WORKERS = int(os.getenv('TTS_MAX_WORKERS', '4'))
+VOICE_REFRESH_INTERVAL = float(os.getenv('VOICE_REFRESH_INTERVAL', '3600'))
+NEWS_REFRESH_INTERVAL = float(os.getenv('NEWS_REFRESH_INTERVAL', '900'))
+ARTICLE_FULL_TEXT = os.getenv('ARTICLE_FULL_TEXT', 'false').lower() == 'true'
+ARTICLE_SCRAPE_WORKERS = int(os.getenv('ARTICLE_SCRAPE_WORKERS', '8'))
+ARTICLE_SCRAPE_PER_DOMAIN = int(os.getenv('ARTICLE_SCRAPE_PER_DOMAIN', '2'))
+ARTICLE_SCRAPE_TIMEOUT = float(os.getenv('ARTICLE_SCRAPE_TIMEOUT', '10'))
+ARTICLE_SCRAPE_DEADLINE = float(os.getenv('ARTICLE_SCRAPE_DEADLINE', '60'))
+ARTICLE_STORE_PATH = os.getenv('ARTICLE_STORE_PATH', '.cache/articles.sqlite')
+ARTICLE_STORE_MAX_AGE = float(os.getenv('ARTICLE_STORE_MAX_AGE', '86400'))
+CACHE_BACKEND_URL = os.getenv('CACHE_BACKEND_URL', 'sqlite:///.cache/shared_cache.sqlite')
+CACHE_BACKEND_AUDIO = os.getenv('CACHE_BACKEND_AUDIO', 'false').lower() == 'true'
+AUDIO_WARMUP_VARIANTS = int(os.getenv('AUDIO_WARMUP_VARIANTS', '3'))
+AUDIO_WARMUP_REPORT = os.getenv('AUDIO_WARMUP_REPORT', 'true').lower() == 'true'
+NEWS_SECTION_TTL = float(os.getenv('NEWS_SECTION_TTL', '86400'))
+METRICS_SPAN_LOG = os.getenv('METRICS_SPAN_LOG', 'true').lower() == 'true'
 
 # Default selected sections
 DEFAULT_SECTIONS = ['world', 'business', 'technology', 'science', 'health']
 
-# Cache for analysis results
-news_cache = {
-    'analysis': None,
-    'report': None,
-    'last_updated': None
-}
+# Sections listeners can choose from (any NYT Top Stories section); only selected ones are refreshed
+AVAILABLE_SECTIONS = [
+    s.strip().lower() for s in
+    os.getenv('NEWS_SECTIONS', 'world,business,technology,science,health,us,politics,arts,sports').split(',')
+    if s.strip()
+]
+# Reject misspelled sections at startup, as main.py does for --sections
+UNKNOWN_SECTIONS = [s for s in AVAILABLE_SECTIONS if s not in NYT_SECTIONS]
+if UNKNOWN_SECTIONS or not AVAILABLE_SECTIONS:
+    raise ValueError(f"NEWS_SECTIONS: unknown section(s) {', '.join(UNKNOWN_SECTIONS)}; "
+                     f"choose from {', '.join(NYT_SECTIONS)}")
 
-def generate_audio_file(text, voice_agent):
-    """Generate audio file from text using ElevenLabs"""
-    try:
-        # Use the voice settings from the agent
-        voice_settings = {
-            "stability": voice_agent.stability,
-            "similarity_boost": voice_agent.clarity,
-            "style": voice_agent.style,
-            "use_speaker_boost": True
-        }
+# Report text of the refresh in progress, streamed to /report_stream readers
+report_broadcast = ReportBroadcast()
+
+class AppServices:
+    """
+    This process's caches, shared stores and background workers.
+    
+    Created by get_services() on first use rather than at import, so importing
+    the app (test collection, benchmarks) opens no cache files.
+    """
+    
+    def __init__(self):
+        # Persistent Claude response cache shared by all workers on this host (disabled if LLM_CACHE_PATH is empty)
+        self.llm_cache = LLMCache(
+            LLM_CACHE_PATH,
+            ttl=LLM_CACHE_TTL,
+            max_bytes=int(LLM_CACHE_MAX_MB * 1024 * 1024)
+        ) if LLM_CACHE_PATH else None
         
-        # Create a temporary file to save the audio
-        with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as temp_file:
-            audio_path = temp_file.name
+        # Store shared by all workers for the news snapshot (and optionally audio);
+        # without one every worker refreshes and keeps its own copy
+        self.cache_backend = create_backend(CACHE_BACKEND_URL) if CACHE_BACKEND_URL else None
         
-        print(f"Generating audio for text of length {len(text)}...")
+        # On-disk cache of synthesized speech (disabled if AUDIO_CACHE_DIR is empty)
+        self.audio_cache = AudioCache(
+            AUDIO_CACHE_DIR,
+            max_bytes=int(AUDIO_CACHE_MAX_MB * 1024 * 1024),
+            backend=self.cache_backend if CACHE_BACKEND_AUDIO else None
+        ) if AUDIO_CACHE_DIR else None
         
-        # Generate audio
-        audio = voice_agent.generate_audio(text)
+        # Downloaded feeds and parsed articles, for conditional requests (disabled if ARTICLE_STORE_PATH is empty)
+        self.article_store = ArticleStore(ARTICLE_STORE_PATH) if ARTICLE_STORE_PATH else None
         
-        if not audio:
-            print("Failed to generate audio: received None from voice_agent.generate_audio")
-            return None
-            
-        print(f"Audio generated, saving to {audio_path}...")
+        # Full-text article downloads for analysis (disabled unless ARTICLE_FULL_TEXT is true)
+        self.article_enricher = ArticleEnricher(
+            max_workers=ARTICLE_SCRAPE_WORKERS,
+            per_domain=ARTICLE_SCRAPE_PER_DOMAIN,
+            timeout=ARTICLE_SCRAPE_TIMEOUT,
+            store=self.article_store,
+            max_age=ARTICLE_STORE_MAX_AGE
+        ) if ARTICLE_FULL_TEXT else None
         
-        # Save audio to file
-        save(audio, audio_path)
+        # Sections listeners selected recently (shared by all workers); refreshes cover only these
+        self.section_demand = SectionDemand(AVAILABLE_SECTIONS, DEFAULT_SECTIONS, ttl=NEWS_SECTION_TTL,
+                                            backend=self.cache_backend)
         
-        print(f"Audio saved successfully ({os.path.getsize(audio_path)} bytes)")
-        return audio_path
+        # Pre-renders popular headline selections (counted by all workers) and the report after each refresh
+        self.audio_warmer = AudioWarmer(
+            get_voice_agent,
+            headline_segments,
+            report_script,
+            max_variants=AUDIO_WARMUP_VARIANTS,
+            warm_report=AUDIO_WARMUP_REPORT,
+            max_workers=TTS_MAX_WORKERS,
+            default_selection=DEFAULT_SECTIONS,
+            backend=self.cache_backend,
+            ttl=NEWS_SECTION_TTL
+        )
+        warm_audio = (ELEVEN_API_KEY and self.audio_cache is not None
+                      and (AUDIO_WARMUP_VARIANTS > 0 or AUDIO_WARMUP_REPORT))
         
+        # Cache for analysis results, refreshed in the background every NEWS_REFRESH_INTERVAL seconds
+        # and shared with the other workers through cache_backend
+        self.news_refresher = NewsRefresher(
+            refresh_news,
+            interval=NEWS_REFRESH_INTERVAL,
+            backend=self.cache_backend,
+            on_refresh=self.audio_warmer.schedule if warm_audio else None
+        )
+
+_services = None
+_services_lock = threading.Lock()
+
+def get_services():
+    """Get this process's AppServices, creating them on first use"""
+    global _services
+    with _services_lock:
+        if _services is None:
+            _services = AppServices()
+        return _services
+
+def refresh_news(previous):
+    """
+    Run the fetch/analyze/report pipeline for the sections listeners selected,
+    re-analyzing only sections that changed since previous
+    """
+    services = get_services()
+    sections = services.section_demand.active()
+    print(f"Refreshing sections: {', '.join(sections)}")
+    report_broadcast.start()
+    try:
+        with metrics.timer('refresh'):
+            news_data, analysis, report = run_pipeline(
+                NYT_API_KEY,
+                CLAUDE_API_KEY,
+                max_fetch_workers=NYT_FETCH_WORKERS,
+                timeout=NYT_TIMEOUT,
+                max_claude_concurrency=CLAUDE_MAX_CONCURRENCY,
+                batch_themes=CLAUDE_BATCH_THEMES,
+                cache=services.llm_cache,
+                dedupe=NEWS_DEDUPE,
+                prompt_token_budget=CLAUDE_PROMPT_TOKEN_BUDGET,
+                sections=sections,
+                previous_analysis=previous['analysis'],
+                previous_report=previous['report'],
+                on_report_delta=report_broadcast.append,
+                enricher=services.article_enricher,
+                enrich_deadline=ARTICLE_SCRAPE_DEADLINE,
+                store=services.article_store
+            )
     except Exception as e:
-        print(f"Error generating audio: {e}")
-        traceback.print_exc()
-        return None
+        report_broadcast.finish(error=str(e))
+        raise
+    report_broadcast.finish()
+    
+    from datetime import datetime
+    return {
+        'analysis': analysis,
+        'report': report,
+        'sections': sections,
+        'last_updated': datetime.now().isoformat()
+    }
+
+# Voice list is fetched once per process and refreshed periodically
+voice_registry.refresh_interval = VOICE_REFRESH_INTERVAL
+
+# Long-lived voice agent shared by all requests in this process
+_voice_agent = None
+_voice_agent_lock = threading.Lock()
+
+def get_voice_agent():
+    """
+    Get the process-wide VoiceAgent, creating it on first use.
+    
+    The agent is shared between requests, so per-listener details such as the
+    user name are passed to its methods instead of being set on it.
+    """
+    global _voice_agent
+    with _voice_agent_lock:
+        if _voice_agent is None:
+            _voice_agent = VoiceAgent(
+                api_key=ELEVEN_API_KEY,
+                voice_id=ELEVEN_VOICE_ID,
+                voice_name=VOICE_NAME,
+                stability=VOICE_STABILITY,
+                clarity=VOICE_CLARITY,
+                style=VOICE_STYLE,
+                audio_cache=get_services().audio_cache,
+                init_audio=False
+            )
+        return _voice_agent
+
+def headline_entries(analysis, selected_sections):
+    """
+    Pick the first few headlines of each selected section.
+    
+    A story kept under an unselected section but also listed in a selected one
+    (see dedup.dedupe_sections) is listed under the selected section.
+    
+    Returns:
+        list: (section, headline) pairs in reading order
+    """
+    entries = []
+    
+    # Cross-referenced stories whose canonical section was not selected
+    borrowed = {}
+    for section, data in analysis['sections'].items():
+        if section.lower() in selected_sections or not data:
+            continue
+        for reference in data.get('cross_references', []):
+            target = next((s for s in reference['also_in'] if s.lower() in selected_sections), None)
+            if target:
+                borrowed.setdefault(target, []).append(reference['title'])
+    
+    for section in dict.fromkeys([*analysis['sections'], *borrowed]):
+        data = analysis['sections'].get(section)
+        # Skip sections not selected by the user
+        if section.lower() not in selected_sections:
+            print(f"Skipping section {section}: not selected by user")
+            continue
+            
+        if section not in borrowed and (not data or 'recent_headlines' not in data):
+            print(f"Skipping section {section}: missing data")
+            continue
+            
+        # Filter out empty headlines
+        headlines = [h for h in (data or {}).get('recent_headlines', []) + borrowed.get(section, []) if h and h.strip()]
+        
+        if not headlines:
+            print(f"Skipping section {section}: no valid headlines")
+            continue
+            
+        # Take only the first few headlines from each section
+        entries.extend((section, headline) for headline in headlines[:3])
+    
+    return entries
+
+def select_headlines(analysis, selected_sections):
+    """
+    Headlines to read for a selection, see headline_entries.
+    
+    Returns:
+        tuple: (headlines, section names), one section name per headline
+    """
+    entries = headline_entries(analysis, selected_sections)
+    return [headline for _, headline in entries], [section_label(section) for section, _ in entries]
+
+REPORT_INTRO = "Here's your in-depth news analysis and summary:"
+
+def report_script(report):
+    """Script read for the full report"""
+    return f"{REPORT_INTRO}\n\n{report}"
+
+def live_report_text():
+    """
+    Report text as the refresh in progress generates it.
+    
+    Falls back to the finished report when the text was generated elsewhere,
+    e.g. by another worker sharing the cache backend.
+    """
+    services = get_services()
+    received = False
+    for text in report_broadcast.follow(pending=lambda: services.news_refresher.refreshing):
+        if text:
+            received = True
+            yield text
+    # The report text ends before the refresh publishes its snapshot
+    services.news_refresher.wait()
+    if not received and services.news_refresher.snapshot['report']:
+        yield services.news_refresher.snapshot['report']
+
+def headline_segments(analysis, selected_sections):
+    """Headline segments shared by every listener with this selection (all but the greeting)"""
+    all_headlines, all_sections = select_headlines(analysis, selected_sections)
+    if not all_headlines:
+        return []
+    return get_voice_agent().build_headline_segments(
+        all_headlines, all_sections, [section_label(s) for s in selected_sections]
+    )[1:]
+
+@app.before_request
+def begin_request_trace():
+    """Start collecting this request's spans"""
+    g.trace_token = start_trace(request.path)
+
+@app.after_request
+def end_request_trace(response):
+    """Record the request's duration and log its spans"""
+    token = g.pop('trace_token', None)
+    if token is None:
+        return response
+    trace = finish_trace(token)
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    metrics.observe('http_request_seconds', time.perf_counter() - trace.start, route=route, status=response.status_code)
+    if METRICS_SPAN_LOG and route != '/metrics':
+        print(f"Request spans: {json.dumps(trace.to_dict())}")
+    return response
+
+@app.before_request
+def start_background_refresh():
+    """Start the refresh scheduler in this worker process (no-op once running)"""
+    get_services().news_refresher.start()
+
+def user_sections():
+    """The session's selected sections (lowercase), recorded as demand for the next refreshes"""
+    return get_services().section_demand.record(session.get('selected_sections', DEFAULT_SECTIONS))
+
+def missing_sections(news_cache, sections):
+    """Sections the snapshot was not built for"""
+    covered = news_cache.get('sections') or list(news_cache['analysis']['sections'])
+    return [section for section in sections if section not in covered]
+
+def load_news(sections=None):
+    """
+    Current analysis snapshot, waiting for the first refresh if there is none yet.
+    
+    If the snapshot does not cover every section in sections, a refresh that
+    includes them is run first; unchanged sections are carried over from the
+    current snapshot, so only the new sections cost NYT and Claude calls.
+    """
+    services = get_services()
+    news_cache = services.news_refresher.snapshot
+    if not news_cache['analysis']:
+        print("No news data in cache, fetching...")
+        news_cache = services.news_refresher.refresh()
+    # A second attempt covers a refresh that was already running (or adopted
+    # from another worker) before these sections were requested
+    for _ in range(2):
+        missing = missing_sections(news_cache, sections or [])
+        if not missing:
+            break
+        print(f"Fetching newly selected sections: {', '.join(missing)}")
+        news_cache = services.news_refresher.refresh()
+    return news_cache
 
 @app.route('/')
 def index():
     """Render the main page"""
     user_name = session.get('user_name', '')
     selected_sections = session.get('selected_sections', DEFAULT_SECTIONS)
-    return render_template('index.html', user_name=user_name, selected_sections=selected_sections)
+    available_sections = [(section, section_label(section)) for section in AVAILABLE_SECTIONS]
+    return render_template('index.html', user_name=user_name, selected_sections=selected_sections,
+                           available_sections=available_sections)
 
 @app.route('/update_preferences', methods=['POST'])
 def update_preferences():
     """Update user preferences"""
+    services = get_services()
     data = request.form
     
     # Save user name
     session['user_name'] = data.get('user_name', '')
     
-    # Save selected sections
-    selected_sections = data.getlist('sections')
-    if not selected_sections:  # Make sure at least one section is selected
-        selected_sections = DEFAULT_SECTIONS
+    # Save selected sections (unknown ones are dropped; at least one must remain)
+    selected_sections = services.section_demand.record(data.getlist('sections'))
     session['selected_sections'] = selected_sections
     
     print(f"Updated preferences: user_name={session['user_name']}, sections={selected_sections}")
@@ -101,53 +403,79 @@ def update_preferences():
 @app.route('/get_news')
 def get_news():
     """Get news data and analysis"""
-    global news_cache
-    
-    # Check if we need to refresh the cache
+    services = get_services()
+    # refresh=true revalidates in the background; the current copy is returned right away
     refresh = request.args.get('refresh', 'false').lower() == 'true'
     
-    if refresh or not news_cache['analysis']:
-        try:
-            # Fetch and analyze news
-            news_data = get_all_articles(NYT_API_KEY)
-            analyzer = NewsAnalyzer(api_key=CLAUDE_API_KEY)
-            analysis = analyzer.analyze_news_data(news_data)
-            report = analyzer.generate_summary_report(analysis)
-            
-            # Update cache
-            from datetime import datetime
-            news_cache = {
-                'analysis': analysis,
-                'report': report,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            return jsonify({
-                'status': 'success',
-                'analysis': analysis,
-                'report': report,
-                'last_updated': news_cache['last_updated']
-            })
-        except Exception as e:
-            print("Error fetching news:", e)
-            traceback.print_exc()
-            return jsonify({
-                'status': 'error',
-                'message': str(e)
-            })
-    else:
+    try:
+        if refresh and services.news_refresher.snapshot['analysis']:
+            services.news_refresher.refresh(wait=False)
+        selected_sections = user_sections()
+        news_cache = load_news(selected_sections)
+    except Exception as e:
+        print("Error fetching news:", e)
+        traceback.print_exc()
         return jsonify({
-            'status': 'success',
-            'analysis': news_cache['analysis'],
-            'report': news_cache['report'],
-            'last_updated': news_cache['last_updated']
+            'status': 'error',
+            'message': str(e)
         })
+    
+    return jsonify({
+        'status': 'success',
+        'analysis': public_analysis(news_cache['analysis']),
+        # The headlines read aloud for this listener, including stories kept under another section
+        'headlines': [
+            {'section': section, 'title': title}
+            for section, title in headline_entries(news_cache['analysis'], selected_sections)
+        ],
+        'report': news_cache['report'],
+        'last_updated': news_cache['last_updated'],
+        'refreshing': services.news_refresher.refreshing
+    })
+
+@app.route('/report_stream')
+def report_stream():
+    """
+    Server-Sent Events stream of the report.
+    
+    While no report exists yet, a refresh is started and its text is sent as
+    Claude generates it ("delta" events). Otherwise the current report is sent
+    in one "delta" event. A final "done" (or "error") event ends the stream.
+    """
+    services = get_services()
+    
+    def events():
+        received = False
+        if not services.news_refresher.snapshot['report']:
+            services.news_refresher.refresh(wait=False)
+            for text in report_broadcast.follow(pending=lambda: services.news_refresher.refreshing):
+                if text is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                received = True
+                yield sse_event('delta', {'text': text})
+            # The report text ends before the refresh publishes its snapshot
+            services.news_refresher.wait()
+        
+        news_cache = services.news_refresher.snapshot
+        if not received and news_cache['report']:
+            yield sse_event('delta', {'text': news_cache['report']})
+        elif not news_cache['report']:
+            message = report_broadcast.error or services.news_refresher.last_error or 'No report available'
+            yield sse_event('error', {'message': message})
+            return
+        yield sse_event('done', {'last_updated': news_cache['last_updated']})
+    
+    return Response(
+        events(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/get_headlines_audio')
 def get_headlines_audio():
     """Generate audio for headlines"""
-    global news_cache
-    
+    services = get_services()
     if not ELEVEN_API_KEY:
         return jsonify({
             'status': 'error',
@@ -157,65 +485,26 @@ def get_headlines_audio():
     try:
         print("Generating headlines audio...")
         
-        # Initialize voice agent
-        print(f"Initializing voice agent with voice_id={ELEVEN_VOICE_ID}, voice_name={VOICE_NAME}")
-        voice_agent = VoiceAgent(
-            api_key=ELEVEN_API_KEY,
-            voice_id=ELEVEN_VOICE_ID,
-            voice_name=VOICE_NAME,
-            stability=VOICE_STABILITY,
-            clarity=VOICE_CLARITY,
-            style=VOICE_STYLE
-        )
-        
-        # Set user name if available
+        # Shared voice agent; the user name is passed per request
+        voice_agent = get_voice_agent()
         user_name = session.get('user_name', '')
-        if user_name:
-            print(f"Setting user name to: {user_name}")
-            voice_agent.set_user_name(user_name)
         
         # Get user's selected sections
-        selected_sections = session.get('selected_sections', DEFAULT_SECTIONS)
-        selected_sections = [s.lower() for s in selected_sections]  # Normalize to lowercase
+        selected_sections = user_sections()
         print(f"Selected sections: {selected_sections}")
         
-        # Make sure we have news data
-        if not news_cache['analysis']:
-            print("No news data in cache, fetching...")
-            response = get_news()
-            data = json.loads(response.get_data(as_text=True))
-            if data['status'] != 'success':
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Failed to fetch news data'
-                })
+        # Make sure we have news data for the selected sections
+        try:
+            news_cache = load_news(selected_sections)
+        except Exception as e:
+            print("Error fetching news:", e)
+            return jsonify({
+                'status': 'error',
+                'message': 'Failed to fetch news data'
+            })
         
         # Prepare headlines and sections
-        all_headlines = []
-        all_sections = []
-        
-        for section, data in news_cache['analysis']['sections'].items():
-            # Skip sections not selected by the user
-            if section.lower() not in selected_sections:
-                print(f"Skipping section {section}: not selected by user")
-                continue
-                
-            if not data or 'recent_headlines' not in data:
-                print(f"Skipping section {section}: missing data")
-                continue
-                
-            # Filter out empty headlines
-            headlines = [h for h in data.get('recent_headlines', []) if h and h.strip()]
-            
-            if not headlines:
-                print(f"Skipping section {section}: no valid headlines")
-                continue
-                
-            # Take only the first few headlines from each section
-            for headline in headlines[:3]:
-                if headline and headline.strip():
-                    all_headlines.append(headline)
-                    all_sections.append(section.capitalize())
+        all_headlines, all_sections = select_headlines(news_cache['analysis'], selected_sections)
         
         if not all_headlines:
             return jsonify({
@@ -225,46 +514,26 @@ def get_headlines_audio():
         
         print(f"Found {len(all_headlines)} headlines across {len(set(all_sections))} sections")
         
-        # Create custom script for headlines
-        greeting = voice_agent.get_greeting()
-        
-        # Include selected sections in greeting
-        section_names = ", ".join([s.capitalize() for s in selected_sections])
-        script = f"{greeting}\n\nHere are today's top headlines from {section_names}:"
-        
-        # Group headlines by section
-        section_grouped = {}
-        for i, headline in enumerate(all_headlines):
-            section = all_sections[i]
-            if section not in section_grouped:
-                section_grouped[section] = []
-            section_grouped[section].append(headline)
-        
-        # Format headlines by section - only sections with headlines
-        for section, section_headlines in section_grouped.items():
-            if section_headlines and len(section_headlines) > 0:
-                script += f"\n\nFrom {section}:"
-                for i, headline in enumerate(section_headlines):
-                    script += f"\n{headline}"
+        # Build the script as segments so shared parts come from the audio cache
+        segments = voice_agent.build_headline_segments(
+            all_headlines, all_sections, [section_label(s) for s in selected_sections], user_name=user_name or None
+        )
+        script = "\n\n".join(segments)
         
-        script += "\n\nThat concludes today's headlines."
+        print(f"Generated script with {len(segments)} segments, {len(script)} characters")
         
-        print(f"Generated script with {len(script)} characters")
+        services.audio_warmer.record_selection(selected_sections)
+        services.audio_warmer.record_request(segments[1:])
         
         # Generate audio
-        audio_path = generate_audio_file(script, voice_agent)
+        with metrics.timer('tts_segments'):
+            audio_data = voice_agent.generate_segments_audio(segments, TTS_MAX_WORKERS)
         
-        if audio_path and os.path.exists(audio_path):
-            # Read the audio file and encode as base64
-            print(f"Reading audio file from {audio_path}")
-            with open(audio_path, 'rb') as audio_file:
-                audio_data = audio_file.read()
-                audio_size = len(audio_data)
+        if audio_data:
+            audio_size = len(audio_data)
+            with metrics.timer('base64_encode'):
                 audio_base64 = base64.b64encode(audio_data).decode('utf-8')
             
-            # Clean up the temporary file
-            os.unlink(audio_path)
-            
             print(f"Returning audio data ({audio_size} bytes)")
             return jsonify({
                 'status': 'success',
@@ -272,7 +541,7 @@ def get_headlines_audio():
                 'script': script
             })
         else:
-            print("Failed to generate or save audio file")
+            print("Failed to generate audio")
             return jsonify({
                 'status': 'error',
                 'message': 'Failed to generate audio'
@@ -288,9 +557,8 @@ def get_headlines_audio():
 
 @app.route('/get_report_audio')
 def get_report_audio():
-    """Generate audio for full report"""
-    global news_cache
-    
+    """Generate audio for full report (base64 in JSON; /report_audio.mp3 streams it)"""
+    services = get_services()
     if not ELEVEN_API_KEY:
         return jsonify({
             'status': 'error',
@@ -298,36 +566,21 @@ def get_report_audio():
         })
     
     try:
-        # Initialize voice agent
-        voice_agent = VoiceAgent(
-            api_key=ELEVEN_API_KEY,
-            voice_id=ELEVEN_VOICE_ID,
-            voice_name=VOICE_NAME,
-            stability=VOICE_STABILITY,
-            clarity=VOICE_CLARITY,
-            style=VOICE_STYLE
-        )
-        
-        # Set user name if available
-        user_name = session.get('user_name', '')
-        if user_name:
-            voice_agent.set_user_name(user_name)
+        # Shared voice agent
+        voice_agent = get_voice_agent()
         
         # Format report
-        script = f"Here's your in-depth news analysis and summary:\n\n{news_cache['report']}"
+        news_cache = load_news()
+        script = report_script(news_cache['report'])
+        services.audio_warmer.record_request([script])
         
-        # Generate audio
-        audio_path = generate_audio_file(script, voice_agent)
+        # Generate audio, served from the audio cache once synthesized
+        audio_data = voice_agent.generate_audio(script)
         
-        if audio_path:
-            # Read the audio file and encode as base64
-            with open(audio_path, 'rb') as audio_file:
-                audio_data = audio_file.read()
+        if audio_data:
+            with metrics.timer('base64_encode'):
                 audio_base64 = base64.b64encode(audio_data).decode('utf-8')
             
-            # Clean up the temporary file
-            os.unlink(audio_path)
-            
             return jsonify({
                 'status': 'success',
                 'audio': audio_base64,
@@ -347,6 +600,135 @@ def get_report_audio():
             'message': str(e)
         })
 
+@app.route('/headlines_audio.mp3')
+def headlines_audio_stream():
+    """Stream headlines audio segment by segment as it is synthesized"""
+    services = get_services()
+    if not ELEVEN_API_KEY:
+        return jsonify({
+            'status': 'error',
+            'message': 'ElevenLabs API key not configured'
+        }), 503
+    
+    # Read the session up front; the response body is produced after the view returns
+    user_name = session.get('user_name', '')
+    selected_sections = user_sections()
+    
+    try:
+        # Make sure we have news data for the selected sections
+        news_cache = load_news(selected_sections)
+        
+        all_headlines, all_sections = select_headlines(news_cache['analysis'], selected_sections)
+        if not all_headlines:
+            return jsonify({
+                'status': 'error',
+                'message': 'No headlines found for selected sections'
+            }), 404
+        
+        voice_agent = get_voice_agent()
+        segments = voice_agent.build_headline_segments(
+            all_headlines, all_sections, [section_label(s) for s in selected_sections], user_name=user_name or None
+        )
+        print(f"Streaming headlines audio: {len(segments)} segments")
+        services.audio_warmer.record_selection(selected_sections)
+        services.audio_warmer.record_request(segments[1:])
+        
+        return Response(
+            voice_agent.stream_segments_audio(segments, TTS_MAX_WORKERS),
+            mimetype='audio/mpeg',
+            headers={'Cache-Control': 'no-store'}
+        )
+    except Exception as e:
+        print(f"Error streaming headlines audio: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/report_audio.mp3')
+def report_audio_stream():
+    """
+    Stream the full report audio; cached audio is served as a file with Range support.
+    
+    If there is no report yet, one is generated and read sentence by sentence
+    while Claude is still writing it.
+    """
+    services = get_services()
+    if not ELEVEN_API_KEY:
+        return jsonify({
+            'status': 'error',
+            'message': 'ElevenLabs API key not configured'
+        }), 503
+    
+    try:
+        voice_agent = get_voice_agent()
+        
+        news_cache = services.news_refresher.snapshot
+        if not news_cache['report']:
+            print("No report yet, synthesizing it as it is generated...")
+            services.news_refresher.refresh(wait=False)
+            deltas = itertools.chain([f"{REPORT_INTRO}\n"], live_report_text())
+            return Response(
+                voice_agent.stream_report_audio(deltas, TTS_MAX_WORKERS),
+                mimetype='audio/mpeg',
+                headers={'Cache-Control': 'no-store'}
+            )
+        
+        script = report_script(news_cache['report'])
+        services.audio_warmer.record_request([script])
+        
+        if services.audio_cache is not None:
+            audio_path = services.audio_cache.lookup(voice_agent.audio_cache_key(script))
+            if audio_path:
+                return send_file(audio_path, mimetype='audio/mpeg', conditional=True)
+        
+        return Response(
+            voice_agent.generate_audio_stream(script, check_cache=False),
+            mimetype='audio/mpeg',
+            headers={'Cache-Control': 'no-store'}
+        )
+    except Exception as e:
+        print(f"Error streaming report audio: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/cache_stats')
+def cache_stats():
+    """Cache and audio warm-up statistics for this worker"""
+    services = get_services()
+    return jsonify({
+        'llm_cache': services.llm_cache.stats() if services.llm_cache is not None else None,
+        'audio_cache': services.audio_cache.stats() if services.audio_cache is not None else None,
+        'article_store': services.article_store.stats() if services.article_store is not None else None,
+        'audio_warmup': services.audio_warmer.stats()
+    })
+
+def cache_gauges():
+    """Cache and warm-up statistics as {'news_cache_stat': {labels: value}} gauges"""
+    services = get_services()
+    sources = {
+        'llm': services.llm_cache.stats() if services.llm_cache is not None else None,
+        'audio': services.audio_cache.stats() if services.audio_cache is not None else None,
+        'article_store': services.article_store.stats() if services.article_store is not None else None,
+        'audio_warmup': services.audio_warmer.stats()
+    }
+    gauges = {}
+    for cache, stats in sources.items():
+        for stat, value in (stats or {}).items():
+            if isinstance(value, (int, float)):
+                gauges[(('cache', cache), ('stat', stat))] = value
+    return {'news_cache_stat': gauges}
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage timings, token and audio counters and cache statistics for this worker, in Prometheus text format"""
+    return Response(metrics.render(cache_gauges()), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
+    # Development server; use gunicorn (gunicorn.conf.py) in production
     port = int(os.environ.get('PORT', 5001))
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true')
\ No newline at end of file
@@ -0,0 +1,121 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlite_local import ThreadLocalConnection
+
+class ArticleStore:
+    """
+    Persistent store of downloaded NYT feeds and articles backed by SQLite, keyed by URL.
+
+    Each entry keeps the response validators (ETag / Last-Modified) for conditional
+    requests, a hash of the content, the raw body (feeds) or parsed text (articles)
+    and fetch timestamps. A 304 or an unchanged hash lets the caller reuse the
+    stored copy instead of downloading or parsing again. Entries not seen for
+    `retention` seconds are dropped.
+    """
+
+    def __init__(self, path: str, retention: float = 7 * 86400):
+        """
+        Open (or create) the store.
+
+        Args:
+            path (str): SQLite database file
+            retention (float): Seconds an entry is kept after it was last checked
+        """
+        self.path = path
+        self.retention = retention
+        self._db = ThreadLocalConnection(path, row_factory=sqlite3.Row)
+        self._lock = threading.Lock()
+        self._stats = {"not_modified": 0, "unchanged": 0, "changed": 0, "disk_hits": 0, "bytes_downloaded": 0}
+
+        with self._db.connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS documents (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    body TEXT,
+                    title TEXT,
+                    text TEXT,
+                    publish_date TEXT,
+                    fetched REAL NOT NULL,
+                    checked REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS documents_checked ON documents (checked)")
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increment one of this process's counters"""
+        with self._lock:
+            self._stats[name] += amount
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        """Hex SHA-256 of a response body"""
+        return hashlib.sha256(content).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Look up a stored entry.
+
+        Returns:
+            Dict: The entry's columns, or None if the URL was never stored
+        """
+        with self._db.connect() as conn:
+            row = conn.execute("SELECT * FROM documents WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row is not None else None
+
+    @staticmethod
+    def validators(entry: Optional[Dict]) -> Dict[str, str]:
+        """Conditional request headers for a stored entry"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def save(self, url: str, response, body: Optional[str] = None, title: Optional[str] = None,
+             text: Optional[str] = None, publish_date: Optional[str] = None) -> None:
+        """
+        Store a 200 response's validators and hash along with its body or parsed text.
+
+        Args:
+            url (str): URL the entry is keyed by
+            response (requests.Response): The response
+            body (str, optional): Raw body to keep (for feeds answered from the store on a 304)
+            title (str, optional): Parsed article title
+            text (str, optional): Parsed article text
+            publish_date (str, optional): Parsed publish date
+        """
+        now = time.time()
+        with self._db.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(url, etag, last_modified, content_hash, body, title, text, publish_date, fetched, checked) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 self.content_hash(response.content), body, title, text, publish_date, now, now)
+            )
+            conn.execute("DELETE FROM documents WHERE checked < ?", (now - self.retention,))
+
+    def touch(self, url: str) -> None:
+        """Record that a stored entry was confirmed current (304 or unchanged hash)"""
+        with self._db.connect() as conn:
+            conn.execute("UPDATE documents SET checked = ? WHERE url = ?", (time.time(), url))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get this process's store statistics.
+
+        Returns:
+            Dict[str, int]: not_modified (304s), unchanged (same hash), changed,
+                disk_hits (served without a request) and bytes_downloaded
+        """
+        with self._lock:
+            return dict(self._stats)
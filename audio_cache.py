@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterable, Iterator, Optional
+
+from cache_backend import CacheBackend, versioned_key
+
+class AudioCache:
+    """
+    On-disk cache of synthesized speech.
+
+    Each entry is an MP3 file named after a hash of the text and every voice setting
+    that affects the audio. Files are written atomically (temp file + rename), so
+    concurrent workers never see partial audio, and the least recently used files are
+    evicted once the directory grows past its size limit.
+
+    With a shared backend, new audio is also stored there and local misses are
+    filled from it, so workers on other hosts synthesize each script only once.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 200 * 1024 * 1024,
+                 backend: Optional[CacheBackend] = None, backend_ttl: float = 86400):
+        """
+        Create the cache directory if needed.
+
+        Args:
+            directory (str): Directory holding the cached MP3 files
+            max_bytes (int): Maximum total size of cached audio before LRU eviction
+            backend (CacheBackend, optional): Store shared with other workers
+            backend_ttl (float): Seconds audio stays in the shared backend
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.backend_ttl = backend_ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, voice_id: str, stability: float, clarity: float, style: float, model: str) -> str:
+        """
+        Build the cache key for a synthesis request.
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        payload = json.dumps([text, voice_id, stability, clarity, style, model])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        """Path of the file that holds (or would hold) an entry"""
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read cached audio.
+
+        Args:
+            key (str): Key from make_key()
+
+        Returns:
+            bytes: MP3 data, or None on a miss
+        """
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as audio_file:
+                data = audio_file.read()
+        except FileNotFoundError:
+            data = self._fetch_shared(key)
+            self._count("hits" if data is not None else "misses")
+            return data
+        # Refresh the modification time so eviction is least-recently-used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count("hits")
+        return data
+
+    def put(self, key: str, data: bytes) -> str:
+        """
+        Store audio atomically and evict old entries if over the size limit.
+
+        Args:
+            key (str): Key from make_key()
+            data (bytes): MP3 data
+
+        Returns:
+            str: Path of the cached file
+        """
+        path = self._write(key, data)
+        self._publish(key, data)
+        self._count("writes")
+        self._evict()
+        return path
+
+    def _write(self, key: str, data: bytes) -> str:
+        """Atomically write an entry to the local directory"""
+        path = self.path_for(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return path
+
+    def _publish(self, key: str, data: bytes) -> None:
+        """Copy an entry to the shared backend, if there is one"""
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(versioned_key("audio", key), data, ttl=self.backend_ttl)
+        except Exception as e:
+            print(f"Error storing audio in shared cache: {e}")
+
+    def _fetch_shared(self, key: str) -> Optional[bytes]:
+        """Fill a local miss from the shared backend, if there is one"""
+        if self.backend is None:
+            return None
+        try:
+            data = self.backend.get(versioned_key("audio", key))
+        except Exception as e:
+            print(f"Error reading audio from shared cache: {e}")
+            return None
+        if data is not None:
+            self._write(key, data)
+            self._evict()
+        return data
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Find the file of a cached entry without reading it, e.g. to serve it directly.
+
+        Args:
+            key (str): Key from make_key()
+
+        Returns:
+            str: Path of the cached MP3, or None on a miss
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            if self._fetch_shared(key) is None:
+                self._count("misses")
+                return None
+        self._count("hits")
+        return path
+
+    def contains(self, key: str) -> bool:
+        """Whether an entry is cached locally, without counting a lookup"""
+        return os.path.exists(self.path_for(key))
+
+    def put_stream(self, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Pass audio chunks through while writing them to the cache.
+
+        The entry only becomes visible once the stream has been consumed completely;
+        an interrupted stream leaves no partial file behind.
+
+        Args:
+            key (str): Key from make_key()
+            chunks (Iterable[bytes]): MP3 data as it is produced
+
+        Yields:
+            bytes: The same chunks, unchanged
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in chunks:
+                    temp_file.write(chunk)
+                    yield chunk
+            if self.backend is not None:
+                with open(temp_path, "rb") as audio_file:
+                    self._publish(key, audio_file.read())
+            os.replace(temp_path, self.path_for(key))
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        self._count("writes")
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used files until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".mp3"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                self._count("evictions")
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get this process's cache statistics.
+
+        Returns:
+            Dict[str, float]: hits, misses, writes, evictions and hit_rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
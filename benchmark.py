@@ -0,0 +1,1200 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import anthropic
+import requests
+
+import scraper
+from analyzer import NewsAnalyzer
+from llm_cache import LLMCache
+
+# NYT feeds (fixtures/nyt/<section>.json; synthetic unless replaced by `record`) and canned Claude replies
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# One MPEG-1 Layer III frame (128 kbps, 44.1 kHz, joint stereo) of silence
+MP3_FRAME = b'\xff\xfb\x90\x64' + bytes(413)
+
+# Roughly how many bytes of 128 kbps speech ElevenLabs returns per character of text
+MP3_BYTES_PER_CHAR = 1000
+
+
+def load_nyt_fixtures(directory: str = os.path.join(FIXTURES_DIR, 'nyt')) -> dict:
+    """
+    Load the NYT Top Stories fixtures (synthetic feeds, or live ones saved by `record`).
+
+    Returns:
+        dict: Raw response bytes by section
+    """
+    feeds = {}
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.json'):
+                with open(os.path.join(directory, name), 'rb') as f:
+                    feeds[name[:-len('.json')]] = f.read()
+    return feeds
+
+
+def load_claude_fixtures(path: str = os.path.join(FIXTURES_DIR, 'claude_responses.json')) -> dict:
+    """Load canned Claude replies ('themes' bullet points and a 'report')"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+CLAUDE_REPLIES = load_claude_fixtures()
+
+
+def canned_reply(prompt: str) -> str:
+    """Canned Claude reply for a prompt: a JSON theme map, a report or theme bullet points"""
+    if 'Respond with only a JSON object' in prompt:
+        payload, _ = json.JSONDecoder().raw_decode(prompt[prompt.rindex('\n{') + 1:])
+        themes = [line.lstrip('• ') for line in CLAUDE_REPLIES['themes'].splitlines()]
+        return json.dumps({section: themes for section in payload})
+    if 'summary report' in prompt:
+        return CLAUDE_REPLIES['report']
+    return CLAUDE_REPLIES['themes']
+
+
+def fake_mp3(size: int) -> bytes:
+    """Silent MP3 data of about size bytes (whole frames, at least one)"""
+    return MP3_FRAME * max(1, size // len(MP3_FRAME))
+
+
+def make_stub_results(section: str, count: int = 20) -> list:
+    """Build a fake NYT Top Stories result list for a section"""
+    return [{
+        'title': f"{section.capitalize()} headline {i}",
+        'url': f"https://www.example.com/2025/01/01/{section}/story-{i}.html",
+        'published_date': f"2025-01-01T{i % 24:02d}:00:00-05:00",
+        'abstract': f"Abstract for {section} story {i}.",
+        'section': section
+    } for i in range(count)]
+
+
+def count_request(server) -> None:
+    """Count a request handled by a stub server"""
+    with server.lock:
+        server.requests += 1
+
+
+def write_chunked(handler: BaseHTTPRequestHandler, pieces, delay: float = 0.0) -> None:
+    """Write pieces as an HTTP/1.1 chunked body, sleeping delay seconds between them"""
+    for index, piece in enumerate(pieces):
+        if index and delay:
+            time.sleep(delay)
+        handler.wfile.write(f'{len(piece):x}\r\n'.encode('ascii') + piece + b'\r\n')
+        handler.wfile.flush()
+    handler.wfile.write(b'0\r\n\r\n')
+
+
+class StubNYTHandler(BaseHTTPRequestHandler):
+    """
+    Serves /<section>.json like the NYT Top Stories API (with ETags), after a configurable delay.
+
+    Sections with a fixture get it, others a feed generated by make_stub_results.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        count_request(self.server)
+        section = urlparse(self.path).path.rstrip('/').split('/')[-1].replace('.json', '')
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        time.sleep(delay)
+        body = self.server.feeds.get(section) or json.dumps(
+            {'status': 'OK', 'results': make_stub_results(section)}
+        ).encode('utf-8')
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubClaudeHandler(BaseHTTPRequestHandler):
+    """
+    Serves POST /v1/messages like the Anthropic API, with canned replies.
+
+    Streaming requests get Server-Sent Events; the first event arrives after
+    the latency, then the text follows in small deltas.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        count_request(self.server)
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        content = request.get('messages', [{}])[-1].get('content', '')
+        prompt = content if isinstance(content, str) else ''.join(block.get('text', '') for block in content)
+        text = canned_reply(prompt)
+        usage = {'input_tokens': len(prompt) // 4, 'output_tokens': len(text) // 4}
+        message = {
+            'id': f'msg_stub_{self.server.requests}',
+            'type': 'message',
+            'role': 'assistant',
+            'model': request.get('model', 'stub'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'stop_sequence': None,
+            'usage': usage
+        }
+        time.sleep(self.server.latency + random.uniform(0, self.server.jitter))
+
+        if not request.get('stream'):
+            body = json.dumps(message).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        def event(name, data):
+            return f'event: {name}\ndata: {json.dumps(data)}\n\n'.encode('utf-8')
+
+        deltas = [text[i:i + 40] for i in range(0, len(text), 40)]
+        events = [event('message_start', {'type': 'message_start', 'message': {
+            **message, 'content': [], 'stop_reason': None, 'usage': {**usage, 'output_tokens': 1}
+        }})]
+        events.append(event('content_block_start', {
+            'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}
+        }))
+        events += [event('content_block_delta', {
+            'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': delta}
+        }) for delta in deltas]
+        events.append(event('content_block_stop', {'type': 'content_block_stop', 'index': 0}))
+        events.append(event('message_delta', {
+            'type': 'message_delta', 'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+            'usage': {'output_tokens': usage['output_tokens']}
+        }))
+        events.append(event('message_stop', {'type': 'message_stop'}))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        write_chunked(self, events, self.server.chunk_delay)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubElevenLabsHandler(BaseHTTPRequestHandler):
+    """
+    Serves the ElevenLabs endpoints the voice agent uses: GET /v1/voices and
+    POST /v1/text-to-speech/<voice_id>[/stream], which return silent MP3 data
+    sized like real speech for the text.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        count_request(self.server)
+        if not urlparse(self.path).path.endswith('/voices'):
+            self.send_json(404, {'detail': {'status': 'not_found', 'message': 'Not found'}})
+            return
+        time.sleep(self.server.latency + random.uniform(0, self.server.jitter))
+        self.send_json(200, {'voices': [{
+            'voice_id': '21m00Tcm4TlvDq8ikWAM',
+            'name': 'Rachel',
+            'category': 'premade'
+        }]})
+
+    def do_POST(self):
+        count_request(self.server)
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        audio = fake_mp3(len(request.get('text', '')) * MP3_BYTES_PER_CHAR)
+        time.sleep(self.server.latency + random.uniform(0, self.server.jitter))
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        if urlparse(self.path).path.endswith('/stream'):
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            pieces = [audio[i:i + 16384] for i in range(0, len(audio), 16384)]
+            write_chunked(self, pieces, self.server.chunk_delay)
+            return
+        self.send_header('Content-Length', str(len(audio)))
+        self.end_headers()
+        self.wfile.write(audio)
+
+    def send_json(self, status: int, data: dict) -> None:
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(handler, latency: float, jitter: float = 0.0, chunk_delay: float = 0.0, **attributes):
+    """
+    Start a stub server on a free local port in a background thread.
+
+    Args:
+        handler: BaseHTTPRequestHandler subclass answering requests
+        latency (float): Delay in seconds before each response
+        jitter (float): Extra random delay in seconds (0..jitter)
+        chunk_delay (float): Delay in seconds between chunks of streamed responses
+        **attributes: Extra server attributes for the handler
+
+    Returns:
+        ThreadingHTTPServer: The running server (call shutdown() when done); its
+            requests attribute counts the requests answered
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.chunk_delay = chunk_delay
+    server.requests = 0
+    server.lock = threading.Lock()
+    for name, value in attributes.items():
+        setattr(server, name, value)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_stub_nyt_server(latency: float, jitter: float = 0.0, feeds: dict = None):
+    """
+    Start a stub NYT server on a free local port in a background thread.
+
+    Args:
+        latency (float): Delay in seconds before each response
+        jitter (float): Extra random delay in seconds (0..jitter)
+        feeds (dict, optional): Fixture response bytes by section (default: generated feeds only)
+
+    Returns:
+        ThreadingHTTPServer: The running server (call shutdown() when done)
+    """
+    return start_stub_server(StubNYTHandler, latency, jitter, feeds=feeds or {})
+
+
+class StubMessages:
+    """
+    Stand-in for anthropic.Client().messages that sleeps instead of calling Claude.
+
+    Tracks request count and peak concurrency, and can simulate rate limiting by
+    returning 429s whenever more than rate_limit requests are in flight.
+    """
+
+    def __init__(self, latency: float, jitter: float = 0.0, rate_limit: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def create(self, model, max_tokens, messages, **kwargs):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            limited = self.rate_limit and self.in_flight > self.rate_limit
+            if limited:
+                self.rate_limited += 1
+        try:
+            if limited:
+                raise anthropic.RateLimitError('rate limited', response=StubRateLimitResponse(self.latency), body=None)
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+            prompt = messages[-1]['content']
+            return StubMessage(canned_reply(prompt), input_tokens=len(prompt) // 4)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class StubRateLimitResponse:
+    """Just enough of an HTTP response for anthropic.RateLimitError"""
+    status_code = 429
+    request = None
+
+    def __init__(self, retry_after: float = 0.05):
+        self.headers = {'retry-after': str(retry_after)}
+
+
+class StubMessage:
+    """Minimal Claude message response with approximate token usage"""
+
+    def __init__(self, text: str, input_tokens: int = 0):
+        self.content = [type('TextBlock', (), {'text': text, 'type': 'text'})()]
+        self.usage = type('Usage', (), {'input_tokens': input_tokens, 'output_tokens': len(text) // 4})()
+
+
+class StubClient:
+    """Minimal anthropic.Client stand-in exposing .messages"""
+
+    def __init__(self, messages: StubMessages):
+        self.messages = messages
+
+
+def make_stub_news_data(sections=scraper.DEFAULT_SECTIONS, count: int = 20) -> dict:
+    """Build get_all_articles-shaped news data without any network calls"""
+    return {section: scraper._format_articles(section, make_stub_results(section, count)) for section in sections}
+
+
+def bench_analyze(args):
+    """Compare serial, parallel and batched theme extraction against a stubbed Claude client"""
+    news_data = make_stub_news_data()
+    cache_dir = tempfile.mkdtemp(prefix='news_bench_')
+    cache = LLMCache(os.path.join(cache_dir, 'llm_cache.sqlite'))
+
+    modes = [
+        ('serial', {'max_concurrency': 1}),
+        ('parallel', {'max_concurrency': args.concurrency}),
+        ('batched', {'max_concurrency': args.concurrency, 'batch_themes': True}),
+        ('cached', {'max_concurrency': args.concurrency, 'cache': cache}),
+    ]
+    for name, kwargs in modes:
+        messages = StubMessages(args.latency, args.jitter, args.rate_limit)
+        analyzer = NewsAnalyzer(api_key='stub-key', **kwargs)
+        analyzer.client = StubClient(messages)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            analysis = analyzer.analyze_news_data(news_data)
+            timings.append(time.perf_counter() - start)
+        mean = statistics.mean(timings)
+        usage = analyzer.usage.snapshot()
+        calls = sum(stats['calls'] for stats in usage.values()) / args.repeat
+        input_tokens = sum(stats['input_tokens'] for stats in usage.values()) / args.repeat
+        output_tokens = sum(stats['output_tokens'] for stats in usage.values()) / args.repeat
+        print(f"{name:<9} sections={len(analysis['sections'])} "
+              f"mean={mean * 1000:.1f}ms "
+              f"throughput={len(news_data) / mean:.1f} sections/s "
+              f"calls/run={calls:.0f} in_tokens/run={input_tokens:.0f} out_tokens/run={output_tokens:.0f} "
+              f"peak_in_flight={messages.peak_in_flight} "
+              f"rate_limited={messages.rate_limited}")
+    stats = cache.stats()
+    print(f"cache: hits={stats['hits']} misses={stats['misses']} entries={stats['entries']} bytes={stats['bytes']}")
+
+
+def bench_fetch(args):
+    """Compare sequential and concurrent get_all_articles against the stub NYT server"""
+    server = start_stub_nyt_server(args.latency, args.jitter, load_nyt_fixtures())
+    scraper.NYT_API_BASE = f"http://127.0.0.1:{server.server_address[1]}/svc/topstories/v2"
+
+    try:
+        modes = [
+            ('sequential', {'concurrent': False}),
+            ('concurrent', {'concurrent': True, 'max_workers': args.workers}),
+        ]
+        for name, kwargs in modes:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                articles = scraper.get_all_articles('stub-key', **kwargs)
+                timings.append(time.perf_counter() - start)
+            print(f"{name:<12} sections={len(articles)} "
+                  f"mean={statistics.mean(timings) * 1000:.1f}ms "
+                  f"min={min(timings) * 1000:.1f}ms "
+                  f"max={max(timings) * 1000:.1f}ms")
+        print(f"slowest single section ~ {(args.latency + args.jitter) * 1000:.1f}ms")
+    finally:
+        server.shutdown()
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of values (fraction between 0 and 1)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def process_tree_rss(pid: int) -> int:
+    """Combined RSS in bytes of a process and its descendants (0 where /proc is unavailable)"""
+    try:
+        parents = {}
+        for entry in os.listdir('/proc'):
+            if entry.isdigit():
+                try:
+                    with open(f'/proc/{entry}/stat') as f:
+                        parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+                except (OSError, IndexError, ValueError):
+                    continue
+    except OSError:
+        return 0
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/statm') as f:
+                total += int(f.read().split()[1]) * resource.getpagesize()
+        except (OSError, IndexError, ValueError):
+            pass
+        pending.extend(child for child, parent in parents.items() if parent == current)
+    return total
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (peak so far where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RSSSampler:
+    """Samples RSS (of this process, or as measured by measure()) in a background thread and keeps the peak"""
+
+    def __init__(self, interval: float = 0.01, measure=current_rss):
+        self.interval = interval
+        self.measure = measure
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.peak = self.measure()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.measure())
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.measure())
+
+
+def run_concurrent(operation, total: int, concurrency: int, duration: float = None) -> tuple:
+    """
+    Run operation total times (or for duration seconds) from concurrency threads.
+
+    Args:
+        operation: Callable taking the worker index; it may return a label to
+            group its latency under (None groups it under '')
+        total (int): Number of operations (ignored when duration is given)
+        concurrency (int): Worker threads
+        duration (float, optional): Keep every thread busy for this many seconds instead
+
+    Returns:
+        tuple: ({label: [latency, ...]}, {label: errors}, elapsed seconds)
+    """
+    latencies, errors = {}, {}
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker(index):
+        while time.perf_counter() < deadline if deadline else next(counter) < total:
+            label, failed = '', False
+            start = time.perf_counter()
+            try:
+                label = operation(index) or ''
+            except Exception as e:
+                failed = True
+                label = getattr(e, 'label', '')
+                print(f"Benchmark operation failed: {e}", file=sys.__stderr__)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.setdefault(label, []).append(elapsed)
+                if failed:
+                    errors[label] = errors.get(label, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker, index) for index in range(concurrency)]:
+            future.result()
+    return latencies, errors, time.perf_counter() - start
+
+
+class OperationError(Exception):
+    """A benchmarked operation failed; label names the route or stage it belongs to"""
+
+    def __init__(self, label: str, message: str):
+        super().__init__(f"{label}: {message}")
+        self.label = label
+
+
+def start_stub_servers(args) -> dict:
+    """
+    Start stub NYT, Claude and ElevenLabs servers with the latencies in args.
+
+    Returns:
+        dict: The running servers by name ('nyt', 'claude', 'elevenlabs')
+    """
+    return {
+        'nyt': start_stub_nyt_server(args.nyt_latency, args.jitter, load_nyt_fixtures()),
+        'claude': start_stub_server(StubClaudeHandler, args.claude_latency, args.jitter, args.chunk_delay),
+        'elevenlabs': start_stub_server(StubElevenLabsHandler, args.tts_latency, args.jitter, args.chunk_delay),
+    }
+
+
+def stub_environment(ports: dict) -> dict:
+    """Environment variables pointing the app's clients at stub servers listening on ports (by name)"""
+    url = {name: f"http://127.0.0.1:{port}" for name, port in ports.items()}
+    return {
+        'NYT_API_BASE': f"{url['nyt']}/svc/topstories/v2",
+        'ANTHROPIC_BASE_URL': url['claude'],
+        'ELEVEN_BASE_URL': f"{url['elevenlabs']}/v1",
+        'NYT_API_KEY': 'stub-key',
+        'CLAUDE_API_KEY': 'stub-key',
+        'ELEVEN_API_KEY': 'stub-key',
+    }
+
+
+def start_stub_upstreams(args) -> dict:
+    """
+    Start the stub servers and point this process at them.
+
+    Must run before app or voice_agent is imported: the ElevenLabs client reads
+    ELEVEN_BASE_URL when it is first imported.
+
+    Returns:
+        dict: The running servers by name
+    """
+    servers = start_stub_servers(args)
+    os.environ.update(stub_environment({name: server.server_address[1] for name, server in servers.items()}))
+    scraper.NYT_API_BASE = os.environ['NYT_API_BASE']
+    return servers
+
+
+def serve_stub_upstreams(args, ports) -> None:
+    """Run the stub servers until the process is terminated, after putting their ports on the ports queue"""
+    servers = start_stub_servers(args)
+    ports.put({name: server.server_address[1] for name, server in servers.items()})
+    threading.Event().wait()
+
+
+def isolate_app_state(work_dir: str, backend_url: str = 'memory://') -> None:
+    """Keep the web app's caches in work_dir and turn off its background work"""
+    os.environ.update({
+        'LLM_CACHE_PATH': '',
+        'ARTICLE_STORE_PATH': '',
+        'AUDIO_CACHE_DIR': os.path.join(work_dir, 'audio'),
+        'CACHE_BACKEND_URL': backend_url,
+        'NEWS_REFRESH_INTERVAL': '0',
+        'AUDIO_WARMUP_VARIANTS': '0',
+        'AUDIO_WARMUP_REPORT': 'false',
+        'METRICS_SPAN_LOG': 'false',
+    })
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+def start_app_server(flask_app):
+    """Serve a Flask app from a threaded local server in a background thread"""
+    from werkzeug.serving import make_server
+
+    server = make_server('127.0.0.1', 0, flask_app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_listeners(count: int, sections: list, seed: int = 0) -> list:
+    """Simulated listeners, each with a user name and 1-4 selected sections"""
+    rng = random.Random(seed)
+    return [{
+        'user_name': f"Listener {index}",
+        'sections': rng.sample(sections, rng.randint(1, min(4, len(sections))))
+    } for index in range(count)]
+
+
+def check_response(label: str, response) -> None:
+    """Raise OperationError unless a route answered successfully"""
+    if response.status_code != 200:
+        raise OperationError(label, f"HTTP {response.status_code}")
+    if response.headers.get('Content-Type', '').startswith('application/json'):
+        data = response.json()
+        if data.get('status') == 'error':
+            raise OperationError(label, data.get('message', 'error'))
+
+
+def summarize_run(scenario: str, latencies: dict, errors: dict, elapsed: float, peak_rss: int) -> list:
+    """One result row per label of a run_concurrent result"""
+    rows = []
+    for label, values in sorted(latencies.items()):
+        rows.append({
+            'scenario': f"{scenario} {label}".strip(),
+            'requests': len(values),
+            'errors': errors.get(label, 0),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 1),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 1),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 1),
+            'throughput': round(len(values) / elapsed, 2) if elapsed else 0.0,
+            'peak_rss_mb': round(peak_rss / (1024 * 1024), 1)
+        })
+    return rows
+
+
+def print_results(rows: list) -> None:
+    """Print result rows as a table"""
+    print(f"{'scenario':<34} {'reqs':>5} {'errs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'req/s':>8} {'peak RSS MB':>12}")
+    for row in rows:
+        print(f"{row['scenario']:<34} {row['requests']:>5} {row['errors']:>5} {row['p50_ms']:>9.1f} "
+              f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['throughput']:>8.2f} {row['peak_rss_mb']:>12.1f}")
+
+
+def compare_to_baseline(rows: list, baseline_path: str, tolerance: float) -> list:
+    """
+    Compare results with a saved run.
+
+    Returns:
+        list: Descriptions of regressions (p95 latency or peak RSS more than
+            tolerance above the baseline, throughput more than tolerance below it)
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {row['scenario']: row for row in json.load(f)['results']}
+    regressions = []
+    for row in rows:
+        before = baseline.get(row['scenario'])
+        if before is None:
+            continue
+        for key, worse in (('p95_ms', 1), ('peak_rss_mb', 1), ('throughput', -1)):
+            if not before[key]:
+                continue
+            change = (row[key] - before[key]) / before[key]
+            if change * worse > tolerance:
+                regressions.append(f"{row['scenario']}: {key} {before[key]} -> {row[key]} ({change:+.0%})")
+    return regressions
+
+
+def bench_load(args):
+    """
+    Drive fetching, analysis, report generation and the audio routes under
+    concurrent load against stub upstreams, and report latency percentiles,
+    throughput and peak RSS per scenario.
+    """
+    servers = start_stub_upstreams(args)
+    work_dir = tempfile.mkdtemp(prefix='news_bench_')
+    isolate_app_state(work_dir)
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    if not args.verbose:
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    sections = sorted(load_nyt_fixtures()) or scraper.DEFAULT_SECTIONS
+    rows = []
+
+    def run(scenario, operation, total):
+        with quiet:
+            # One untimed call so connection setup and first-use costs stay out of the percentiles
+            operation(0)
+        with RSSSampler() as rss, quiet:
+            latencies, errors, elapsed = run_concurrent(operation, total, args.concurrency)
+        rows.extend(summarize_run(scenario, latencies, errors, elapsed, rss.peak))
+
+    try:
+        def fetch(_):
+            scraper.get_all_articles('stub-key', sections=sections)
+
+        if 'fetch' in args.scenarios:
+            run('get_all_articles', fetch, args.requests)
+
+        analyzer = NewsAnalyzer(api_key='stub-key', max_concurrency=args.claude_concurrency)
+        with quiet:
+            news_data = scraper.get_all_articles('stub-key', sections=sections)
+            analysis = analyzer.analyze_news_data(news_data)
+
+        def analyze(_):
+            analyzer.analyze_news_data(news_data)
+
+        def report(_):
+            analyzer.generate_summary_report(analysis)
+
+        if 'analyze' in args.scenarios:
+            run('analyze_news_data', analyze, args.requests)
+        if 'report' in args.scenarios:
+            run('generate_summary_report', report, args.requests)
+
+        if 'routes' in args.scenarios:
+            with quiet:
+                import app as web_app
+            server = start_app_server(web_app.app)
+            base_url = f"http://127.0.0.1:{server.server_port}"
+            listeners = make_listeners(args.concurrency, web_app.AVAILABLE_SECTIONS, args.seed)
+            clients = []
+            with quiet:
+                for listener in listeners:
+                    client = requests.Session()
+                    client.post(f"{base_url}/update_preferences",
+                                data={'user_name': listener['user_name'], 'sections': listener['sections']})
+                    # Untimed warm-up: the first request triggers the refresh for these sections
+                    check_response('/get_news', client.get(f"{base_url}/get_news"))
+                    clients.append(client)
+            routes = itertools.cycle(['/get_headlines_audio', '/report_audio.mp3', '/headlines_audio.mp3'])
+            route_lock = threading.Lock()
+
+            def hit_route(index):
+                with route_lock:
+                    route = next(routes)
+                response = clients[index].get(f"{base_url}{route}", stream=route.endswith('.mp3'))
+                check_response(route, response)
+                response.content
+                return route
+
+            try:
+                run('route', hit_route, args.requests)
+            finally:
+                server.shutdown()
+    finally:
+        for server in servers.values():
+            server.shutdown()
+
+    print_results(rows)
+    print("upstream requests: " + " ".join(f"{name}={server.requests}" for name, server in servers.items()))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': {key: value for key, value in vars(args).items() if key != 'func'},
+                       'results': rows}, f, indent=2)
+        print(f"Results saved to {args.output}")
+    if args.baseline:
+        regressions = compare_to_baseline(rows, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+def free_port() -> int:
+    """A local TCP port that was free a moment ago"""
+    with contextlib.closing(socket.socket()) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(args, work_dir: str, environment: dict):
+    """
+    Start the app under gunicorn with gunicorn.conf.py, its caches in work_dir.
+
+    Returns:
+        tuple: (subprocess.Popen, base URL), once the server answers
+    """
+    port = free_port()
+    env = dict(os.environ, **environment)
+    env.update({
+        'WEB_CONCURRENCY': str(args.workers),
+        'GUNICORN_THREADS': str(args.threads),
+        'GUNICORN_WORKER_CLASS': args.worker_class,
+        'GUNICORN_PRELOAD': 'true' if args.preload else 'false',
+        'GUNICORN_ACCESS_LOG': '',
+        'SDL_AUDIODRIVER': env.get('SDL_AUDIODRIVER', 'dummy'),
+        'LLM_CACHE_PATH': '',
+        'ARTICLE_STORE_PATH': '',
+        'AUDIO_CACHE_DIR': os.path.join(work_dir, 'audio'),
+        # One snapshot and refresh lock for all workers, as in a single-host deployment
+        'CACHE_BACKEND_URL': f"sqlite:///{os.path.join(work_dir, 'shared_cache.sqlite')}",
+        'NEWS_REFRESH_INTERVAL': '0',
+        'AUDIO_WARMUP_VARIANTS': '0',
+        'AUDIO_WARMUP_REPORT': 'false',
+        'METRICS_SPAN_LOG': 'false',
+    })
+    log = open(os.path.join(work_dir, 'gunicorn.log'), 'wb')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited; see {log.name}")
+        try:
+            if requests.get(f"{base_url}/metrics", timeout=1).status_code == 200:
+                return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"gunicorn did not start within 60s; see {log.name}")
+
+
+def listener_session(base_url: str, listener: dict):
+    """An HTTP session for a simulated listener, with its name and sections saved as preferences"""
+    client = requests.Session()
+    check_response('/update_preferences', client.post(
+        f"{base_url}/update_preferences",
+        data={'user_name': listener['user_name'], 'sections': listener['sections']}
+    ))
+    return client
+
+
+def bench_saturate(args):
+    """
+    Ramp up simulated listeners against the app under gunicorn (or --url) and
+    find the load at which throughput stops growing or latency exceeds the target.
+    """
+    if args.url:
+        base_url, server_process, stubs = args.url.rstrip('/'), None, None
+    else:
+        # Stubs run in their own process so they do not compete with the load generator for the GIL
+        ports = multiprocessing.Queue()
+        stubs = multiprocessing.Process(target=serve_stub_upstreams, args=(args, ports), daemon=True)
+        stubs.start()
+        work_dir = tempfile.mkdtemp(prefix='news_bench_')
+        server_process, base_url = start_gunicorn(args, work_dir, stub_environment(ports.get(timeout=30)))
+        print(f"gunicorn: {args.workers} {args.worker_class} worker(s) x {args.threads} thread(s), "
+              f"preload={'on' if args.preload else 'off'}, log in {work_dir}")
+
+    measure = (lambda: process_tree_rss(server_process.pid)) if server_process else (lambda: 0)
+    routes = ['/get_news', '/get_headlines_audio', '/report_audio.mp3']
+    steps, rows = [int(count) for count in args.listeners.split(',')], []
+    try:
+        # Untimed warm-up: the first request waits for the initial refresh
+        check_response('/get_news', requests.get(f"{base_url}/get_news", timeout=args.request_timeout))
+
+        for count in steps:
+            listeners = make_listeners(count, args.sections.split(','), args.seed + count)
+            clients = [listener_session(base_url, listener) for listener in listeners]
+            next_route = [itertools.cycle(routes[index % len(routes):] + routes[:index % len(routes)])
+                          for index in range(count)]
+
+            def hit_route(index):
+                route = next(next_route[index])
+                response = clients[index].get(f"{base_url}{route}", timeout=args.request_timeout)
+                check_response(route, response)
+                if args.think_time:
+                    time.sleep(random.uniform(0, 2 * args.think_time))
+                return route
+
+            cpu_start = sum(os.times()[:2])
+            with RSSSampler(interval=0.1, measure=measure) as rss:
+                latencies, errors, elapsed = run_concurrent(hit_route, 0, count, duration=args.duration)
+            client_cpu = (sum(os.times()[:2]) - cpu_start) / elapsed
+
+            values = [latency for route_latencies in latencies.values() for latency in route_latencies]
+            row = summarize_run(f"{count} listeners", {'': values}, {'': sum(errors.values())},
+                                elapsed, rss.peak)[0] if values else None
+            if row is None:
+                print(f"{count} listeners: no request finished within {args.duration}s")
+                break
+            row.update(listeners=count, client_cpu=round(client_cpu, 2),
+                       routes=summarize_run('', latencies, errors, elapsed, rss.peak))
+            rows.append(row)
+            print(f"{count:>4} listeners  {row['throughput']:>7.2f} req/s  p50={row['p50_ms']:.0f}ms "
+                  f"p95={row['p95_ms']:.0f}ms p99={row['p99_ms']:.0f}ms errors={row['errors']}/{row['requests']} "
+                  f"server RSS={row['peak_rss_mb']:.0f}MB client CPU={client_cpu:.0%}")
+            for client in clients:
+                client.close()
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait(timeout=30)
+        if stubs is not None:
+            stubs.terminate()
+
+    print()
+    print_results([route for row in rows for route in
+                   [dict(route, scenario=f"{row['listeners']} listeners {route['scenario']}") for route in row['routes']]])
+    print()
+    saturation = find_saturation(rows, args.slo, args.max_error_rate, args.min_growth)
+    if saturation is None:
+        print(f"No saturation up to {steps[-1]} listeners; peak {max(row['throughput'] for row in rows):.2f} req/s. "
+              f"Add larger steps with --listeners.")
+    else:
+        row, reason = saturation
+        print(f"Saturated at {row['listeners']} listeners: {reason}.")
+        index = rows.index(row)
+        if index:
+            capacity = rows[index - 1]
+            per_worker = f", about {capacity['throughput'] / args.workers:.2f} req/s per worker" if not args.url else ''
+            print(f"Last step before saturation: {capacity['listeners']} concurrent listeners at "
+                  f"{capacity['throughput']:.2f} req/s, p95 {capacity['p95_ms']:.0f}ms{per_worker}.")
+        else:
+            print("Already saturated at the first step; start the ramp lower or raise --slo.")
+    if any(row['client_cpu'] > 0.8 for row in rows):
+        print("Warning: the load generator used more than 80% of a CPU core; "
+              "run it on another machine against --url for higher loads.")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': {key: value for key, value in vars(args).items() if key != 'func'},
+                       'steps': rows}, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+def find_saturation(rows: list, slo_ms: float, max_error_rate: float, min_growth: float):
+    """
+    Find the first ramp step at which the server is saturated.
+
+    A step is saturated when its error rate exceeds max_error_rate, its p95
+    latency exceeds slo_ms, or adding listeners raised throughput by less than
+    min_growth (a fraction) over the previous step.
+
+    Returns:
+        tuple: (row, reason), or None if no step is saturated
+    """
+    previous = None
+    for row in rows:
+        if row['requests'] and row['errors'] / row['requests'] > max_error_rate:
+            return row, f"{row['errors']} of {row['requests']} requests failed"
+        if row['p95_ms'] > slo_ms:
+            return row, f"p95 latency {row['p95_ms']:.0f}ms is above the {slo_ms:.0f}ms target"
+        if previous is not None and row['throughput'] < previous['throughput'] * (1 + min_growth):
+            return row, (f"throughput went from {previous['throughput']:.2f} to {row['throughput']:.2f} req/s "
+                         f"as listeners went from {previous['listeners']} to {row['listeners']}")
+        previous = row
+    return None
+
+
+def serve_stubs(args):
+    """Serve the stub upstreams in the foreground, for load tests against a separately started server"""
+    servers = start_stub_servers(args)
+    print("Point the app at the stubs with:")
+    for name, value in stub_environment({name: server.server_address[1] for name, server in servers.items()}).items():
+        print(f"export {name}={value}")
+    print("Press Ctrl-C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        for server in servers.values():
+            server.shutdown()
+
+
+# Packages that must not be imported just by importing the project's modules
+HEAVY_IMPORTS = ('anthropic', 'elevenlabs', 'pygame', 'newspaper', 'bs4')
+
+
+def measure_import(module: str) -> tuple:
+    """
+    Import module in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (cumulative import time of module in seconds,
+                {top-level package: cumulative seconds} of everything it imported)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=dict(os.environ, SDL_AUDIODRIVER=os.environ.get('SDL_AUDIODRIVER', 'dummy')),
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    # Nested imports are listed before the import that triggered them, indented
+    # one level deeper; the module's own import tree ends at its top-level line
+    total, packages, tree = 0.0, {}, []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        tree.append((name.strip(), int(cumulative) / 1e6))
+        if name.startswith('  '):
+            continue
+        if name.strip() == module:
+            total = tree[-1][1]
+            for imported, seconds in tree[:-1]:
+                top = imported.split('.')[0]
+                packages[top] = max(packages.get(top, 0.0), seconds)
+            break
+        tree = []
+    return total, packages
+
+
+def bench_imports(args):
+    """Measure how long importing each entry module takes and check that heavy SDKs stay lazy"""
+    failures = []
+    for module in args.modules.split(','):
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        median = statistics.median(total for total, _ in runs)
+        packages = runs[-1][1]
+        heavy = [name for name in args.forbid.split(',') if name and name in packages]
+        slowest = sorted((item for item in packages.items() if item[0] != module), key=lambda item: -item[1])
+        print(f"{module:<12} median={median * 1000:.1f}ms min={min(total for total, _ in runs) * 1000:.1f}ms "
+              f"slowest: " + ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in slowest[:args.top]))
+        if heavy:
+            failures.append(f"import {module} loads {', '.join(heavy)}")
+        if args.max_ms and median * 1000 > args.max_ms:
+            failures.append(f"import {module} took {median * 1000:.1f}ms (budget {args.max_ms:.0f}ms)")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+
+
+def record_fixtures(args):
+    """Save live NYT Top Stories responses as fixtures (needs NYT_API_KEY)"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv('NYT_API_KEY')
+    if not api_key:
+        sys.exit("NYT_API_KEY is not set")
+    directory = os.path.join(FIXTURES_DIR, 'nyt')
+    os.makedirs(directory, exist_ok=True)
+    for section in args.sections.split(','):
+        response = requests.get(f"{scraper.NYT_API_BASE}/{section}.json", params={'api-key': api_key},
+                                timeout=scraper.DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        with open(os.path.join(directory, f"{section}.json"), 'w', encoding='utf-8') as f:
+            json.dump(response.json(), f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"Recorded {section}: {len(response.json().get('results', []))} stories")
+
+
+def add_stub_arguments(parser) -> None:
+    """Add the stub upstream latency options to a subcommand parser"""
+    parser.add_argument('--nyt-latency', type=float, default=0.1,
+                        help='Stub NYT response latency in seconds (default: 0.1)')
+    parser.add_argument('--claude-latency', type=float, default=0.3,
+                        help='Stub Claude latency to the first byte in seconds (default: 0.3)')
+    parser.add_argument('--tts-latency', type=float, default=0.2,
+                        help='Stub ElevenLabs latency to the first byte in seconds (default: 0.2)')
+    parser.add_argument('--jitter', type=float, default=0.05,
+                        help='Extra random latency in seconds for every stub (default: 0.05)')
+    parser.add_argument('--chunk-delay', type=float, default=0.005,
+                        help='Delay between chunks of streamed stub responses (default: 0.005)')
+
+
+def main():
+    """Run offline benchmarks against local stub services"""
+    parser = argparse.ArgumentParser(description='News Summarization Agent benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fetch_parser = subparsers.add_parser('fetch', help='Benchmark NYT section fetching')
+    fetch_parser.add_argument('--latency', type=float, default=0.2,
+                              help='Stub NYT response latency in seconds (default: 0.2)')
+    fetch_parser.add_argument('--jitter', type=float, default=0.0,
+                              help='Extra random latency in seconds (default: 0.0)')
+    fetch_parser.add_argument('--workers', type=int, default=scraper.DEFAULT_MAX_WORKERS,
+                              help='Concurrent fetch workers (default: 5)')
+    fetch_parser.add_argument('--repeat', type=int, default=5,
+                              help='Number of runs per mode (default: 5)')
+    fetch_parser.set_defaults(func=bench_fetch)
+
+    analyze_parser = subparsers.add_parser('analyze', help='Benchmark serial, parallel and batched theme extraction')
+    analyze_parser.add_argument('--latency', type=float, default=0.3,
+                                help='Stub Claude response latency in seconds (default: 0.3)')
+    analyze_parser.add_argument('--jitter', type=float, default=0.0,
+                                help='Extra random latency in seconds (default: 0.0)')
+    analyze_parser.add_argument('--concurrency', type=int, default=5,
+                                help='Parallel theme extraction limit (default: 5)')
+    analyze_parser.add_argument('--rate-limit', type=int, default=0,
+                                help='Simulate 429s above this many requests in flight (default: off)')
+    analyze_parser.add_argument('--repeat', type=int, default=3,
+                                help='Number of runs per mode (default: 3)')
+    analyze_parser.set_defaults(func=bench_analyze)
+
+    load_parser = subparsers.add_parser(
+        'load', help='Benchmark fetching, analysis, reports and audio routes under concurrent load '
+                     '(NYT stub serves the synthetic feeds in fixtures/nyt/)'
+    )
+    load_parser.add_argument('--scenarios', default='fetch,analyze,report,routes',
+                             help='Comma-separated scenarios to run (default: fetch,analyze,report,routes)')
+    load_parser.add_argument('--concurrency', type=int, default=8,
+                             help='Concurrent clients (default: 8)')
+    load_parser.add_argument('--requests', type=int, default=48,
+                             help='Operations per scenario (default: 48)')
+    add_stub_arguments(load_parser)
+    load_parser.add_argument('--claude-concurrency', type=int, default=5,
+                             help='Parallel theme extraction limit (default: 5)')
+    load_parser.add_argument('--seed', type=int, default=0,
+                             help='Seed for the simulated listeners (default: 0)')
+    load_parser.add_argument('--output', help='Save results as JSON to this file')
+    load_parser.add_argument('--baseline', help='Compare with results saved by --output; exit 1 on regressions')
+    load_parser.add_argument('--tolerance', type=float, default=0.2,
+                             help='Allowed change before a difference counts as a regression (default: 0.2)')
+    load_parser.add_argument('--verbose', action='store_true', help='Show output of the code under test')
+    load_parser.set_defaults(func=bench_load)
+
+    saturate_parser = subparsers.add_parser(
+        'saturate', help='Ramp up simulated listeners against gunicorn and report where the server saturates'
+    )
+    saturate_parser.add_argument('--listeners', default='1,2,4,8,16,32,64',
+                                 help='Comma-separated concurrent listener counts to ramp through '
+                                      '(default: 1,2,4,8,16,32,64)')
+    saturate_parser.add_argument('--duration', type=float, default=15,
+                                 help='Seconds each step runs (default: 15)')
+    saturate_parser.add_argument('--think-time', type=float, default=0.0,
+                                 help='Mean pause in seconds between a listener\'s requests (default: 0)')
+    saturate_parser.add_argument('--sections', default='world,business,technology,science,health,us,politics',
+                                 help='Sections listeners choose from (default: world,business,technology,'
+                                      'science,health,us,politics)')
+    saturate_parser.add_argument('--slo', type=float, default=5000,
+                                 help='p95 latency target in milliseconds (default: 5000)')
+    saturate_parser.add_argument('--max-error-rate', type=float, default=0.01,
+                                 help='Largest acceptable fraction of failed requests (default: 0.01)')
+    saturate_parser.add_argument('--min-growth', type=float, default=0.1,
+                                 help='Smallest throughput gain per step before the server counts as '
+                                      'saturated (default: 0.1)')
+    saturate_parser.add_argument('--request-timeout', type=float, default=120,
+                                 help='Client timeout per request in seconds (default: 120)')
+    saturate_parser.add_argument('--url', help='Load an already running server instead of starting gunicorn '
+                                               '(start its upstream stubs with: benchmark.py stubs)')
+    saturate_parser.add_argument('--workers', type=int, default=2,
+                                 help='gunicorn worker processes (default: 2)')
+    saturate_parser.add_argument('--threads', type=int, default=8,
+                                 help='Threads per gunicorn worker (default: 8)')
+    saturate_parser.add_argument('--worker-class', default='gthread',
+                                 help='gunicorn worker class (default: gthread)')
+    saturate_parser.add_argument('--no-preload', dest='preload', action='store_false',
+                                 help='Import the app in each worker instead of once before forking')
+    saturate_parser.add_argument('--seed', type=int, default=0,
+                                 help='Seed for the simulated listeners (default: 0)')
+    saturate_parser.add_argument('--output', help='Save the ramp results as JSON to this file')
+    add_stub_arguments(saturate_parser)
+    saturate_parser.set_defaults(func=bench_saturate)
+
+    stubs_parser = subparsers.add_parser('stubs', help='Serve the stub NYT (synthetic fixture feeds), Claude and ElevenLabs APIs')
+    add_stub_arguments(stubs_parser)
+    stubs_parser.set_defaults(func=serve_stubs)
+
+    imports_parser = subparsers.add_parser(
+        'imports', help='Measure module import time (-X importtime) and check heavy SDKs are imported lazily'
+    )
+    imports_parser.add_argument('--modules', default='main,app,pipeline,analyzer,scraper,voice_agent',
+                                help='Comma-separated modules to import (default: main,app,pipeline,'
+                                     'analyzer,scraper,voice_agent)')
+    imports_parser.add_argument('--repeat', type=int, default=5,
+                                help='Fresh interpreters per module (default: 5)')
+    imports_parser.add_argument('--forbid', default=','.join(HEAVY_IMPORTS),
+                                help='Packages importing a module must not load; exit 1 if one does '
+                                     f'(default: {",".join(HEAVY_IMPORTS)})')
+    imports_parser.add_argument('--max-ms', type=float, default=0,
+                                help='Exit 1 if a module\'s median import time exceeds this (default: off)')
+    imports_parser.add_argument('--top', type=int, default=3,
+                                help='Slowest imported packages listed per module (default: 3)')
+    imports_parser.set_defaults(func=bench_imports)
+
+    record_parser = subparsers.add_parser('record', help='Replace the synthetic NYT fixtures with live feeds (needs NYT_API_KEY)')
+    record_parser.add_argument('--sections', default=','.join(scraper.DEFAULT_SECTIONS),
+                               help='Comma-separated sections to record (default: the default sections)')
+    record_parser.set_defaults(func=record_fixtures)
+
+    args = parser.parse_args()
+    if args.command == 'load':
+        args.scenarios = args.scenarios.split(',')
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+from metrics import metrics
+from sqlite_local import ThreadLocalConnection
+
+# Bump when the layout of cached values changes so old entries are ignored
+KEY_VERSION = 1
+
+def versioned_key(*parts: str) -> str:
+    """
+    Build a namespaced key that includes the current KEY_VERSION.
+
+    Example:
+        versioned_key('snapshot') -> 'news:v1:snapshot'
+    """
+    return ":".join(["news", f"v{KEY_VERSION}", *parts])
+
+class LockTimeout(Exception):
+    """Raised when a cross-process lock could not be acquired in time"""
+
+class CacheBackend(ABC):
+    """
+    Key/value store shared by every worker that points at the same backend.
+
+    Values are bytes. Implementations also provide a named lock so that only one
+    worker at a time performs expensive work such as a news refresh.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored under key, or None if missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """Store value under key, expiring after ttl seconds if given"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove key if present"""
+
+    @abstractmethod
+    def lock(self, name: str, ttl: float = 600, wait: float = 600):
+        """
+        Context manager holding a named lock for the duration of the block.
+
+        Args:
+            name (str): Lock name
+            ttl (float): Seconds after which a lock held by a crashed worker is released
+            wait (float): Seconds to wait for the lock before raising LockTimeout
+        """
+
+def _lock_release_failed(backend: str, name: str, error) -> None:
+    """Log and count a lock that could not be released by its holder"""
+    print(f"Error releasing lock {name}: {error}")
+    metrics.inc("cache_lock_release_failures_total", backend=backend)
+
+class MemoryBackend(CacheBackend):
+    """In-process backend; only shared between threads of one worker"""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._named_locks: Dict[str, threading.Lock] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    @contextmanager
+    def lock(self, name: str, ttl: float = 600, wait: float = 600) -> Iterator[None]:
+        with self._lock:
+            named_lock = self._named_locks.setdefault(name, threading.Lock())
+        if not named_lock.acquire(timeout=wait):
+            raise LockTimeout(name)
+        try:
+            yield
+        finally:
+            named_lock.release()
+
+class SQLiteBackend(CacheBackend):
+    """
+    Backend stored in a SQLite file, shared by all processes on one host.
+
+    Locks are rows in a locks table with an owner token and expiry, so a lock held
+    by a worker that died is taken over once its ttl has passed.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.1):
+        """
+        Open (or create) the database.
+
+        Args:
+            path (str): SQLite database file
+            poll_interval (float): Seconds between attempts while waiting for a lock
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._db = ThreadLocalConnection(path)
+
+        with self._db.connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS locks (
+                    name TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires REAL NOT NULL
+                )
+            """)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._db.connect() as conn:
+            row = conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] < time.time():
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            return bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        expires = now + ttl if ttl else None
+        with self._db.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                (key, sqlite3.Binary(value), expires)
+            )
+            conn.execute("DELETE FROM entries WHERE expires < ?", (now,))
+
+    def delete(self, key: str) -> None:
+        with self._db.connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _try_acquire(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._db.connect() as conn:
+            conn.execute("DELETE FROM locks WHERE name = ? AND expires < ?", (name, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO locks (name, owner, expires) VALUES (?, ?, ?)",
+                (name, owner, now + ttl)
+            )
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def lock(self, name: str, ttl: float = 600, wait: float = 600) -> Iterator[None]:
+        owner = uuid.uuid4().hex
+        deadline = time.time() + wait
+        while not self._try_acquire(name, owner, ttl):
+            if time.time() >= deadline:
+                raise LockTimeout(name)
+            time.sleep(self.poll_interval)
+        try:
+            yield
+        finally:
+            with self._db.connect() as conn:
+                cursor = conn.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+            if cursor.rowcount == 0:
+                # Held past its ttl and taken over by another worker
+                _lock_release_failed("sqlite", name, "lock expired before release")
+
+class RedisBackend(CacheBackend):
+    """
+    Backend on a Redis-protocol server, shared by workers on any number of hosts.
+
+    Requires the redis package; any server speaking the Redis protocol works.
+    """
+
+    def __init__(self, url: str):
+        """
+        Args:
+            url (str): Connection URL, e.g. redis://localhost:6379/0
+        """
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("The redis package is required for redis:// cache backends (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    @contextmanager
+    def lock(self, name: str, ttl: float = 600, wait: float = 600) -> Iterator[None]:
+        redis_lock = self.client.lock(versioned_key("lock", name), timeout=ttl, blocking_timeout=wait)
+        if not redis_lock.acquire():
+            raise LockTimeout(name)
+        try:
+            yield
+        finally:
+            try:
+                redis_lock.release()
+            except Exception as e:
+                _lock_release_failed("redis", name, e)
+
+def create_backend(url: str) -> CacheBackend:
+    """
+    Create a backend from a URL.
+
+    Supported URLs:
+        memory://                      - this process only
+        sqlite:///path/to/cache.sqlite - all workers on this host
+        redis://host:port/db           - all workers that can reach the server
+
+    Raises:
+        ValueError: For an unsupported scheme
+    """
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme == "sqlite":
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
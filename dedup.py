@@ -0,0 +1,175 @@
+import re
+import zlib
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit, urlunsplit
+
+# Large prime for the MinHash permutations (a * x + b) mod _PRIME
+_PRIME = (1 << 61) - 1
+
+def normalize_url(url: str) -> str:
+    """URL without query string, fragment or trailing slash, for exact-duplicate matching"""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), '', ''))
+
+def normalize_title(title: str) -> str:
+    """Lowercase title with punctuation removed and whitespace collapsed"""
+    return " ".join(re.sub(r"[^\w\s]", " ", title.lower()).split())
+
+def shingles(text: str) -> Set[str]:
+    """Words of a normalized title"""
+    return set(text.split())
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two shingle sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class DedupIndex:
+    """
+    Finds stories that were already seen, by URL or by near-identical title.
+
+    Titles are compared on their words. MinHash signatures split into LSH bands
+    pick candidate matches, which are then confirmed with the exact Jaccard
+    similarity, so lookups stay cheap as the index grows.
+
+    Headlines written from a template ("Apple Reports Surprise in Trade Talks",
+    "Google Reports ...") differ in a single word, so a title match only counts
+    when it is corroborated: the article is in a section the story was not seen
+    in yet, and it has the same publish time or the same abstract.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 32, bands: int = 8):
+        """
+        Args:
+            threshold (float): Minimum Jaccard similarity of title words to count as the same story
+            num_perm (int): MinHash signature length
+            bands (int): LSH bands (num_perm must be divisible by bands)
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._permutations = [(2 * seed + 1, seed * 7919 + 17) for seed in range(1, num_perm + 1)]
+        self._urls: Dict[str, int] = {}
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._stories: List[Dict] = []
+
+    def _signature(self, items: Set[str]) -> List[int]:
+        hashes = [zlib.crc32(item.encode('utf-8')) for item in items]
+        return [min((a * h + b) % _PRIME for h in hashes) for a, b in self._permutations]
+
+    def _band_keys(self, signature: List[int]) -> List[tuple]:
+        return [(band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def _corroborates(self, story: int, article: Dict, section: str) -> bool:
+        """Whether a title match with story is backed by the section, publish time or abstract"""
+        entry = self._stories[story]
+        if section in entry['sections']:
+            return False
+        published = article.get('published_date')
+        abstract = normalize_title(article.get('abstract') or '')
+        return bool(published and published == entry['published_date']
+                    or abstract and abstract == entry['abstract'])
+
+    def find(self, article: Dict, section: str) -> Optional[int]:
+        """
+        Look up the story an article belongs to.
+
+        Args:
+            article (Dict): Article with 'url', 'title' and optionally 'published_date' and 'abstract'
+            section (str): Section the article is listed under
+
+        Returns:
+            int: Story id from add(), or None if the article is a new story
+        """
+        url = normalize_url(article.get('url', ''))
+        if url and url in self._urls:
+            return self._urls[url]
+
+        items = shingles(normalize_title(article.get('title', '')))
+        candidates = set()
+        for key in self._band_keys(self._signature(items)):
+            candidates.update(self._buckets.get(key, []))
+        scored = sorted(((jaccard(items, self._stories[story]['shingles']), story) for story in candidates), reverse=True)
+        for similarity, story in scored:
+            if similarity < self.threshold:
+                break
+            if self._corroborates(story, article, section):
+                return story
+        return None
+
+    def add(self, article: Dict, section: str, story: Optional[int] = None) -> int:
+        """
+        Index an article, as a new story or as another copy of an existing one.
+
+        Returns:
+            int: The article's story id
+        """
+        if story is None:
+            items = shingles(normalize_title(article.get('title', '')))
+            story = len(self._stories)
+            self._stories.append({
+                'shingles': items,
+                'sections': set(),
+                'published_date': article.get('published_date'),
+                'abstract': normalize_title(article.get('abstract') or '')
+            })
+            for key in self._band_keys(self._signature(items)):
+                self._buckets.setdefault(key, []).append(story)
+        self._stories[story]['sections'].add(section)
+        url = normalize_url(article.get('url', ''))
+        if url:
+            self._urls.setdefault(url, story)
+        return story
+
+def dedupe_sections(news_data: Dict[str, List[Dict]], threshold: float = 0.8) -> Dict[str, List[Dict]]:
+    """
+    Keep each story in only one section.
+
+    A story's canonical section is the one NYT files it under ('nyt_section')
+    when that section was fetched, otherwise the first section listing it. The
+    kept article lists the other sections under 'also_in'. Article order within
+    each section is preserved and sections left empty are dropped.
+
+    Copies are matched by URL, or by title in another section when the publish
+    time or abstract agrees as well (see DedupIndex). Articles of one section
+    with different URLs are never merged.
+
+    Args:
+        news_data (Dict[str, List[Dict]]): Articles by section, as from get_all_articles
+        threshold (float): Minimum title similarity for near-duplicates
+
+    Returns:
+        Dict[str, List[Dict]]: Deduplicated articles by section
+    """
+    index = DedupIndex(threshold)
+    copies: List[List[tuple]] = []
+    for section, articles in news_data.items():
+        for article in articles:
+            story = index.find(article, section)
+            story = index.add(article, section, story)
+            if story == len(copies):
+                copies.append([])
+            copies[story].append((section, article))
+
+    canonical = set()
+    for story_copies in copies:
+        section, article = next(
+            ((s, a) for s, a in story_copies if a.get('nyt_section') == s),
+            story_copies[0]
+        )
+        others = [s for s in dict.fromkeys(s for s, _ in story_copies) if s != section]
+        if others:
+            article['also_in'] = others
+        canonical.add(id(article))
+
+    deduped = {}
+    for section, articles in news_data.items():
+        kept = [article for article in articles if id(article) in canonical]
+        if kept:
+            deduped[section] = kept
+    removed = sum(len(articles) for articles in news_data.values()) - sum(len(articles) for articles in deduped.values())
+    if removed:
+        print(f"Removed {removed} duplicate articles across sections")
+    return deduped
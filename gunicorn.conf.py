@@ -0,0 +1,37 @@
+# Production serving profile for the web app; gunicorn reads this file
+# automatically when started from this directory (gunicorn app:app).
+# Requests spend most of their time waiting on NYT, Claude and ElevenLabs, so
+# each worker process runs a pool of threads (gthread) instead of handling one
+# request at a time. Settings come from the environment (see .env.example).
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5001')}")
+
+# Worker processes (default: one per CPU core, at least two)
+workers = int(os.getenv('WEB_CONCURRENCY', str(max(2, multiprocessing.cpu_count()))))
+
+# Threads per worker; each request in an async view runs its own event loop on one of them
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Import the app once in the master and fork workers from it: workers boot faster
+# and share the imported modules' memory pages until they write to them
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# A report generated from scratch, or a long report read aloud, can take minutes
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Restart workers now and then so slow leaks cannot grow without bound (0 = never)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
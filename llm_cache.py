@@ -0,0 +1,142 @@
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from sqlite_local import ThreadLocalConnection
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache of LLM responses backed by SQLite.
+
+    Entries are keyed by a hash of the model, prompt and request parameters, expire
+    after a TTL and are evicted least-recently-used once the store exceeds its size
+    limit. SQLite's WAL mode and busy timeout make the file safe to share between
+    processes, e.g. several gunicorn workers on one host.
+    """
+
+    def __init__(self, path: str, ttl: float = 86400, max_bytes: int = 50 * 1024 * 1024):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): SQLite database file
+            ttl (float): Seconds an entry stays valid
+            max_bytes (int): Maximum total size of cached responses before LRU eviction
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._db = ThreadLocalConnection(path)
+
+        with self._db.connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    @staticmethod
+    def make_key(model: str, prompt: str, **params) -> str:
+        """
+        Build the cache key for a request.
+
+        Args:
+            model (str): Model name
+            prompt (str): Prompt text
+            **params: Any other request parameters that affect the response (max_tokens, ...)
+
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        payload = json.dumps({"model": model, "prompt": prompt, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _bump(self, conn: sqlite3.Connection, name: str) -> None:
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Key from make_key()
+
+        Returns:
+            str: Cached response, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._db.connect() as conn:
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._bump(conn, "misses")
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._bump(conn, "hits")
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store a response and evict old entries if the cache is over its size limit.
+
+        Args:
+            key (str): Key from make_key()
+            value (str): Response text
+        """
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._db.connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least-recently-used ones until under max_bytes"""
+        conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._bump(conn, "evictions")
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics, aggregated across every process using this file.
+
+        Returns:
+            Dict[str, int]: hits, misses, evictions, entries and bytes
+        """
+        with self._db.connect() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "entries": entries,
+            "bytes": total
+        }
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._db.connect() as conn:
+            conn.execute("DELETE FROM responses")
@@ -1,5 +1,8 @@
-from scraper import get_all_articles
-from analyzer import NewsAnalyzer
+from pipeline import run_pipeline
+from scraper import ArticleEnricher, DEFAULT_SECTIONS, NYT_SECTIONS, section_label
+from llm_cache import LLMCache
+from article_store import ArticleStore
+from audio_cache import AudioCache
 from voice_agent import VoiceAgent
 import argparse
 import os
@@ -39,9 +42,41 @@ def main():
                         help='Voice clarity/similarity (0.0-1.0, default: 0.75)')
     parser.add_argument('--voice-style', type=float, default=float(os.getenv('VOICE_STYLE', '0.5')),
                         help='Speaking style amount (0.0-1.0, default: 0.5)')
+    parser.add_argument('--fetch-workers', type=int, default=int(os.getenv('NYT_FETCH_WORKERS', '5')),
+                        help='Number of NYT sections fetched in parallel (default: 5, 1 = sequential)')
+    parser.add_argument('--fetch-timeout', type=float, default=float(os.getenv('NYT_TIMEOUT', '10')),
+                        help='Timeout in seconds for each NYT request (default: 10)')
+    parser.add_argument('--claude-concurrency', type=int, default=int(os.getenv('CLAUDE_MAX_CONCURRENCY', '5')),
+                        help='Maximum number of Claude requests in flight (default: 5)')
+    parser.add_argument('--batch-themes', action='store_true',
+                        default=os.getenv('CLAUDE_BATCH_THEMES', 'false').lower() == 'true',
+                        help='Extract all sections\' themes with a single Claude call')
+    parser.add_argument('--prompt-budget', type=int, default=int(os.getenv('CLAUDE_PROMPT_TOKEN_BUDGET', '4000')),
+                        help='Estimated tokens each Claude prompt may use; articles are trimmed to fit (default: 4000, 0 for no limit)')
+    parser.add_argument('--sections', default=','.join(DEFAULT_SECTIONS),
+                        help='Comma-separated NYT sections to fetch and read (default: %(default)s)')
+    parser.add_argument('--no-dedupe', action='store_true',
+                        default=os.getenv('NEWS_DEDUPE', 'true').lower() != 'true',
+                        help='Keep stories listed under several sections in each of them')
+    parser.add_argument('--llm-cache', default=os.getenv('LLM_CACHE_PATH', '.cache/llm_cache.sqlite'),
+                        help='Claude response cache file (default: from LLM_CACHE_PATH env var, "" to disable)')
+    parser.add_argument('--audio-cache', default=os.getenv('AUDIO_CACHE_DIR', '.cache/audio'),
+                        help='Directory for cached speech audio (default: from AUDIO_CACHE_DIR env var, "" to disable)')
+    parser.add_argument('--article-store', default=os.getenv('ARTICLE_STORE_PATH', '.cache/articles.sqlite'),
+                        help='SQLite file of downloaded feeds and articles (default: from ARTICLE_STORE_PATH env var, "" to disable)')
+    parser.add_argument('--full-text', action='store_true',
+                        default=os.getenv('ARTICLE_FULL_TEXT', 'false').lower() == 'true',
+                        help='Download full article text for analysis instead of using only abstracts')
+    parser.add_argument('--prefetch', type=int, default=int(os.getenv('TTS_PREFETCH', '2')),
+                        help='Speech segments synthesized ahead of playback (default: 2, 0 to disable)')
     
     args = parser.parse_args()
     
+    sections = [s.strip().lower() for s in args.sections.split(',') if s.strip()]
+    unknown = [s for s in sections if s not in NYT_SECTIONS]
+    if unknown or not sections:
+        parser.error(f"unknown section(s) {', '.join(unknown)}; choose from {', '.join(NYT_SECTIONS)}")
+    
     # Check if required API keys are available
     if not args.nyt_api_key:
         print("Error: New York Times API key not provided. Set NYT_API_KEY environment variable or use --nyt-api-key")
@@ -60,7 +95,7 @@ def main():
     # If just listing voices, do that and exit
     if args.list_voices and args.eleven_api_key:
         try:
-            voice_agent = VoiceAgent(api_key=args.eleven_api_key)
+            voice_agent = VoiceAgent(api_key=args.eleven_api_key, init_audio=False)
             available_voices = voice_agent.get_available_voices()
             print("\nAvailable ElevenLabs Voices:")
             print("----------------------------")
@@ -73,20 +108,36 @@ def main():
             print(f"Error listing voices: {e}")
             return
     
-    # Get all articles using NYT API
-    print("Fetching articles...")
-    news_data = get_all_articles(args.nyt_api_key)
-    
-    # Initialize analyzer
-    print("Analyzing articles...")
-    analyzer = NewsAnalyzer(api_key=args.claude_api_key)
-    
-    # Run analysis
-    analysis = analyzer.analyze_news_data(news_data)
-    
-    # Generate report
-    print("\nGenerating report...\n")
-    report = analyzer.generate_summary_report(analysis)
+    # Fetch, analyze and summarize; sections are analyzed as soon as they arrive
+    print("Fetching and analyzing articles...")
+    llm_cache = LLMCache(
+        args.llm_cache,
+        ttl=float(os.getenv('LLM_CACHE_TTL', '86400')),
+        max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', '50')) * 1024 * 1024)
+    ) if args.llm_cache else None
+    article_store = ArticleStore(args.article_store) if args.article_store else None
+    news_data, analysis, report = run_pipeline(
+        args.nyt_api_key,
+        args.claude_api_key,
+        max_fetch_workers=args.fetch_workers,
+        timeout=args.fetch_timeout,
+        max_claude_concurrency=args.claude_concurrency,
+        batch_themes=args.batch_themes,
+        cache=llm_cache,
+        dedupe=not args.no_dedupe,
+        prompt_token_budget=args.prompt_budget,
+        sections=sections,
+        enricher=ArticleEnricher(
+            max_workers=int(os.getenv('ARTICLE_SCRAPE_WORKERS', '8')),
+            per_domain=int(os.getenv('ARTICLE_SCRAPE_PER_DOMAIN', '2')),
+            timeout=float(os.getenv('ARTICLE_SCRAPE_TIMEOUT', '10')),
+            store=article_store,
+            max_age=float(os.getenv('ARTICLE_STORE_MAX_AGE', '86400'))
+        ) if args.full_text else None,
+        enrich_deadline=float(os.getenv('ARTICLE_SCRAPE_DEADLINE', '60')),
+        store=article_store
+    )
+    print("\nReport generated.\n")
     
     # Print report
     print(report)
@@ -101,7 +152,12 @@ def main():
                 voice_name=args.voice_name,
                 stability=args.voice_stability,
                 clarity=args.voice_clarity,
-                style=args.voice_style
+                style=args.voice_style,
+                audio_cache=AudioCache(
+                    args.audio_cache,
+                    max_bytes=int(float(os.getenv('AUDIO_CACHE_MAX_MB', '200')) * 1024 * 1024)
+                ) if args.audio_cache else None,
+                prefetch=args.prefetch
             )
             
             # Set user name for personalization
@@ -117,7 +173,7 @@ def main():
                 # Take only the first few headlines from each section
                 for headline in headlines[:3]:
                     all_headlines.append(headline)
-                    all_sections.append(section.capitalize())
+                    all_sections.append(section_label(section))
             
             print("\nReading headlines...")
             voice_agent.read_headlines(all_headlines, all_sections)
@@ -128,6 +184,8 @@ def main():
                 print("\nReading full report...")
                 voice_agent.read_summary(report)
         
+        except KeyboardInterrupt:
+            print("Stopped.")
         except Exception as e:
             print(f"Error with voice synthesis: {e}")
             print("Continuing in text-only mode.")
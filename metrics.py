@@ -0,0 +1,211 @@
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds (Prometheus defaults plus two long buckets for Claude/TTS)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Trace of the request being handled in this context, if any
+_current_trace = contextvars.ContextVar('trace', default=None)
+
+class Trace:
+    """Spans (timed stages) recorded while handling one request"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, start: float, duration: float, labels: Dict[str, str]) -> None:
+        """Record one span; start is a time.perf_counter() value"""
+        with self._lock:
+            self.spans.append({
+                'stage': stage,
+                'offset': round(start - self.start, 4),
+                'duration': round(duration, 4),
+                **labels
+            })
+
+    def to_dict(self) -> Dict:
+        """The trace as a JSON-serializable dict, spans ordered by start"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span['offset'])
+        return {
+            'request': self.name,
+            'started_at': self.started_at,
+            'duration': round(time.perf_counter() - self.start, 4),
+            'spans': spans
+        }
+
+def start_trace(name: str) -> contextvars.Token:
+    """Begin a trace for the current request; pass the token to finish_trace"""
+    return _current_trace.set(Trace(name))
+
+def finish_trace(token: contextvars.Token) -> Optional[Trace]:
+    """End the trace begun by start_trace and return it"""
+    trace = _current_trace.get()
+    _current_trace.reset(token)
+    return trace
+
+def in_context(fn: Callable) -> Callable:
+    """
+    Wrap fn to run in a copy of the caller's context.
+
+    Worker pools do not carry context variables into their threads; tasks
+    submitted through this wrapper add their spans to the caller's trace.
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+def _label_key(labels: Dict[str, object]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metrics:
+    """
+    Process-wide counters and latency histograms, rendered in the Prometheus text format.
+
+    Stage timers also add a span to the current request's trace (see start_trace),
+    so the same measurements feed /metrics and the per-request span log.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Args:
+            buckets (Tuple[float, ...]): Histogram bucket upper bounds in seconds
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, List]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Set the HELP text of a metric"""
+        self._help[name] = help_text
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Add to a counter (name should end in _total)"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Add an observation to a histogram"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # [per-bucket counts, sum, count]
+            entry = series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def record(self, stage: str, seconds: float, **labels) -> None:
+        """Record a stage that took seconds and just finished, as a histogram observation and a span"""
+        self.observe('news_stage_seconds', seconds, stage=stage, **labels)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(stage, time.perf_counter() - seconds, seconds, {name: str(value) for name, value in labels.items()})
+
+    @contextmanager
+    def timer(self, stage: str, **labels) -> Iterator[None]:
+        """Time a block as a pipeline stage; exceptions are counted in news_stage_errors_total"""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc('news_stage_errors_total', stage=stage)
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        """Clear every series"""
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+
+    def render(self, gauges: Optional[Dict[str, Dict[tuple, float]]] = None) -> str:
+        """
+        Render every series in the Prometheus text exposition format.
+
+        Args:
+            gauges (Dict, optional): Extra gauges sampled by the caller, as
+                {name: {((label, value), ...): value}}
+
+        Returns:
+            str: Metrics text (content type text/plain; version=0.0.4)
+        """
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {key: (list(entry[0]), entry[1], entry[2]) for key, entry in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+        lines = []
+        def header(name, kind):
+            if name in self._help:
+                lines.append(f'# HELP {name} {self._help[name]}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        for name in sorted(counters):
+            header(name, 'counter')
+            for key, value in sorted(counters[name].items()):
+                lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+
+        for name in sorted(gauges or {}):
+            header(name, 'gauge')
+            for key, value in sorted(gauges[name].items()):
+                lines.append(f'{name}{_format_labels(tuple(key))} {_format_value(value)}')
+
+        for name in sorted(histograms):
+            header(name, 'histogram')
+            for key, (counts, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts + [count - sum(counts)]):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{_format_labels(key + (("le", _format_value(bound)),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(key)} {_format_value(total)}')
+                lines.append(f'{name}_count{_format_labels(key)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+# Registry shared by every module in this process
+metrics = Metrics()
+metrics.describe('news_stage_seconds', 'Duration of pipeline stages (NYT fetch, Claude calls, TTS, encoding)')
+metrics.describe('news_stage_errors_total', 'Pipeline stages that raised')
+metrics.describe('http_request_seconds', 'Duration of HTTP requests by route')
+metrics.describe('claude_input_tokens_total', 'Prompt tokens billed by Claude')
+metrics.describe('claude_output_tokens_total', 'Completion tokens billed by Claude')
+metrics.describe('llm_cache_requests_total', 'Claude response cache lookups by result')
+metrics.describe('audio_cache_requests_total', 'Synthesized speech cache lookups by result')
+metrics.describe('tts_characters_total', 'Characters sent to text-to-speech')
+metrics.describe('tts_audio_bytes_total', 'MP3 bytes produced by text-to-speech')
+metrics.describe('tts_segment_failures_total', 'Script segments text-to-speech failed on (the script is not served)')
+metrics.describe('nyt_responses_total', 'NYT feed responses by outcome')
+metrics.describe('nyt_bytes_total', 'Bytes downloaded from NYT feeds')
+metrics.describe('cache_lock_release_failures_total', 'Shared cache locks that expired or could not be released by their holder')
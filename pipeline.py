@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from scraper import async_get_section_articles, ArticleEnricher, DEFAULT_SECTIONS, DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT
+from analyzer import AsyncNewsAnalyzer, NewsAnalyzer, DEFAULT_PROMPT_TOKEN_BUDGET
+from llm_cache import LLMCache
+from article_store import ArticleStore
+from dedup import dedupe_sections
+
+async def async_run_pipeline(nyt_api_key: str, claude_api_key: str,
+                             max_fetch_workers: int = DEFAULT_MAX_WORKERS,
+                             timeout: float = DEFAULT_TIMEOUT,
+                             max_claude_concurrency: int = 5,
+                             batch_themes: bool = False,
+                             cache: Optional[LLMCache] = None,
+                             previous_analysis: Optional[Dict] = None,
+                             previous_report: Optional[str] = None,
+                             on_report_delta: Optional[Callable[[str], None]] = None,
+                             enricher: Optional[ArticleEnricher] = None,
+                             enrich_deadline: Optional[float] = None,
+                             store: Optional[ArticleStore] = None,
+                             dedupe: bool = False,
+                             prompt_token_budget: Optional[int] = DEFAULT_PROMPT_TOKEN_BUDGET,
+                             sections: Optional[List[str]] = None) -> Tuple[Dict[str, List[Dict]], Dict, str]:
+    """
+    Fetch, analyze and summarize the news on a single event loop.
+
+    Each section's theme extraction starts as soon as that section's articles
+    arrive, so fetching and analysis overlap instead of running as two
+    back-to-back stages. In batched mode all sections are fetched first and
+    their themes extracted with one Claude call. The report is generated once
+    all sections are analyzed.
+
+    With dedupe, every section is fetched before analysis starts so stories
+    listed under several sections can be kept in just one of them.
+
+    Given the previous analysis and report, only sections whose article set
+    changed are re-analyzed, and the previous report is reused when no
+    section's themes changed.
+
+    Args:
+        nyt_api_key (str): NYT API key
+        claude_api_key (str): Anthropic API key
+        max_fetch_workers (int): Maximum number of NYT requests in flight
+        timeout (float): Per-request NYT timeout in seconds
+        max_claude_concurrency (int): Maximum number of Claude requests in flight
+        batch_themes (bool): Extract all sections' themes with a single Claude call
+        cache (LLMCache, optional): Claude response cache; unchanged sections cost no API calls
+        previous_analysis (Dict, optional): Analysis from the last run, for incremental updates
+        previous_report (str, optional): Report from the last run, reused if no themes changed
+        on_report_delta (Callable[[str], None], optional): Called with each piece of report
+            text as Claude streams it (a reused report arrives as one piece)
+        enricher (ArticleEnricher, optional): Downloads full article bodies of sections that
+            are about to be analyzed, so themes are drawn from the text and not just abstracts
+        enrich_deadline (float, optional): Seconds each section's downloads may take
+        store (ArticleStore, optional): Persistent store; unchanged NYT feeds are not downloaded again
+        dedupe (bool): Keep each story in only one section (see dedup.dedupe_sections)
+        prompt_token_budget (int, optional): Estimated tokens each Claude prompt may use (None or 0 = no limit)
+        sections (List[str], optional): Sections to fetch and analyze (default: scraper.DEFAULT_SECTIONS);
+            sections of previous_analysis not listed are dropped
+
+    Returns:
+        Tuple[Dict, Dict, str]: (news_data, analysis, report), with the same shapes as
+            get_all_articles, NewsAnalyzer.analyze_news_data and generate_summary_report
+    """
+    analyzer = NewsAnalyzer(
+        api_key=claude_api_key,
+        max_concurrency=max_claude_concurrency,
+        batch_themes=batch_themes,
+        cache=cache,
+        prompt_token_budget=prompt_token_budget
+    )
+    async_analyzer = AsyncNewsAnalyzer(analyzer)
+    sections = list(sections or DEFAULT_SECTIONS)
+    fetch_limit = asyncio.Semaphore(max(1, max_fetch_workers))
+
+    async def fetch(section):
+        async with fetch_limit:
+            return await async_get_section_articles(section, nyt_api_key, timeout, store)
+
+    async def enrich(articles):
+        if enricher is not None:
+            await asyncio.to_thread(enricher.enrich, articles, enrich_deadline)
+
+    async def generate_report(analysis):
+        if previous_report and not analysis["changed_sections"]:
+            print("No section themes changed, reusing previous report")
+            if on_report_delta is not None:
+                on_report_delta(previous_report)
+            return previous_report
+        if on_report_delta is None:
+            return await async_analyzer.generate_summary_report(analysis)
+        parts = []
+        async for text in async_analyzer.generate_summary_report_stream(analysis):
+            parts.append(text)
+            on_report_delta(text)
+        return "".join(parts)
+
+    async def summarize(analysis):
+        report = await generate_report(analysis)
+        usage = analyzer.usage.summary()
+        if usage:
+            print(f"Claude usage:\n{usage}")
+        return report
+
+    async def analyze(section, articles):
+        reused = analyzer._reusable_section(previous_analysis, section, articles)
+        if reused is not None:
+            return reused
+        await enrich(articles)
+        return await async_analyzer.analyze_section(articles)
+
+    if batch_themes or dedupe:
+        results = await asyncio.gather(*[fetch(section) for section in sections])
+        news_data = {section: articles for section, articles in zip(sections, results) if articles}
+        if dedupe:
+            news_data = dedupe_sections(news_data)
+
+    if batch_themes:
+        await asyncio.gather(*[
+            enrich(articles) for section, articles in news_data.items()
+            if analyzer._reusable_section(previous_analysis, section, articles) is None
+        ])
+        analysis = await async_analyzer.analyze_news_data(news_data, previous_analysis)
+        return news_data, analysis, await summarize(analysis)
+
+    if dedupe:
+        results = await asyncio.gather(*[analyze(section, articles) for section, articles in news_data.items()])
+        section_analyses = dict(zip(news_data, results))
+    else:
+        async def fetch_and_analyze(section):
+            articles = await fetch(section)
+            if not articles:
+                return None, None
+            return articles, await analyze(section, articles)
+
+        results = await asyncio.gather(*[fetch_and_analyze(section) for section in sections])
+        news_data = {}
+        section_analyses = {}
+        for section, (articles, section_analysis) in zip(sections, results):
+            if articles:
+                news_data[section] = articles
+                section_analyses[section] = section_analysis
+
+    analysis = {
+        "timestamp": datetime.now().isoformat(),
+        "sections": section_analyses
+    }
+    analyzer._mark_changed_sections(analysis, previous_analysis)
+
+    return news_data, analysis, await summarize(analysis)
+
+def run_pipeline(nyt_api_key: str, claude_api_key: str,
+                 max_fetch_workers: int = DEFAULT_MAX_WORKERS,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_claude_concurrency: int = 5,
+                 batch_themes: bool = False,
+                 cache: Optional[LLMCache] = None,
+                 previous_analysis: Optional[Dict] = None,
+                 previous_report: Optional[str] = None,
+                 on_report_delta: Optional[Callable[[str], None]] = None,
+                 enricher: Optional[ArticleEnricher] = None,
+                 enrich_deadline: Optional[float] = None,
+                 store: Optional[ArticleStore] = None,
+                 dedupe: bool = False,
+                 prompt_token_budget: Optional[int] = DEFAULT_PROMPT_TOKEN_BUDGET,
+                 sections: Optional[List[str]] = None) -> Tuple[Dict[str, List[Dict]], Dict, str]:
+    """
+    Blocking wrapper around async_run_pipeline for synchronous callers.
+
+    Returns:
+        Tuple[Dict, Dict, str]: (news_data, analysis, report)
+    """
+    return asyncio.run(async_run_pipeline(
+        nyt_api_key, claude_api_key, max_fetch_workers, timeout, max_claude_concurrency, batch_themes, cache,
+        previous_analysis, previous_report, on_report_delta, enricher, enrich_deadline, store, dedupe,
+        prompt_token_budget, sections
+    ))
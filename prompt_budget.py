@@ -0,0 +1,69 @@
+import json
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Rough characters per token for English news text; errs on the high side of the token count
+CHARS_PER_TOKEN = 3.5
+
+def estimate_tokens(text: str) -> int:
+    """Approximate number of Claude tokens in a text"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def compact_json(data) -> str:
+    """JSON without insignificant whitespace or escaped non-ASCII characters"""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+def rank_articles(articles: List[Dict]) -> List[Dict]:
+    """
+    Order articles by importance, most important first.
+
+    Stories listed under several sections come first, then the feed's own
+    (editorial) order.
+    """
+    order = {id(article): index for index, article in enumerate(articles)}
+    return sorted(articles, key=lambda article: (-len(article.get("also_in") or []), order[id(article)]))
+
+def fit_articles(articles: List[Dict], render: Callable[[Dict, bool], str],
+                 budget: Optional[int]) -> Tuple[List[Tuple[Dict, bool]], int, int]:
+    """
+    Choose which articles (and which excerpts) fit in a token budget.
+
+    Excerpts are dropped first, starting with the least important article;
+    if that is not enough, the least important articles are dropped, always
+    keeping at least one.
+
+    Args:
+        articles (List[Dict]): Articles in prompt order
+        render (Callable[[Dict, bool], str]): (article, with_excerpt) -> the article's prompt text
+        budget (int, optional): Tokens available for the articles (None = no limit)
+
+    Returns:
+        Tuple[List[Tuple[Dict, bool]], int, int]: (article, with_excerpt) pairs in the
+            original order, number of excerpts dropped and number of articles dropped
+    """
+    with_excerpt = {id(article): bool(article.get("text")) for article in articles}
+    if budget is None:
+        return [(article, with_excerpt[id(article)]) for article in articles], 0, 0
+
+    cost = {id(article): estimate_tokens(render(article, with_excerpt[id(article)])) for article in articles}
+    total = sum(cost.values())
+    ranked = rank_articles(articles)
+
+    excerpts_dropped = 0
+    for article in reversed(ranked):
+        if total <= budget:
+            break
+        if with_excerpt[id(article)]:
+            with_excerpt[id(article)] = False
+            reduced = estimate_tokens(render(article, False))
+            total -= cost[id(article)] - reduced
+            cost[id(article)] = reduced
+            excerpts_dropped += 1
+
+    kept = list(ranked)
+    while total > budget and len(kept) > 1:
+        total -= cost[id(kept.pop())]
+
+    kept_ids = {id(article) for article in kept}
+    chosen = [(article, with_excerpt[id(article)]) for article in articles if id(article) in kept_ids]
+    return chosen, excerpts_dropped, len(articles) - len(chosen)
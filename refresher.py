@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from cache_backend import CacheBackend, versioned_key
+
+SNAPSHOT_KEY = versioned_key('snapshot')
+GENERATION_KEY = versioned_key('snapshot', 'generation')
+
+class _Flight:
+    """One in-progress refresh that concurrent callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error = None
+
+class NewsRefresher:
+    """
+    Keeps the latest news analysis fresh in the background.
+
+    The current snapshot is a plain dict that is replaced as a whole when a refresh
+    succeeds, so readers always see a complete analysis/report pair. While a refresh
+    runs (or after one fails) the last good snapshot keeps being served
+    (stale-while-revalidate), and concurrent refresh requests share a single
+    in-flight refresh (single-flight).
+
+    With a shared backend the snapshot is published there, and every worker using
+    the same backend serves it. Refreshes take a cross-process lock, and a worker
+    that waited on the lock adopts the snapshot the lock holder just published
+    instead of refreshing again.
+    """
+
+    def __init__(self, refresh_fn: Callable[[Dict], Dict], interval: float = 0,
+                 initial: Optional[Dict] = None, backend: Optional[CacheBackend] = None,
+                 lock_ttl: float = 600, on_refresh: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            refresh_fn (Callable[[Dict], Dict]): Builds a new snapshot from the previous one
+            interval (float): Seconds between background refreshes (0 disables the scheduler)
+            initial (Dict, optional): Snapshot served before the first refresh
+            backend (CacheBackend, optional): Store shared with other workers
+            lock_ttl (float): Longest a refresh may hold the cross-process lock
+            on_refresh (Callable[[Dict], None], optional): Called with each snapshot this
+                process builds (not with ones adopted from other workers)
+        """
+        self.refresh_fn = refresh_fn
+        self.interval = interval
+        self.backend = backend
+        self.lock_ttl = lock_ttl
+        self.on_refresh = on_refresh
+        self._snapshot = initial or {'analysis': None, 'report': None, 'last_updated': None}
+        self._generation = None
+        self._published = None
+        self._lock = threading.Lock()
+        self._flight = None
+        self._thread = None
+        self._thread_pid = None
+        self._stop = threading.Event()
+        self.last_error = None
+
+    @property
+    def snapshot(self) -> Dict:
+        """The last successfully published snapshot"""
+        if self.backend is not None:
+            self._load_shared()
+        return self._snapshot
+
+    @property
+    def refreshing(self) -> bool:
+        """Whether a refresh is currently running"""
+        return self._flight is not None
+
+    def refresh(self, wait: bool = True) -> Dict:
+        """
+        Refresh the snapshot, joining the refresh already in flight if there is one.
+
+        Args:
+            wait (bool): Block until the refresh finishes; otherwise run it in the background
+
+        Returns:
+            Dict: The current snapshot (the new one if wait is True)
+
+        Raises:
+            Exception: Whatever the refresh raised, when waiting for a refresh that failed
+        """
+        with self._lock:
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+
+        if leader:
+            if wait:
+                self._run(flight)
+            else:
+                threading.Thread(target=self._run, args=(flight,), daemon=True).start()
+                return self._snapshot
+
+        if not wait:
+            return self._snapshot
+
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return self._snapshot
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the refresh in flight, if any, has finished and published its snapshot.
+
+        Args:
+            timeout (float, optional): Longest wait in seconds (None = until it finishes)
+
+        Returns:
+            bool: Whether no refresh is running any more
+        """
+        flight = self._flight
+        return flight is None or flight.done.wait(timeout)
+
+    def _run(self, flight: _Flight) -> None:
+        """Run refresh_fn and publish its result, recording any error on the flight"""
+        try:
+            if self.backend is None:
+                self._snapshot = self.refresh_fn(self._snapshot)
+                self._published = time.time()
+                refreshed = True
+            else:
+                refreshed = self._refresh_shared()
+            self.last_error = None
+            if refreshed and self.on_refresh is not None:
+                self.on_refresh(self._snapshot)
+        except Exception as e:
+            print(f"Error refreshing news: {e}")
+            flight.error = e
+            self.last_error = str(e)
+        finally:
+            with self._lock:
+                self._flight = None
+            flight.done.set()
+
+    def _refresh_shared(self) -> bool:
+        """
+        Refresh under the cross-process lock unless another worker just did.
+
+        Returns:
+            bool: Whether this process built the new snapshot
+        """
+        self._load_shared()
+        with self.backend.lock('refresh', ttl=self.lock_ttl, wait=self.lock_ttl):
+            # Whoever held the lock before us may have published a fresh snapshot
+            if self._load_shared():
+                print("Adopted news snapshot refreshed by another worker")
+                return False
+            snapshot = self.refresh_fn(self._snapshot)
+            generation = uuid.uuid4().hex
+            published = time.time()
+            envelope = {'generation': generation, 'published': published, 'snapshot': snapshot}
+            self.backend.set(SNAPSHOT_KEY, json.dumps(envelope).encode('utf-8'))
+            self.backend.set(GENERATION_KEY, generation.encode('utf-8'))
+            self._snapshot, self._generation, self._published = snapshot, generation, published
+            return True
+
+    def _load_shared(self) -> bool:
+        """
+        Adopt the shared snapshot if another worker published a newer one.
+
+        Returns:
+            bool: Whether a newer snapshot was loaded
+        """
+        try:
+            generation = self.backend.get(GENERATION_KEY)
+            if generation is None or generation.decode('utf-8') == self._generation:
+                return False
+            data = self.backend.get(SNAPSHOT_KEY)
+            if data is None:
+                return False
+            envelope = json.loads(data)
+        except Exception as e:
+            print(f"Error reading shared news snapshot: {e}")
+            return False
+        if envelope['generation'] == self._generation:
+            return False
+        self._snapshot = envelope['snapshot']
+        self._generation = envelope['generation']
+        self._published = envelope['published']
+        return True
+
+    def _due_in(self) -> float:
+        """Seconds until the next scheduled refresh, counting refreshes by other workers"""
+        if self.backend is not None:
+            self._load_shared()
+        if self._published is None:
+            return 0
+        return self._published + self.interval - time.time()
+
+    def start(self) -> None:
+        """
+        Start the background scheduler if it is enabled and not already running.
+
+        Safe to call on every request: after a fork (e.g. gunicorn with --preload)
+        the scheduler is started again in the child process.
+        """
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread_pid == os.getpid():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='news-refresher', daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background scheduler after its current refresh"""
+        self._stop.set()
+
+    def _loop(self) -> None:
+        """Refresh whenever the snapshot is older than interval seconds, until stopped"""
+        while True:
+            delay = self._due_in()
+            if delay <= 0:
+                try:
+                    self.refresh(wait=True)
+                except Exception:
+                    pass
+                # After a failed refresh, retry a full interval later
+                delay = self._due_in()
+                if delay <= 0:
+                    delay = self.interval
+            if self._stop.wait(delay):
+                return
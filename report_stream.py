@@ -0,0 +1,90 @@
+import json
+import threading
+from typing import Callable, Iterator, List, Optional
+
+class ReportBroadcast:
+    """
+    Fans the report text of the refresh in progress out to any number of readers.
+
+    The refresh appends text deltas as Claude streams them; each reader gets the
+    text produced so far and then every new delta as it arrives, so a page opened
+    mid-generation still shows the whole report.
+    """
+
+    def __init__(self, keepalive: float = 15.0):
+        """
+        Args:
+            keepalive (float): Seconds a reader waits for new text before getting a keep-alive
+        """
+        self.keepalive = keepalive
+        self._cond = threading.Condition()
+        self._chunks: List[str] = []
+        self._stream_id = 0
+        self._active = False
+        self.error = None
+
+    @property
+    def active(self) -> bool:
+        """Whether a report is being generated right now"""
+        return self._active
+
+    def start(self) -> None:
+        """Begin a new report, discarding the previous one's text"""
+        with self._cond:
+            self._stream_id += 1
+            self._chunks = []
+            self._active = True
+            self.error = None
+            self._cond.notify_all()
+
+    def append(self, text: str) -> None:
+        """Publish the next piece of report text"""
+        with self._cond:
+            self._chunks.append(text)
+            self._cond.notify_all()
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """End the current report, recording an error if generation failed"""
+        with self._cond:
+            self._active = False
+            self.error = error
+            self._cond.notify_all()
+
+    def follow(self, pending: Callable[[], bool] = lambda: False) -> Iterator[Optional[str]]:
+        """
+        Yield the current report's text, then new deltas until it is finished.
+
+        Args:
+            pending (Callable[[], bool]): Whether a report is about to start; while it
+                returns True the reader waits for it instead of returning right away
+
+        Yields:
+            str: Report text, or None as a keep-alive when nothing arrived for a while
+        """
+        with self._cond:
+            while not self._active and pending():
+                self._cond.wait(0.1)
+            if not self._active:
+                return
+            stream_id = self._stream_id
+        index = 0
+
+        while True:
+            with self._cond:
+                if index >= len(self._chunks) and self._active:
+                    self._cond.wait(self.keepalive)
+                if self._stream_id != stream_id:
+                    return
+                new = self._chunks[index:]
+                index += len(new)
+                done = not self._active
+            if new:
+                yield "".join(new)
+            elif not done:
+                yield None
+            if done:
+                return
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -1,22 +1,142 @@
-from newspaper import Article
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import json
+import os
+import random
+import threading
+import time
 
-def scrape_article(url):
+from article_store import ArticleStore
+from dedup import dedupe_sections
+from metrics import metrics, in_context
+
+# Base URL of the NYT Top Stories API (overridable to point at a local stub server)
+NYT_API_BASE = os.getenv('NYT_API_BASE', 'https://api.nytimes.com/svc/topstories/v2')
+
+# Sections fetched by get_all_articles when none are given
+DEFAULT_SECTIONS = ['world', 'technology', 'science', 'health', 'business']
+
+# Every section offered by the NYT Top Stories API
+NYT_SECTIONS = [
+    'arts', 'automobiles', 'books/review', 'business', 'fashion', 'food', 'health', 'home', 'insider',
+    'magazine', 'movies', 'nyregion', 'obituaries', 'opinion', 'politics', 'realestate', 'science',
+    'sports', 'sundayreview', 'technology', 'theater', 't-magazine', 'travel', 'upshot', 'us', 'world'
+]
+
+# Display and spoken names for sections whose name does not capitalize well
+SECTION_LABELS = {
+    'us': 'U.S.', 'nyregion': 'N.Y. Region', 'realestate': 'Real Estate', 'sundayreview': 'Sunday Review',
+    'books/review': 'Books', 't-magazine': 'T Magazine'
+}
+
+def section_label(section):
+    """Name of a section as shown and read to listeners, e.g. 'us' -> 'U.S.'"""
+    section = section.lower()
+    return SECTION_LABELS.get(section, section.capitalize())
+
+# Default per-request timeout in seconds (connect, read)
+DEFAULT_TIMEOUT = 10
+
+# Default number of sections fetched in parallel
+DEFAULT_MAX_WORKERS = 5
+
+# Shared keep-alive session, created lazily
+_session = None
+_session_lock = threading.Lock()
+
+def get_session(pool_size: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    """
+    Gets the process-wide HTTP session used for NYT API calls.
+    
+    The session keeps connections alive between calls so repeated refreshes
+    reuse the same TLS connections instead of handshaking for every section.
+    
+    Args:
+        pool_size (int): Maximum number of pooled connections per host
+        
+    Returns:
+        requests.Session: Shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+def _stored_article(entry):
+    """Article dict from an ArticleStore entry, shaped like scrape_article's result"""
+    return {
+        'title': entry['title'],
+        'text': entry['text'],
+        'publish_date': datetime.fromisoformat(entry['publish_date']) if entry['publish_date'] else None,
+        'url': entry['url']
+    }
+
+def scrape_article(url, timeout=DEFAULT_TIMEOUT, session=None, store=None):
     """
     Scrapes an article from the given URL.
     
+    The page is downloaded over the shared keep-alive session with a timeout
+    and then parsed by newspaper. With a store, the download is conditional and
+    the stored text is returned when the page is unchanged, skipping the parse.
+    
     Args:
         url (str): URL of the article to scrape
+        timeout (float): Download timeout in seconds
+        session (requests.Session, optional): Session to use (default: shared session)
+        store (ArticleStore, optional): Persistent store of previously parsed articles
         
     Returns:
         dict: Dictionary containing article title, text, publish date, and URL
+        
+    Raises:
+        requests.RequestException: If the download fails or times out
     """
+    session = session or get_session()
+    entry = store.get(url) if store is not None else None
+    if entry is not None and entry['text'] is None:
+        entry = None
+    
+    headers = {'User-Agent': 'Mozilla/5.0', **ArticleStore.validators(entry)}
+    with metrics.timer('article_download'):
+        response = session.get(url, timeout=timeout, headers=headers)
+    if response.status_code == 304 and entry is not None:
+        store.touch(url)
+        store.count('not_modified')
+        return _stored_article(entry)
+    response.raise_for_status()
+    
+    if store is not None:
+        store.count('bytes_downloaded', len(response.content))
+        if entry is not None and entry['content_hash'] == ArticleStore.content_hash(response.content):
+            store.touch(url)
+            store.count('unchanged')
+            return _stored_article(entry)
+    
+    # newspaper (with lxml and nltk) takes a while to import; only full-text runs need it
+    from newspaper import Article
     article = Article(url)
-    article.download()
-    article.parse()
+    with metrics.timer('article_parse'):
+        article.download(input_html=response.text)
+        article.parse()
+    
+    if store is not None:
+        store.count('changed')
+        store.save(
+            url, response,
+            title=article.title,
+            text=article.text,
+            publish_date=article.publish_date.isoformat() if article.publish_date else None
+        )
     return {
         'title': article.title,
         'text': article.text,
@@ -24,47 +144,219 @@ def scrape_article(url):
         'url': url
     }
 
-def get_top_stories(section, api_key):
+class ArticleEnricher:
+    """
+    Downloads full article bodies for NYT results on a bounded worker pool.
+    
+    At most per_domain downloads run against any one host at a time, each
+    download has a timeout and is retried with exponential backoff, and a whole
+    batch gives up after a deadline, so many URLs finish in bounded time.
+    The limits are shared by every batch run through the same enricher.
+    """
+    
+    def __init__(self, max_workers: int = 8, per_domain: int = 2, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = 2, backoff: float = 0.5, store: Optional[ArticleStore] = None,
+                 max_age: float = 86400):
+        """
+        Args:
+            max_workers (int): Maximum number of downloads in flight
+            per_domain (int): Maximum concurrent downloads per host
+            timeout (float): Per-download timeout in seconds
+            retries (int): Retries after a failed download
+            backoff (float): Base delay in seconds before the first retry (doubles each time)
+            store (ArticleStore, optional): Persistent store of parsed articles
+            max_age (float): Seconds a stored article is served without checking the site again
+        """
+        self.max_workers = max(1, max_workers)
+        self.per_domain = max(1, per_domain)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.store = store
+        self.max_age = max_age
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scrape')
+        self._domains = {}
+        self._lock = threading.Lock()
+    
+    def _domain_limit(self, url: str) -> threading.BoundedSemaphore:
+        domain = urlparse(url).netloc.lower()
+        with self._lock:
+            if domain not in self._domains:
+                self._domains[domain] = threading.BoundedSemaphore(self.per_domain)
+            return self._domains[domain]
+    
+    def fetch_text(self, url: str) -> Optional[str]:
+        """
+        Download and parse one article, retrying failures with backoff.
+        
+        Returns:
+            str: Article body, or None if every attempt failed
+        """
+        if self.store is not None:
+            entry = self.store.get(url)
+            if entry and entry['text'] and time.time() - entry['checked'] < self.max_age:
+                self.store.count('disk_hits')
+                return entry['text']
+        
+        for attempt in range(self.retries + 1):
+            try:
+                with self._domain_limit(url):
+                    return scrape_article(url, timeout=self.timeout, store=self.store)['text'] or None
+            except requests.RequestException as e:
+                if attempt == self.retries:
+                    print(f"Error scraping {url}: {e}")
+                    return None
+                time.sleep(self.backoff * (2 ** attempt) + random.uniform(0, self.backoff))
+            except Exception as e:
+                # Parse errors will not go away by retrying
+                print(f"Error parsing {url}: {e}")
+                return None
+    
+    def enrich(self, articles: List[Dict], deadline: Optional[float] = None) -> List[Dict]:
+        """
+        Add each article's full body under 'text'.
+        
+        Articles that already have text are skipped; ones that could not be
+        scraped before the deadline get text None.
+        
+        Args:
+            articles (List[Dict]): Article dicts as returned by get_all_articles
+            deadline (float, optional): Seconds after which remaining downloads are abandoned
+            
+        Returns:
+            List[Dict]: The same article dicts, updated in place
+        """
+        todo = [article for article in articles if not article.get('text') and article.get('url')]
+        fetch_text = in_context(self.fetch_text)
+        futures = {self._executor.submit(fetch_text, article['url']): article for article in todo}
+        done, not_done = wait(futures, timeout=deadline)
+        for future in not_done:
+            future.cancel()
+        for future, article in futures.items():
+            article['text'] = future.result() if future in done else None
+        if not_done:
+            print(f"Gave up on {len(not_done)} of {len(todo)} article downloads after {deadline}s")
+        return articles
+
+def get_top_stories(section, api_key, session=None, timeout=DEFAULT_TIMEOUT, store=None):
     """
     Gets top stories from NYT API for a specific section.
     
+    With a store, the request is conditional and an unchanged feed (304) is
+    answered from the stored copy.
+    
     Args:
         section (str): Section name (world, technology, science, etc.)
         api_key (str): NYT API key
+        session (requests.Session, optional): Session to use (default: shared session)
+        timeout (float): Request timeout in seconds
+        store (ArticleStore, optional): Persistent store of previously fetched feeds
         
     Returns:
         list: List of articles or None if request fails
     """
-    url = f"https://api.nytimes.com/svc/topstories/v2/{section}.json"
+    url = f"{NYT_API_BASE}/{section}.json"
     params = {'api-key': api_key}
+    session = session or get_session()
+    # Keyed by the URL without the API key, which is never stored
+    entry = store.get(url) if store is not None else None
+    if entry is not None and entry['body'] is None:
+        entry = None
 
-    response = requests.get(url, params=params)
+    try:
+        with metrics.timer('nyt_fetch', section=section):
+            response = session.get(url, params=params, timeout=timeout, headers=ArticleStore.validators(entry))
+    except requests.RequestException as e:
+        print(f"Error fetching section {section}: {e}")
+        metrics.inc('nyt_responses_total', outcome='error')
+        return None
+    metrics.inc('nyt_bytes_total', len(response.content))
+    if response.status_code == 304 and entry is not None:
+        metrics.inc('nyt_responses_total', outcome='not_modified')
+        store.touch(url)
+        store.count('not_modified')
+        return json.loads(entry['body'])['results']
+    metrics.inc('nyt_responses_total', outcome=str(response.status_code))
     if response.status_code == 200:
+        if store is not None:
+            store.count('bytes_downloaded', len(response.content))
+            unchanged = entry is not None and entry['content_hash'] == ArticleStore.content_hash(response.content)
+            store.count('unchanged' if unchanged else 'changed')
+            store.save(url, response, body=response.text)
         return response.json()['results']
     return None
 
-def get_all_articles(api_key):
+def _format_articles(section, articles):
+    """Reduce raw NYT results to the fields used by the analyzer"""
+    return [{
+        'title': article['title'],
+        'url': article['url'],
+        'published_date': article['published_date'],
+        'abstract': article['abstract'],
+        'section': section,
+        # Section NYT files the story under, used to pick its canonical section when deduplicating
+        'nyt_section': (article.get('section') or '').lower()
+    } for article in articles]
+
+def get_all_articles(api_key, concurrent=True, max_workers=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT, store=None,
+                     dedupe=False, sections=None):
     """
     Gets top stories from multiple sections.
     
+    In concurrent mode all sections are requested at once over the shared
+    keep-alive session, so a refresh takes about as long as the slowest section.
+    
     Args:
         api_key (str): NYT API key
+        concurrent (bool): Fetch sections in parallel instead of one after another
+        max_workers (int): Maximum number of sections fetched at the same time
+        timeout (float): Per-request timeout in seconds
+        store (ArticleStore, optional): Persistent store for conditional requests
+        dedupe (bool): Keep stories listed under several sections in only one of them
+        sections (list, optional): Sections to fetch (default: DEFAULT_SECTIONS)
         
     Returns:
         dict: Dictionary with sections as keys and lists of articles as values
     """
-    sections = ['world', 'technology', 'science', 'health', 'business']
+    sections = sections or DEFAULT_SECTIONS
+    session = get_session(max_workers)
+
+    if concurrent and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(sections))) as executor:
+            results = list(executor.map(
+                in_context(lambda section: get_top_stories(section, api_key, session=session, timeout=timeout, store=store)),
+                sections
+            ))
+    else:
+        results = [get_top_stories(section, api_key, session=session, timeout=timeout, store=store) for section in sections]
 
+    # Merge in section order so the result matches the sequential shape
     all_articles = {}
-    for section in sections:
-        articles = get_top_stories(section, api_key)
+    for section, articles in zip(sections, results):
         if articles:
-            all_articles[section] = [{
-                'title': article['title'],
-                'url': article['url'],
-                'published_date': article['published_date'],
-                'abstract': article['abstract'],
-                'section': section
-            } for article in articles]
-
-    return all_articles
\ No newline at end of file
+            all_articles[section] = _format_articles(section, articles)
+
+    return dedupe_sections(all_articles) if dedupe else all_articles
+
+async def async_get_section_articles(section, api_key, timeout=DEFAULT_TIMEOUT, store=None):
+    """
+    Fetch one section's top stories, formatted like a section of get_all_articles.
+    
+    Unlike get_top_stories, which returns the raw NYT results, the results are
+    passed through _format_articles. The request runs on the default executor
+    over the shared keep-alive session, so many sections can wait on NYT
+    without blocking the event loop.
+    
+    Args:
+        section (str): Section name (world, technology, science, etc.)
+        api_key (str): NYT API key
+        timeout (float): Request timeout in seconds
+        store (ArticleStore, optional): Persistent store for conditional requests
+        
+    Returns:
+        list: Formatted articles for the section or None if request fails
+    """
+    articles = await asyncio.to_thread(get_top_stories, section, api_key, get_session(), timeout, store)
+    if not articles:
+        return None
+    return _format_articles(section, articles)
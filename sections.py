@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from cache_backend import CacheBackend, versioned_key
+
+class SectionDemand:
+    """
+    Tracks which news sections listeners asked for recently.
+
+    Refreshes fetch and analyze only the union of these sections, so offering
+    more sections costs nothing until someone selects them. A section drops
+    out once nobody has asked for it in ttl seconds. With a shared backend
+    every worker sees the same demand (one expiring key per section).
+    """
+
+    def __init__(self, available: List[str], default: List[str], ttl: float = 86400,
+                 backend: Optional[CacheBackend] = None):
+        """
+        Args:
+            available (List[str]): Sections listeners may choose from, in display order
+            default (List[str]): Sections refreshed while nobody has asked for any
+            ttl (float): Seconds a request keeps its sections in the refresh
+            backend (CacheBackend, optional): Store shared with other workers
+        """
+        self.available = [section.lower() for section in available]
+        self.default = self.normalize(default)
+        self.ttl = ttl
+        self.backend = backend
+        self._requested: Dict[str, float] = {}
+        self._published: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def normalize(self, sections: Iterable[str]) -> List[str]:
+        """Lowercase available sections in the order given, without duplicates or unknown names"""
+        return list(dict.fromkeys(
+            section.lower() for section in sections if section and section.lower() in self.available
+        ))
+
+    def record(self, sections: Iterable[str]) -> List[str]:
+        """
+        Record a listener's selection.
+
+        Returns:
+            List[str]: The normalized selection (the default sections if none were valid)
+        """
+        sections = self.normalize(sections) or list(self.default)
+        now = time.time()
+        with self._lock:
+            for section in sections:
+                self._requested[section] = now
+            # Shared keys are renewed a few times per ttl, not on every request
+            publish = [section for section in sections if now - self._published.get(section, 0) > self.ttl / 4]
+            for section in publish:
+                self._published[section] = now
+        if self.backend is not None:
+            for section in publish:
+                try:
+                    self.backend.set(versioned_key('sections', section), str(now).encode('utf-8'), ttl=self.ttl)
+                except Exception as e:
+                    print(f"Error recording section demand: {e}")
+        return sections
+
+    def active(self) -> List[str]:
+        """
+        Sections requested within the last ttl seconds by any worker.
+
+        Returns:
+            List[str]: Sections in display order (the default sections if none were requested)
+        """
+        now = time.time()
+        with self._lock:
+            requested = {section for section, at in self._requested.items() if now - at < self.ttl}
+        if self.backend is not None:
+            for section in self.available:
+                if section in requested:
+                    continue
+                try:
+                    if self.backend.get(versioned_key('sections', section)) is not None:
+                        requested.add(section)
+                except Exception as e:
+                    print(f"Error reading section demand: {e}")
+        return [section for section in self.available if section in requested] or list(self.default)
@@ -0,0 +1,49 @@
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional, Sequence
+
+# Let readers and the writer work at the same time, and sync less often than after every commit
+DEFAULT_PRAGMAS = ("journal_mode=WAL", "synchronous=NORMAL")
+
+class ThreadLocalConnection:
+    """
+    Per-thread connections to one SQLite database file.
+
+    sqlite3 connections must not be shared between threads, nor used in a process
+    forked after they were opened (gunicorn --preload imports the app in the master).
+    Each thread opens its own connection on first use, and again in a forked worker.
+    """
+
+    def __init__(self, path: str, pragmas: Sequence[str] = DEFAULT_PRAGMAS,
+                 row_factory: Optional[Callable] = None, timeout: float = 30):
+        """
+        Create the database's directory if needed; connections are opened lazily.
+
+        Args:
+            path (str): SQLite database file
+            pragmas (Sequence[str]): PRAGMA statements (without the keyword) run on every new connection
+            row_factory (Callable, optional): sqlite3 row factory, e.g. sqlite3.Row
+            timeout (float): Seconds to wait for another connection's write lock
+        """
+        self.path = path
+        self.pragmas = tuple(pragmas)
+        self.row_factory = row_factory
+        self.timeout = timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use (and again in a forked worker)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            for pragma in self.pragmas:
+                conn.execute(f"PRAGMA {pragma}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Import the project's flat modules from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the web app's caches off disk and its background work off while tests import it
+os.environ.update({
+    'LLM_CACHE_PATH': '',
+    'ARTICLE_STORE_PATH': '',
+    'AUDIO_CACHE_DIR': '',
+    'CACHE_BACKEND_URL': 'memory://',
+    'NEWS_REFRESH_INTERVAL': '0',
+    'AUDIO_WARMUP_VARIANTS': '0',
+    'AUDIO_WARMUP_REPORT': 'false',
+    'METRICS_SPAN_LOG': 'false',
+})
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+
+from analyzer import AsyncNewsAnalyzer, NewsAnalyzer
+
+
+class BlockingReportAnalyzer:
+    """Streams one delta, then blocks inside next() until released"""
+    max_concurrency = 1
+
+    def __init__(self):
+        self.waiting = threading.Event()
+        self.release = threading.Event()
+        self.closed = threading.Event()
+
+    def generate_summary_report_stream(self, analysis):
+        try:
+            yield 'first'
+            self.waiting.set()
+            self.release.wait(5)
+            yield 'second'
+        finally:
+            self.closed.set()
+
+
+def test_cancelled_report_stream_closes_after_pending_delta():
+    analyzer = BlockingReportAnalyzer()
+    received = []
+
+    async def consume():
+        async for text in AsyncNewsAnalyzer(analyzer).generate_summary_report_stream({}):
+            received.append(text)
+
+    async def main():
+        task = asyncio.create_task(consume())
+        await asyncio.to_thread(analyzer.waiting.wait, 5)
+        # Cancelled while next() is still running on its worker thread
+        task.cancel()
+        await asyncio.sleep(0.05)
+        assert not analyzer.closed.is_set()
+        analyzer.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert received == ['first']
+    assert analyzer.closed.is_set()
+
+
+@pytest.fixture
+def batched_analyzer(monkeypatch):
+    """A batched-mode analyzer whose per-section calls are recorded instead of sent"""
+    pytest.importorskip('anthropic')
+    analyzer = NewsAnalyzer(api_key='test-key', batch_themes=True, prompt_token_budget=None)
+    analyzer.per_section_calls = []
+
+    def extract_key_themes(articles):
+        analyzer.per_section_calls.append(articles[0]['section'])
+        return [f"{articles[0]['section']} fallback"]
+
+    monkeypatch.setattr(analyzer, '_extract_key_themes', extract_key_themes)
+    return analyzer
+
+
+SECTIONS = [
+    (section, [{'title': f"{section} story", 'abstract': '', 'section': section}])
+    for section in ('world', 'business', 'science')
+]
+
+
+def test_parse_batched_themes_keeps_only_valid_sections(batched_analyzer):
+    reply = 'Here you go: {"world": [" Diplomacy ", "", 3], "business": "Markets", "arts": ["Film"]} Done.'
+    assert batched_analyzer._parse_batched_themes(reply, ['world', 'business', 'science']) == {
+        'world': ['Diplomacy']
+    }
+    assert batched_analyzer._parse_batched_themes('no json here', ['world']) == {}
+    assert batched_analyzer._parse_batched_themes('{"world": ["Diplomacy"', ['world']) == {}
+    assert batched_analyzer._parse_batched_themes('{"world": {"theme": "Diplomacy"}}', ['world']) == {}
+
+
+def test_batched_themes_fall_back_per_section(batched_analyzer, monkeypatch):
+    monkeypatch.setattr(batched_analyzer, '_complete',
+                        lambda prompt, max_tokens, kind: '{"world": ["Diplomacy"], "business": []}')
+
+    assert batched_analyzer._extract_themes_batched(SECTIONS) == [
+        ['Diplomacy'], ['business fallback'], ['science fallback']
+    ]
+    assert sorted(batched_analyzer.per_section_calls) == ['business', 'science']
+
+
+def test_failed_batched_call_falls_back_for_every_section(batched_analyzer, monkeypatch):
+    import anthropic
+
+    def fail(prompt, max_tokens, kind):
+        raise anthropic.APIError('overloaded', request=None, body=None)
+
+    monkeypatch.setattr(batched_analyzer, '_complete', fail)
+    assert batched_analyzer._extract_themes_batched(SECTIONS) == [
+        ['world fallback'], ['business fallback'], ['science fallback']
+    ]
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from cache_backend import CacheBackend, LockTimeout, create_backend
+from metrics import metrics
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def backend(request, monkeypatch, tmp_path):
+    if request.param == 'memory':
+        return create_backend('memory://')
+    if request.param == 'sqlite':
+        return create_backend(f"sqlite:///{tmp_path / 'shared_cache.sqlite'}")
+    fakeredis = pytest.importorskip('fakeredis')
+    redis = pytest.importorskip('redis')
+    # redis-py releases locks with a Lua script, which fakeredis runs through lupa
+    pytest.importorskip('lupa')
+    monkeypatch.setattr(redis.Redis, 'from_url', lambda url: fakeredis.FakeRedis())
+    return create_backend('redis://localhost:6379/0')
+
+
+@pytest.fixture
+def shared_backend(backend):
+    """Backends whose locks expire, so a crashed holder's lock can be taken over"""
+    if type(backend).__name__ == 'MemoryBackend':
+        pytest.skip('in-process locks cannot outlive their holder')
+    return backend
+
+
+def release_failures(backend_name: str) -> float:
+    return metrics._counters.get('cache_lock_release_failures_total', {}).get((('backend', backend_name),), 0)
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_get_set_delete(backend):
+    assert backend.get('missing') is None
+    backend.set('key', b'value')
+    assert backend.get('key') == b'value'
+    backend.set('key', b'replaced')
+    assert backend.get('key') == b'replaced'
+    backend.delete('key')
+    assert backend.get('key') is None
+    backend.delete('key')
+
+
+def test_ttl_expiry(backend):
+    backend.set('short', b'value', ttl=0.1)
+    backend.set('long', b'value', ttl=60)
+    assert backend.get('short') == b'value'
+    time.sleep(0.25)
+    assert backend.get('short') is None
+    assert backend.get('long') == b'value'
+
+
+def test_lock_excludes_other_holders(backend):
+    inside = []
+    overlaps = []
+
+    def worker():
+        with backend.lock('refresh', ttl=10, wait=10):
+            if inside:
+                overlaps.append(True)
+            inside.append(True)
+            time.sleep(0.02)
+            inside.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == []
+
+
+def test_lock_timeout(backend):
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with backend.lock('refresh', ttl=10, wait=1):
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    try:
+        assert held.wait(5)
+        start = time.monotonic()
+        with pytest.raises(LockTimeout):
+            with backend.lock('refresh', ttl=10, wait=0.2):
+                pass
+        assert time.monotonic() - start < 2
+        # Other lock names are unaffected
+        with backend.lock('other', ttl=10, wait=0.2):
+            pass
+    finally:
+        release.set()
+        thread.join()
+
+    with backend.lock('refresh', ttl=10, wait=1):
+        pass
+
+
+def test_stale_lock_is_taken_over(shared_backend):
+    backend_name = type(shared_backend).__name__[:-len('Backend')].lower()
+    failures = release_failures(backend_name)
+
+    # A holder that stops responding keeps its lock only until the ttl passes
+    stale = shared_backend.lock('refresh', ttl=0.2, wait=1)
+    stale.__enter__()
+    with pytest.raises(LockTimeout):
+        with shared_backend.lock('refresh', ttl=10, wait=0.05):
+            pass
+    start = time.monotonic()
+    with shared_backend.lock('refresh', ttl=10, wait=5):
+        assert time.monotonic() - start < 2
+        # The old holder's late release neither raises nor frees the new holder's lock
+        stale.__exit__(None, None, None)
+        assert release_failures(backend_name) == failures + 1
+        with pytest.raises(LockTimeout):
+            with shared_backend.lock('refresh', ttl=10, wait=0.05):
+                pass
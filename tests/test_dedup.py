@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+from dedup import dedupe_sections
+from scraper import _format_articles
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures', 'nyt')
+
+
+def load_fixture_sections():
+    news_data = {}
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        section = name[:-len('.json')]
+        with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+            news_data[section] = _format_articles(section, json.load(f)['results'])
+    return news_data
+
+
+def article(title, url, published_date='2025-06-13T09:00:00-04:00', abstract='', nyt_section=''):
+    return {'title': title, 'url': url, 'published_date': published_date, 'abstract': abstract,
+            'nyt_section': nyt_section}
+
+
+def titles(news_data, section):
+    return [a['title'] for a in news_data.get(section, [])]
+
+
+@pytest.fixture
+def deduped():
+    return dedupe_sections(load_fixture_sections())
+
+
+@pytest.mark.parametrize('section, first, second', [
+    ('technology', 'Apple Reports Surprise in Trade Talks', 'Google Reports Surprise in Trade Talks'),
+    ('world', 'Taiwan Signals Shift on Labor Disputes', 'Japan Signals Shift on Labor Disputes'),
+])
+def test_templated_titles_are_different_stories(deduped, section, first, second):
+    assert first in titles(deduped, section)
+    assert second in titles(deduped, section)
+
+
+def test_same_title_in_one_section_with_different_urls_is_kept(deduped):
+    follow_ups = [a for a in deduped['health'] if a['title'] == 'Measles Faces New Pressure Over A Leadership Change']
+    assert [a['published_date'][:10] for a in follow_ups] == ['2025-06-11', '2025-06-13']
+    assert not any(a.get('also_in') for a in follow_ups)
+
+
+def test_stories_listed_in_several_sections_are_kept_once(deduped):
+    kept = [(section, a['also_in']) for section, articles in deduped.items() for a in articles
+            if a['title'] == 'Oil Prices Jump as Shipping Routes Face New Attacks']
+    assert len(kept) == 1
+    assert kept[0][1]
+    total = sum(len(articles) for articles in load_fixture_sections().values())
+    assert total - sum(len(articles) for articles in deduped.values()) == 3
+
+
+def test_one_word_difference_across_sections_is_not_merged():
+    news_data = {
+        'world': [article('Senate Passes Bill on Iran', 'https://example.com/world/iran.html')],
+        'us': [article('Senate Passes Bill on Iraq', 'https://example.com/us/iraq.html')],
+    }
+    deduped = dedupe_sections(news_data)
+    assert titles(deduped, 'world') == ['Senate Passes Bill on Iran']
+    assert titles(deduped, 'us') == ['Senate Passes Bill on Iraq']
+
+
+def test_title_match_across_sections_needs_corroboration():
+    same_time = {
+        'world': [article('Oil Prices Jump as Routes Face Attacks', 'https://example.com/a.html', nyt_section='world')],
+        'business': [article('Oil prices jump as routes face attacks', 'https://example.com/b.html?src=biz')],
+    }
+    deduped = dedupe_sections(same_time)
+    assert list(deduped) == ['world']
+    assert deduped['world'][0]['also_in'] == ['business']
+
+    different_story = {
+        'world': [article('Oil Prices Jump as Routes Face Attacks', 'https://example.com/a.html',
+                          published_date='2025-06-10T09:00:00-04:00', abstract='Monday')],
+        'business': [article('Oil Prices Jump as Routes Face Attacks', 'https://example.com/b.html',
+                             published_date='2025-06-13T09:00:00-04:00', abstract='Thursday')],
+    }
+    assert {section: len(articles) for section, articles in dedupe_sections(different_story).items()} == \
+        {'world': 1, 'business': 1}
@@ -0,0 +1,120 @@
+import base64
+import os
+import subprocess
+import sys
+
+import app
+from analyzer import public_analysis
+from cache_backend import create_backend
+from refresher import NewsRefresher
+
+ANALYSIS = {
+    'timestamp': '2025-01-01T08:00:00',
+    'changed_sections': ['world'],
+    'sections': {
+        'world': {
+            'fingerprint': 'abc123',
+            'article_count': 1,
+            'recent_headlines': ['Talks resume'],
+            'cross_references': [{'title': 'Talks resume', 'also_in': ['business']}],
+            'key_themes': ['Diplomacy'],
+            'date_range': {'start': '2025-01-01', 'end': '2025-01-01'}
+        }
+    }
+}
+
+
+def test_public_analysis_drops_internal_fields():
+    public = public_analysis(ANALYSIS)
+    assert public == {
+        'timestamp': '2025-01-01T08:00:00',
+        'sections': {
+            'world': {
+                'article_count': 1,
+                'recent_headlines': ['Talks resume'],
+                'key_themes': ['Diplomacy'],
+                'date_range': {'start': '2025-01-01', 'end': '2025-01-01'}
+            }
+        }
+    }
+    # The refresher's copy keeps them for the next incremental refresh
+    assert ANALYSIS['sections']['world']['fingerprint'] == 'abc123'
+    assert public_analysis(None) is None
+
+
+def test_get_news_serves_public_analysis(monkeypatch):
+    def refresh(previous):
+        return {'analysis': ANALYSIS, 'report': 'Report', 'sections': ['world'], 'last_updated': 'now'}
+
+    refresher = NewsRefresher(refresh, backend=create_backend('memory://'))
+    refresher.refresh()
+    monkeypatch.setattr(app.get_services(), 'news_refresher', refresher)
+    monkeypatch.setattr(app, 'user_sections', lambda: ['world'])
+
+    data = app.app.test_client().get('/get_news').get_json()
+    assert data['status'] == 'success'
+    assert data['analysis'] == public_analysis(ANALYSIS)
+    assert data['headlines'] == [{'section': 'world', 'title': 'Talks resume'}]
+    assert refresher.snapshot['analysis']['sections']['world']['cross_references']
+
+
+def test_headlines_include_stories_kept_under_another_section():
+    # 'Talks resume' is kept under world and also listed in business
+    entries = app.headline_entries(ANALYSIS, ['business'])
+    assert entries == [('business', 'Talks resume')]
+    assert app.select_headlines(ANALYSIS, ['business']) == (['Talks resume'], ['Business'])
+
+
+def test_headlines_use_spoken_section_names():
+    analysis = {'sections': {
+        'us': {'recent_headlines': ['Storm nears coast']},
+        'books/review': {'recent_headlines': ['A debut novel']},
+    }}
+    assert app.select_headlines(analysis, ['us', 'books/review']) == \
+        (['Storm nears coast', 'A debut novel'], ['U.S.', 'Books'])
+
+
+def test_unknown_sections_are_rejected_at_startup(tmp_path):
+    env = dict(os.environ, NEWS_SECTIONS='world,bogus',
+               PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run([sys.executable, '-c', 'import app'], cwd=tmp_path, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode != 0
+    assert 'unknown section(s) bogus' in result.stderr
+
+
+def test_import_creates_no_cache_files(tmp_path):
+    # Fresh interpreter with the default cache settings, not the ones conftest sets
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('LLM_CACHE_PATH', 'ARTICLE_STORE_PATH', 'AUDIO_CACHE_DIR', 'CACHE_BACKEND_URL')}
+    env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', 'import app'], cwd=tmp_path, env=env, check=True)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_legacy_audio_routes_return_json(monkeypatch):
+    class FakeVoiceAgent:
+        audio_cache = None
+
+        def generate_audio(self, text):
+            return b'report audio'
+
+        def build_headline_segments(self, headlines, sections, selected_sections, user_name=None):
+            return ['Intro.', *headlines]
+
+        def generate_segments_audio(self, segments, max_workers=None):
+            return b'headlines audio'
+
+    news_cache = {'analysis': ANALYSIS, 'report': 'Report', 'sections': ['world'], 'last_updated': 'now'}
+    monkeypatch.setattr(app, 'ELEVEN_API_KEY', 'test-key')
+    monkeypatch.setattr(app, '_voice_agent', FakeVoiceAgent())
+    monkeypatch.setattr(app, 'load_news', lambda sections=None: news_cache)
+    monkeypatch.setattr(app, 'user_sections', lambda: ['world'])
+
+    client = app.app.test_client()
+    for route, audio in (('/get_headlines_audio', b'headlines audio'), ('/get_report_audio', b'report audio')):
+        response = client.get(route)
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['status'] == 'success'
+        assert base64.b64decode(data['audio']) == audio
@@ -0,0 +1,49 @@
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.time() for the cache"""
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_key_depends_on_model_prompt_and_params():
+    key = LLMCache.make_key('model', 'prompt', max_tokens=100)
+    assert key == LLMCache.make_key('model', 'prompt', max_tokens=100)
+    assert key != LLMCache.make_key('model', 'prompt', max_tokens=200)
+    assert key != LLMCache.make_key('other-model', 'prompt', max_tokens=100)
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / 'llm_cache.sqlite'), ttl=60)
+    cache.set('key', 'response')
+
+    clock[0] += 59
+    assert cache.get('key') == 'response'
+    clock[0] += 2
+    assert cache.get('key') is None
+    assert cache.stats()['entries'] == 0
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / 'llm_cache.sqlite'), max_bytes=10)
+    cache.set('a', 'aaaa')
+    clock[0] += 1
+    cache.set('b', 'bbbb')
+    clock[0] += 1
+    # Reading 'a' makes 'b' the least recently used entry
+    assert cache.get('a') == 'aaaa'
+    clock[0] += 1
+    cache.set('c', 'cccc')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 'aaaa'
+    assert cache.get('c') == 'cccc'
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['evictions']) == (2, 8, 1)
@@ -0,0 +1,44 @@
+from prompt_budget import estimate_tokens, fit_articles
+
+
+def article(title, text='', also_in=None):
+    return {'title': title, 'text': text, 'also_in': also_in or []}
+
+
+def render(article, with_excerpt):
+    # 35 characters per title and 350 per excerpt: 10 and 100 tokens
+    return article['title'].ljust(35) + (article['text'].ljust(350) if with_excerpt else '')
+
+
+ARTICLES = [
+    article('First', text='first excerpt'),
+    article('Second', text='second excerpt'),
+    article('Third', text='third excerpt', also_in=['business']),
+]
+
+
+def test_no_budget_keeps_everything():
+    chosen, excerpts_dropped, articles_dropped = fit_articles(ARTICLES, render, None)
+    assert chosen == [(a, True) for a in ARTICLES]
+    assert (excerpts_dropped, articles_dropped) == (0, 0)
+
+
+def test_excerpts_are_dropped_before_articles():
+    assert estimate_tokens(render(ARTICLES[0], True)) == 110
+    # Room for every title and one excerpt
+    chosen, excerpts_dropped, articles_dropped = fit_articles(ARTICLES, render, 130)
+    assert (excerpts_dropped, articles_dropped) == (2, 0)
+    # The cross-referenced story ranks first and keeps its excerpt
+    assert chosen == [(ARTICLES[0], False), (ARTICLES[1], False), (ARTICLES[2], True)]
+
+
+def test_least_important_articles_are_dropped_when_excerpts_are_not_enough():
+    chosen, excerpts_dropped, articles_dropped = fit_articles(ARTICLES, render, 20)
+    assert (excerpts_dropped, articles_dropped) == (3, 1)
+    assert chosen == [(ARTICLES[0], False), (ARTICLES[2], False)]
+
+
+def test_at_least_one_article_is_kept():
+    chosen, _, articles_dropped = fit_articles(ARTICLES, render, 1)
+    assert chosen == [(ARTICLES[2], False)]
+    assert articles_dropped == 2
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from cache_backend import create_backend
+from refresher import NewsRefresher
+
+
+def snapshot(number):
+    return {'analysis': {'sections': {}}, 'report': f"Report {number}", 'last_updated': str(number)}
+
+
+@pytest.fixture(params=['local', 'shared'])
+def make_refresher(request):
+    def make(refresh_fn):
+        backend = create_backend('memory://') if request.param == 'shared' else None
+        return NewsRefresher(refresh_fn, backend=backend)
+    return make
+
+
+def test_concurrent_callers_share_one_refresh(make_refresher):
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def refresh(previous):
+        calls.append(previous)
+        started.set()
+        release.wait(5)
+        return snapshot(len(calls))
+
+    refresher = make_refresher(refresh)
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(refresher.refresh())) for _ in range(5)]
+    callers[0].start()
+    assert started.wait(5)
+    for caller in callers[1:]:
+        caller.start()
+    time.sleep(0.05)
+    assert refresher.refreshing
+    release.set()
+    for caller in callers:
+        caller.join(5)
+
+    assert len(calls) == 1
+    assert [result['report'] for result in results] == ['Report 1'] * 5
+    assert not refresher.refreshing
+
+
+def test_failed_refresh_keeps_last_good_snapshot(make_refresher):
+    outcomes = iter([snapshot(1), RuntimeError('NYT is down')])
+
+    def refresh(previous):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    refresher = make_refresher(refresh)
+    refresher.refresh()
+    with pytest.raises(RuntimeError):
+        refresher.refresh()
+
+    assert refresher.snapshot['report'] == 'Report 1'
+    assert refresher.last_error == 'NYT is down'
+
+
+def test_refresh_without_waiting_returns_current_snapshot(make_refresher):
+    release = threading.Event()
+
+    def refresh(previous):
+        release.wait(5)
+        return snapshot(2)
+
+    refresher = make_refresher(refresh)
+    start = time.monotonic()
+    current = refresher.refresh(wait=False)
+    assert time.monotonic() - start < 1
+    assert current['report'] is None
+    assert refresher.refreshing
+
+    release.set()
+    assert refresher.wait(5)
+    assert refresher.snapshot['report'] == 'Report 2'
@@ -0,0 +1,60 @@
+import json
+import time
+
+import pytest
+
+import app
+from cache_backend import create_backend
+from refresher import NewsRefresher
+
+REPORT_DELTAS = ["1. Overall Coverage Summary\n\n", "Markets fell. ", "Talks resumed."]
+
+
+def fake_run_pipeline(*args, on_report_delta=None, **kwargs):
+    """Stand-in for run_pipeline that streams a canned report, a delta every 50ms"""
+    for delta in REPORT_DELTAS:
+        time.sleep(0.05)
+        on_report_delta(delta)
+    analysis = {'sections': {'world': {'recent_headlines': ['Talks resume'], 'key_themes': []}}}
+    return {'world': []}, analysis, "".join(REPORT_DELTAS)
+
+
+def parse_events(body: str) -> list:
+    """(event, data) pairs of a Server-Sent Events body, without comments"""
+    events = []
+    for message in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in message.splitlines() if not line.startswith(':'))
+        if lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def cold_refresher(request, monkeypatch, tmp_path):
+    """A refresher with an empty snapshot whose publication lags the end of the report text"""
+    url = 'memory://' if request.param == 'memory' else f"sqlite:///{tmp_path / 'shared_cache.sqlite'}"
+
+    def slow_refresh(previous):
+        snapshot = app.refresh_news(previous)
+        # Storing the snapshot (e.g. in SQLite) happens after the report text is finished
+        time.sleep(0.2)
+        return snapshot
+
+    refresher = NewsRefresher(slow_refresh, backend=create_backend(url))
+    monkeypatch.setattr(app, 'run_pipeline', fake_run_pipeline)
+    monkeypatch.setattr(app.get_services(), 'news_refresher', refresher)
+    return refresher
+
+
+def test_report_stream_from_cold_cache_ends_with_done(cold_refresher):
+    response = app.app.test_client().get('/report_stream')
+    events = parse_events(response.get_data(as_text=True))
+
+    assert [name for name, _ in events][-1] == 'done'
+    assert "".join(data['text'] for name, data in events if name == 'delta') == "".join(REPORT_DELTAS)
+    assert events[-1][1]['last_updated'] == cold_refresher.snapshot['last_updated']
+
+
+def test_live_report_text_from_cold_cache(cold_refresher):
+    cold_refresher.refresh(wait=False)
+    assert "".join(app.live_report_text()) == "".join(REPORT_DELTAS)
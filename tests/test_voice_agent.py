@@ -0,0 +1,48 @@
+import pytest
+
+from metrics import metrics
+from voice_agent import SpeechSynthesisError, VoiceAgent
+
+SEGMENTS = ["Good morning.", "World news.", "Talks resumed.", "Markets fell."]
+
+
+@pytest.fixture
+def voice_agent(monkeypatch):
+    """A voice agent whose synthesis fails for the third segment"""
+    agent = VoiceAgent(api_key='test-key', voice_id='test-voice', init_audio=False)
+    monkeypatch.setattr(agent, 'generate_audio', lambda text: None if text == SEGMENTS[2] else text.encode())
+    return agent
+
+
+def segment_failures(mode: str) -> float:
+    return metrics._counters.get('tts_segment_failures_total', {}).get((('mode', mode),), 0)
+
+
+def test_stream_stops_at_failed_segment(voice_agent):
+    failures = segment_failures('stream')
+    stream = voice_agent.stream_segments_audio(SEGMENTS, max_workers=2)
+
+    assert next(stream) == SEGMENTS[0].encode()
+    assert next(stream) == SEGMENTS[1].encode()
+    with pytest.raises(SpeechSynthesisError):
+        next(stream)
+    assert segment_failures('stream') == failures + 1
+
+
+def test_generate_segments_audio_fails_as_a_whole(voice_agent):
+    failures = segment_failures('full')
+    assert voice_agent.generate_segments_audio(SEGMENTS, max_workers=2) is None
+    assert segment_failures('full') == failures + 1
+    assert voice_agent.generate_segments_audio(SEGMENTS[:2]) == b"".join(s.encode() for s in SEGMENTS[:2])
+
+
+def test_headline_segments_read_the_given_section_names():
+    agent = VoiceAgent(api_key='test-key', voice_id='test-voice', init_audio=False)
+    segments = agent.build_headline_segments(['Storm nears coast', 'A debut novel'], ['U.S.', 'Books'],
+                                             ['U.S.', 'Books'], user_name='Sam')
+    assert segments[1:] == [
+        "Here are today's top headlines from U.S., Books:",
+        'From U.S.:', 'Storm nears coast',
+        'From Books:', 'A debut novel',
+        "That concludes today's headlines."
+    ]
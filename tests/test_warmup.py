@@ -0,0 +1,40 @@
+from cache_backend import create_backend
+from warmup import AudioWarmer
+
+
+def warmer(backend=None, publish_interval=0):
+    return AudioWarmer(lambda: None, lambda analysis, selection: [], lambda report: report,
+                       max_variants=2, default_selection=['world'], backend=backend,
+                       publish_interval=publish_interval)
+
+
+def test_selection_counts_are_shared_between_workers(tmp_path):
+    backend = create_backend(f"sqlite:///{tmp_path / 'shared_cache.sqlite'}")
+    serving, refreshing = warmer(backend), warmer(backend)
+
+    for _ in range(3):
+        serving.record_selection(['Business', 'Arts'])
+    refreshing.record_selection(['world'])
+
+    # The refreshing worker warms what the other worker's listeners asked for
+    assert refreshing.top_selections() == [['business', 'arts'], ['world']]
+
+
+def test_counts_collected_between_publishes_are_not_lost(tmp_path):
+    backend = create_backend(f"sqlite:///{tmp_path / 'shared_cache.sqlite'}")
+    serving, refreshing = warmer(backend, publish_interval=3600), warmer(backend)
+
+    serving.record_selection(['arts'])
+    assert refreshing.top_selections() == [['world']]
+    # Published when the worker next takes part in a warm-up
+    assert serving.top_selections() == [['arts']]
+    assert refreshing.top_selections() == [['arts']]
+
+
+def test_without_backend_counts_stay_in_process():
+    local = warmer()
+    assert local.top_selections() == [['world']]
+    local.record_selection(['science'])
+    local.record_selection(['science'])
+    local.record_selection(['arts'])
+    assert local.top_selections() == [['science'], ['arts']]
@@ -1,18 +1,82 @@
-from elevenlabs import generate, play, set_api_key, voices, Voice, save
-from elevenlabs.api import History
 import time
 import tempfile
 import os
-import pygame
-from typing import List, Dict, Optional
+import sys
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from collections import deque
+import io
+import queue
 import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from audio_cache import AudioCache
+from metrics import metrics, in_context
+
+# elevenlabs and pygame are imported where they are used: together they take a
+# few hundred milliseconds to import, which text-only runs and servers that
+# never play audio locally should not pay
+
+class SpeechSynthesisError(Exception):
+    """Raised when a segment of a streamed script could not be synthesized"""
+
+class VoiceRegistry:
+    """
+    Process-wide cache of the ElevenLabs voice list.
+    
+    The list is fetched once and refreshed at most every refresh_interval seconds,
+    so creating a VoiceAgent does not cost a network round trip each time.
+    """
+    
+    def __init__(self, refresh_interval: float = 3600):
+        """
+        Args:
+            refresh_interval (float): Seconds before the voice list is fetched again
+        """
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._voices = None
+        self._fetched_at = 0.0
+    
+    def get_voices(self, force_refresh: bool = False) -> list:
+        """
+        Get the available voices, fetching them if the cached list is missing or stale.
+        
+        If a refresh fails, the previous list keeps being served.
+        
+        Args:
+            force_refresh (bool): Fetch the list even if the cached one is fresh
+            
+        Returns:
+            list: ElevenLabs voice objects
+        """
+        with self._lock:
+            stale = time.monotonic() - self._fetched_at > self.refresh_interval
+            if self._voices is None or stale or force_refresh:
+                try:
+                    from elevenlabs import voices
+                    self._voices = list(voices())
+                    self._fetched_at = time.monotonic()
+                except Exception:
+                    if self._voices is None:
+                        raise
+                    print("Error refreshing voice list, keeping the cached one")
+            return self._voices
+
+# Shared by every VoiceAgent in the process unless one is passed explicitly
+voice_registry = VoiceRegistry()
 
 class VoiceAgent:
     def __init__(self, api_key: str, voice_id: Optional[str] = None, 
                  voice_name: Optional[str] = None,
                  stability: float = 0.71, 
                  clarity: float = 0.75,
-                 style: float = 0.0):
+                 style: float = 0.0,
+                 audio_cache: Optional[AudioCache] = None,
+                 init_audio: bool = True,
+                 registry: Optional[VoiceRegistry] = None,
+                 prefetch: int = 2):
         """
         Initialize the Voice Agent with ElevenLabs.
         
@@ -23,21 +87,26 @@ class VoiceAgent:
             stability (float): Voice stability (0.0-1.0)
             clarity (float): Voice clarity/similarity (0.0-1.0)
             style (float): Speaking style (0.0-1.0)
+            audio_cache (AudioCache, optional): Cache of synthesized audio checked before calling ElevenLabs
+            init_audio (bool): Play through pygame's mixer, initialized on first playback (False on a server)
+            registry (VoiceRegistry, optional): Voice list cache (default: the process-wide registry)
+            prefetch (int): Segments synthesized ahead of the one playing in read_headlines and
+                read_summary (0 = synthesize each one just before playing it)
         """
+        from elevenlabs import set_api_key
         set_api_key(api_key)
         self.stability = stability
         self.clarity = clarity
         self.style = style
         self.voice_id = voice_id
+        self.model = "eleven_multilingual_v2"
+        self.audio_cache = audio_cache
+        self.registry = registry or voice_registry
         self.user_name = "News Listener"
+        self.prefetch = max(0, prefetch)
+        self.init_audio = init_audio
         
-        # Initialize pygame for audio playback
-        pygame.mixer.init()
-        
-        # Get available voices
-        self.available_voices = voices()
-        
-        # If voice name is provided, try to find matching voice
+        # The voice list is only needed to pick a voice when no voice_id is given
         if voice_name and not voice_id:
             for voice in self.available_voices:
                 if voice_name.lower() in voice.name.lower():
@@ -50,15 +119,21 @@ class VoiceAgent:
         
         if not self.voice_id:
             raise ValueError("No voices available in your ElevenLabs account")
-            
-        # Get the voice name for display
-        self.voice_name = self._get_voice_name()
     
-    def _get_voice_name(self) -> str:
-        """Get the name of the current voice"""
-        for voice in self.available_voices:
-            if voice.voice_id == self.voice_id:
-                return voice.name
+    @property
+    def available_voices(self) -> list:
+        """ElevenLabs voice objects from the (cached) voice list"""
+        return self.registry.get_voices()
+    
+    @property
+    def voice_name(self) -> str:
+        """Name of the current voice, for display"""
+        try:
+            for voice in self.available_voices:
+                if voice.voice_id == self.voice_id:
+                    return voice.name
+        except Exception as e:
+            print(f"Error getting voices: {e}")
         return "Unknown Voice"
     
     def set_user_name(self, name: str) -> None:
@@ -73,38 +148,40 @@ class VoiceAgent:
             text (str): Text to be read aloud
         """
         try:
-            voice_settings = Voice(
-                voice_id=self.voice_id,
-                settings={
-                    "stability": self.stability,
-                    "similarity_boost": self.clarity,
-                    "style": self.style,
-                    "use_speaker_boost": True
-                }
-            )
-            
-            audio = generate(
-                text=text,
-                voice=voice_settings,
-                model="eleven_multilingual_v2"
-            )
-            
-            # Play the audio
-            play(audio)
+            audio = self.generate_audio(text)
+            if audio:
+                # Play the audio
+                self.play_audio(audio)
         except Exception as e:
             print(f"Error generating speech: {e}")
             
+    def audio_cache_key(self, text: str) -> str:
+        """Cache key for text spoken with this agent's voice and settings"""
+        return AudioCache.make_key(text, self.voice_id, self.stability, self.clarity, self.style, self.model)
+
     def generate_audio(self, text: str):
         """
         Generate audio for text using ElevenLabs TTS without playing it.
         
+        Audio for the same text, voice and settings is served from the audio
+        cache when one is configured.
+        
         Args:
             text (str): Text to convert to speech
             
         Returns:
             bytes: Audio data
         """
+        cache_key = None
+        if self.audio_cache is not None:
+            cache_key = self.audio_cache_key(text)
+            cached = self.audio_cache.get(cache_key)
+            metrics.inc('audio_cache_requests_total', result='hit' if cached is not None else 'miss')
+            if cached is not None:
+                return cached
+        
         try:
+            from elevenlabs import generate, Voice
             voice_settings = Voice(
                 voice_id=self.voice_id,
                 settings={
@@ -115,33 +192,286 @@ class VoiceAgent:
                 }
             )
             
-            audio = generate(
-                text=text,
-                voice=voice_settings,
-                model="eleven_multilingual_v2"
-            )
+            with metrics.timer('tts', mode='full'):
+                audio = generate(
+                    text=text,
+                    voice=voice_settings,
+                    model=self.model
+                )
+            metrics.inc('tts_characters_total', len(text))
+            metrics.inc('tts_audio_bytes_total', len(audio or b''))
             
+            if cache_key is not None and audio:
+                self.audio_cache.put(cache_key, audio)
             return audio
         except Exception as e:
             print(f"Error generating audio: {e}")
             return None
     
-    def get_greeting(self) -> str:
-        """Generate a personalized greeting based on time of day"""
+    def generate_audio_stream(self, text: str, chunk_size: int = 16384, check_cache: bool = True) -> Iterator[bytes]:
+        """
+        Generate audio for text as a stream of MP3 chunks.
+        
+        Cached audio is read from disk in chunks; otherwise ElevenLabs' streaming
+        endpoint is used and the chunks are written to the audio cache as they pass.
+        
+        Args:
+            text (str): Text to convert to speech
+            chunk_size (int): Read size for cached files
+            check_cache (bool): Look for cached audio first (False if the caller already did)
+            
+        Yields:
+            bytes: MP3 data
+        """
+        cache_key = None
+        if self.audio_cache is not None:
+            cache_key = self.audio_cache_key(text)
+            path = self.audio_cache.lookup(cache_key) if check_cache else None
+            if check_cache:
+                metrics.inc('audio_cache_requests_total', result='hit' if path else 'miss')
+            if path:
+                with open(path, 'rb') as audio_file:
+                    while True:
+                        chunk = audio_file.read(chunk_size)
+                        if not chunk:
+                            return
+                        yield chunk
+        
+        from elevenlabs import generate, Voice
+        voice_settings = Voice(
+            voice_id=self.voice_id,
+            settings={
+                "stability": self.stability,
+                "similarity_boost": self.clarity,
+                "style": self.style,
+                "use_speaker_boost": True
+            }
+        )
+        
+        start = time.perf_counter()
+        chunks = generate(
+            text=text,
+            voice=voice_settings,
+            model=self.model,
+            stream=True
+        )
+        metrics.inc('tts_characters_total', len(text))
+        
+        if cache_key is not None:
+            chunks = self.audio_cache.put_stream(cache_key, chunks)
+        first = True
+        for chunk in chunks:
+            if first:
+                metrics.record('tts_first_chunk', time.perf_counter() - start)
+                first = False
+            metrics.inc('tts_audio_bytes_total', len(chunk))
+            yield chunk
+        metrics.record('tts', time.perf_counter() - start, mode='stream')
+    
+    def stream_segments_audio(self, segments: Iterable[str], max_workers: int = 4) -> Iterator[bytes]:
+        """
+        Synthesize segments in parallel and yield each one's audio in playback order
+        as soon as it (and every segment before it) is ready.
+        
+        Segments may be produced lazily (e.g. by split_speech_chunks while a report
+        is still being written); each is submitted for synthesis as soon as it arrives.
+        
+        Like generate_segments_audio, the script is not played with parts missing:
+        a segment that fails stops the stream.
+        
+        Args:
+            segments (Iterable[str]): Texts to synthesize, in playback order
+            max_workers (int): Maximum number of segments synthesized at once
+            
+        Yields:
+            bytes: MP3 data of one segment
+            
+        Raises:
+            SpeechSynthesisError: If a segment could not be synthesized
+        """
+        if isinstance(segments, list):
+            max_workers = min(max_workers, len(segments))
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        futures = queue.Queue()
+        stop = threading.Event()
+        
+        generate_audio = in_context(self.generate_audio)
+        
+        def submit_segments():
+            try:
+                for segment in segments:
+                    if stop.is_set():
+                        break
+                    futures.put(executor.submit(generate_audio, segment))
+            except Exception as e:
+                futures.put(e)
+            finally:
+                futures.put(None)
+        
+        threading.Thread(target=submit_segments, daemon=True).start()
+        try:
+            while True:
+                future = futures.get()
+                if future is None:
+                    return
+                if isinstance(future, Exception):
+                    raise future
+                audio = future.result()
+                if not audio:
+                    print("Failed to generate audio for a segment, stopping the stream")
+                    metrics.inc('tts_segment_failures_total', mode='stream')
+                    raise SpeechSynthesisError("Failed to generate audio for a segment")
+                yield audio
+        finally:
+            # Stop pending synthesis if the listener disconnects early
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def is_section_header(line: str) -> bool:
+        """Whether a report line is a section header (numbered or all caps)"""
+        return line.startswith(('1.', '2.', '3.', '4.', '5.')) or line.isupper()
+    
+    # Whitespace after sentence-ending punctuation, where a paragraph may be cut
+    _SENTENCE_END = re.compile(r'[.!?]["\')\]]?(\s+)(?=\S)')
+    
+    def split_speech_chunks(self, deltas: Iterable[str], min_chars: int = 80) -> Iterator[str]:
+        """
+        Cut streamed text into chunks that can be synthesized on their own.
+        
+        Headers and paragraphs are split the same way read_summary splits them,
+        and long paragraphs are additionally cut at sentence boundaries once at
+        least min_chars have accumulated, so the first chunk is ready after
+        roughly one sentence. Lines that may turn out to be headers are held
+        until they are complete.
+        
+        Args:
+            deltas (Iterable[str]): Text as it is generated
+            min_chars (int): Shortest chunk cut in the middle of a paragraph
+            
+        Yields:
+            str: Chunks in reading order
+        """
+        buffer = ""
+        for delta in deltas:
+            buffer += delta
+            # Complete lines: headers and paragraph ends are always boundaries
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                line = line.strip()
+                if line:
+                    yield line
+            # Partial line: cut off complete sentences unless it could be a header
+            while len(buffer.strip()) >= min_chars and not self.is_section_header(buffer.lstrip()):
+                line = buffer.lstrip()
+                cut = next((match for match in self._SENTENCE_END.finditer(line) if match.start(1) >= min_chars), None)
+                if cut is None:
+                    break
+                yield line[:cut.start(1)].strip()
+                buffer = line[cut.end(1):]
+        line = buffer.strip()
+        if line:
+            yield line
+    
+    def stream_report_audio(self, deltas: Iterable[str], max_workers: int = 4) -> Iterator[bytes]:
+        """
+        Synthesize a report while it is still being written.
+        
+        Args:
+            deltas (Iterable[str]): Report text as it is generated
+            max_workers (int): Maximum number of chunks synthesized at once
+            
+        Yields:
+            bytes: MP3 data of each chunk, in reading order
+        """
+        return self.stream_segments_audio(self.split_speech_chunks(deltas), max_workers)
+    
+    def get_greeting(self, user_name: Optional[str] = None) -> str:
+        """
+        Generate a personalized greeting based on time of day.
+        
+        Args:
+            user_name (str, optional): Name to greet (default: the agent's user name).
+                Passing it explicitly lets one agent be shared between listeners.
+        """
         import datetime
         
+        user_name = user_name or self.user_name
+        
         current_hour = datetime.datetime.now().hour
         greeting = "Good morning" if 5 <= current_hour < 12 else "Good afternoon" if 12 <= current_hour < 18 else "Good evening"
         
         greetings = [
-            f"{greeting}, {self.user_name}! Here's your news briefing.",
-            f"Welcome to your personalized news briefing, {self.user_name}!",
-            f"{greeting}! I've gathered the latest headlines just for you, {self.user_name}.",
-            f"Hello {self.user_name}! It's {greeting.lower()} and I have your news briefing ready."
+            f"{greeting}, {user_name}! Here's your news briefing.",
+            f"Welcome to your personalized news briefing, {user_name}!",
+            f"{greeting}! I've gathered the latest headlines just for you, {user_name}.",
+            f"Hello {user_name}! It's {greeting.lower()} and I have your news briefing ready."
         ]
         
         return random.choice(greetings)
     
+    def build_headline_segments(self, headlines: List[str], sections: List[str],
+                                selected_sections: List[str],
+                                user_name: Optional[str] = None) -> List[str]:
+        """
+        Split the headlines script into independently synthesizable segments.
+        
+        Only the greeting is personalized; the intro depends on the section
+        selection and every other segment is shared by all listeners, so it can
+        be served from the audio cache once synthesized.
+        
+        Args:
+            headlines (List[str]): Headlines to read
+            sections (List[str]): Spoken section name for each headline
+            selected_sections (List[str]): Spoken names of the sections the listener selected, for the intro
+            user_name (str, optional): Listener to greet (default: the agent's user name)
+            
+        Returns:
+            List[str]: Greeting, intro, a "From <section>:" segment per section,
+                one segment per headline and the closing line
+        """
+        section_names = ", ".join(selected_sections)
+        segments = [
+            self.get_greeting(user_name),
+            f"Here are today's top headlines from {section_names}:"
+        ]
+        
+        # Group headlines by section
+        section_grouped = {}
+        for headline, section in zip(headlines, sections):
+            section_grouped.setdefault(section, []).append(headline)
+        
+        for section, section_headlines in section_grouped.items():
+            segments.append(f"From {section}:")
+            segments.extend(section_headlines)
+        
+        segments.append("That concludes today's headlines.")
+        return segments
+    
+    def generate_segments_audio(self, segments: List[str], max_workers: int = 4) -> Optional[bytes]:
+        """
+        Synthesize segments in parallel (or fetch them from the audio cache) and
+        join them into a single MP3 stream.
+        
+        Args:
+            segments (List[str]): Texts to synthesize, in playback order
+            max_workers (int): Maximum number of segments synthesized at once
+            
+        Returns:
+            bytes: Concatenated MP3 data, or None if any segment failed
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(segments)))) as executor:
+            audio_segments = list(executor.map(in_context(self.generate_audio), segments))
+        
+        failed = sum(1 for audio in audio_segments if not audio)
+        if failed:
+            print(f"Failed to generate audio for {failed} of {len(segments)} segments")
+            metrics.inc('tts_segment_failures_total', failed, mode='full')
+            return None
+        
+        # MP3 is a sequence of self-contained frames, so segments can simply be appended
+        return b"".join(audio_segments)
+    
     def read_headlines(self, headlines: List[str], sections: Optional[List[str]] = None) -> None:
         """
         Read a list of headlines with a brief pause between each, grouped by section if provided.
@@ -151,15 +481,12 @@ class VoiceAgent:
             sections (List[str], optional): List of section names corresponding to headlines
         """
         try:
-            # Read personalized introduction
-            intro = self.get_greeting()
-            self.read_text(intro)
-            time.sleep(0.4)  # Reduced pause
-            
-            self.read_text("Here are today's top headlines:")
-            time.sleep(0.4)  # Reduced pause
+            # Personalized introduction
+            script = [
+                (self.get_greeting(), 0.4),
+                ("Here are today's top headlines:", 0.4)
+            ]
             
-            # Read each headline with a shorter pause between
             if sections and len(sections) == len(headlines):
                 # Group by sections
                 section_grouped = {}
@@ -169,28 +496,28 @@ class VoiceAgent:
                         section_grouped[section] = []
                     section_grouped[section].append(headline)
                 
-                # Read headlines by section
+                # Headlines by section
                 for section, section_headlines in section_grouped.items():
-                    self.read_text(f"From {section}:")
-                    time.sleep(0.3)  # Reduced pause after section announcement
+                    script.append((f"From {section}:", 0.3))
                     
                     for i, headline in enumerate(section_headlines):
                         transition_phrases = ["", "Next up: ", "Also in the news: ", "Another headline: "]
                         prefix = random.choice(transition_phrases) if i > 0 else ""
-                        self.read_text(f"{prefix}{headline}")
-                        time.sleep(0.3)  # Reduced pause between headlines
+                        script.append((f"{prefix}{headline}", 0.3))
                     
-                    time.sleep(0.5)  # Reduced pause between sections
+                    # Longer pause between sections
+                    text, pause = script[-1]
+                    script[-1] = (text, pause + 0.5)
             else:
-                # Read headlines without section grouping
+                # Headlines without section grouping
                 for i, headline in enumerate(headlines):
                     transition_phrases = ["", "Next: ", "Also: ", "Moving on: "]
                     prefix = random.choice(transition_phrases) if i > 0 else ""
-                    self.read_text(f"{prefix}{headline}")
-                    time.sleep(0.3)  # Reduced pause between headlines
+                    script.append((f"{prefix}{headline}", 0.3))
             
             # Closing statement
-            self.read_text("That concludes today's headlines.")
+            script.append(("That concludes today's headlines.", 0))
+            self.read_script(script)
             
         except Exception as e:
             print(f"Error reading headlines: {e}")
@@ -203,9 +530,8 @@ class VoiceAgent:
             summary (str): The full summary text to read
         """
         try:
-            # Read introduction
-            self.read_text("Here's your in-depth news analysis and summary:")
-            time.sleep(0.5)  # Reduced pause
+            # Introduction
+            script = [("Here's your in-depth news analysis and summary:", 0.5)]
             
             # Split into paragraphs and organize by section headers
             sections = []
@@ -217,7 +543,7 @@ class VoiceAgent:
                     continue
                     
                 # Check if this is a section header (numbered or all caps)
-                if line.startswith(('1.', '2.', '3.', '4.', '5.')) or line.isupper():
+                if self.is_section_header(line):
                     # Save previous section if it has content
                     if current_section["content"]:
                         sections.append(current_section)
@@ -231,18 +557,15 @@ class VoiceAgent:
             if current_section["content"]:
                 sections.append(current_section)
             
-            # Read each section with faster pacing
             for section in sections:
-                # Announce section with slight emphasis
-                self.read_text(section["title"])
-                time.sleep(0.4)  # Reduced pause after section title
-                
-                # Read content
+                # Announce section, then its paragraphs
+                script.append((section["title"], 0.4))
                 for paragraph in section["content"]:
-                    self.read_text(paragraph)
-                    time.sleep(0.3)  # Reduced pause between paragraphs
+                    script.append((paragraph, 0.3))
                 
-                time.sleep(0.5)  # Reduced pause between sections
+                # Longer pause between sections
+                text, pause = script[-1]
+                script[-1] = (text, pause + 0.5)
             
             # Conclusion
             conclusions = [
@@ -251,11 +574,76 @@ class VoiceAgent:
                 "That's the end of your personalized news summary. Have a great day!",
                 "This concludes today's news analysis. Until next time!"
             ]
-            self.read_text(random.choice(conclusions))
+            script.append((random.choice(conclusions), 0))
+            self.read_script(script)
             
         except Exception as e:
             print(f"Error reading summary: {e}")
     
+    def read_script(self, script: List[Tuple[str, float]]) -> None:
+        """
+        Read texts aloud in order, pausing after each.
+        
+        With a prefetch depth above zero, the next segments are synthesized in
+        worker threads while the current one plays, so the only gaps are the
+        pauses themselves. Ctrl-C stops playback and cancels pending synthesis.
+        
+        Args:
+            script (List[Tuple[str, float]]): (text, seconds of pause after it) pairs
+        """
+        if self.prefetch <= 0:
+            for text, pause in script:
+                self.read_text(text)
+                time.sleep(pause)
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=self.prefetch)
+        upcoming = iter(script)
+        pending = deque()
+        
+        def prefetch_next():
+            for text, pause in upcoming:
+                pending.append((executor.submit(self.generate_audio, text), pause))
+                return
+        
+        try:
+            # The segment about to play plus up to `prefetch` segments ahead of it
+            for _ in range(self.prefetch + 1):
+                prefetch_next()
+            while pending:
+                future, pause = pending.popleft()
+                prefetch_next()
+                audio = future.result()
+                if audio:
+                    self.play_audio(audio)
+                time.sleep(pause)
+        except KeyboardInterrupt:
+            print("\nPlayback cancelled")
+            self.stop_audio()
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def play_audio(self, audio: bytes) -> None:
+        """Play MP3 data and wait until it finishes, through pygame unless init_audio is off"""
+        if not self.init_audio:
+            from elevenlabs import play
+            play(audio)
+            return
+        import pygame
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            time.sleep(0.05)
+    
+    def stop_audio(self) -> None:
+        """Stop pygame playback, if any"""
+        pygame = sys.modules.get('pygame')
+        if pygame is not None and pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+    
     def get_available_voices(self) -> List[Dict]:
         """
         Get a list of available voices from ElevenLabs.
@@ -264,7 +652,7 @@ class VoiceAgent:
             List[Dict]: List of available voices with their details
         """
         try:
-            available_voices = voices()
+            available_voices = self.registry.get_voices()
             return [{"name": voice.name, "id": voice.voice_id} for voice in available_voices]
         except Exception as e:
             print(f"Error getting voices: {e}")
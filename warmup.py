@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from cache_backend import CacheBackend, versioned_key
+
+SELECTIONS_KEY = versioned_key('warmup', 'selections')
+
+class AudioWarmer:
+    """
+    Pre-synthesizes audio listeners are likely to ask for next.
+
+    After each news refresh the headline segments of the most requested section
+    selections, plus the full report, are synthesized into the audio cache so the
+    first click on "Listen" is served from cache. Only the personalized greeting
+    is left to synthesize on demand.
+
+    Popularity is counted from headline requests. With a shared backend the
+    counts of every worker are merged there, so whichever worker refreshes
+    warms the selections popular across all of them. Every audio request is
+    also checked against the cache so the stats show how often warm-up
+    actually paid off.
+    """
+
+    def __init__(self, get_voice_agent: Callable, headline_segments: Callable[[Dict, List[str]], List[str]],
+                 report_text: Callable[[str], str], max_variants: int = 3, warm_report: bool = True,
+                 max_workers: int = 4, default_selection: Optional[List[str]] = None,
+                 backend: Optional[CacheBackend] = None, ttl: float = 86400, publish_interval: float = 60):
+        """
+        Args:
+            get_voice_agent (Callable): Returns the VoiceAgent used for synthesis
+            headline_segments (Callable): (analysis, selected_sections) -> shared headline segments
+            report_text (Callable): report -> script read for the full report
+            max_variants (int): Number of section selections pre-rendered per refresh (0 disables them)
+            warm_report (bool): Also pre-render the full report audio
+            max_workers (int): Segments synthesized at once
+            default_selection (List[str], optional): Selection warmed before any requests were seen
+            backend (CacheBackend, optional): Store shared with other workers for the popularity counts
+            ttl (float): Seconds the shared counts are kept after their last update
+            publish_interval (float): Seconds a worker collects counts before adding them to the shared ones
+        """
+        self.get_voice_agent = get_voice_agent
+        self.headline_segments = headline_segments
+        self.report_text = report_text
+        self.max_variants = max_variants
+        self.warm_report = warm_report
+        self.max_workers = max_workers
+        self.default_selection = default_selection
+        self.backend = backend
+        self.ttl = ttl
+        self.publish_interval = publish_interval
+        self._selections = Counter()
+        self._unpublished = Counter()
+        self._published = time.time()
+        self._lock = threading.Lock()
+        self._pending = None
+        self._running = False
+        self._stats = {
+            "runs": 0, "variants": 0, "segments_synthesized": 0, "segments_cached": 0,
+            "failures": 0, "requests_warm": 0, "requests_cold": 0
+        }
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    @staticmethod
+    def _selection_key(selected_sections: List[str]) -> tuple:
+        # Order is kept: the spoken intro lists the sections in the order selected
+        return tuple(s.lower() for s in selected_sections)
+
+    def record_selection(self, selected_sections: List[str]) -> None:
+        """Count a listener's section selection towards popularity"""
+        key = self._selection_key(selected_sections)
+        with self._lock:
+            self._selections[key] += 1
+            self._unpublished[key] += 1
+            # Shared counts are updated every publish_interval, not on every request
+            due = self.backend is not None and time.time() - self._published >= self.publish_interval
+        if due:
+            self._publish()
+
+    def _publish(self) -> Optional[Counter]:
+        """
+        Add this worker's new counts to the shared ones.
+
+        Returns:
+            Counter: The shared counts, or None if the backend could not be used
+        """
+        with self._lock:
+            unpublished, self._unpublished = self._unpublished, Counter()
+            self._published = time.time()
+        try:
+            with self.backend.lock('warmup-selections', ttl=10, wait=10):
+                data = self.backend.get(SELECTIONS_KEY)
+                counts = Counter({tuple(json.loads(key)): count for key, count in json.loads(data).items()}) \
+                    if data is not None else Counter()
+                if unpublished:
+                    counts.update(unpublished)
+                    encoded = {json.dumps(list(key)): count for key, count in counts.items()}
+                    self.backend.set(SELECTIONS_KEY, json.dumps(encoded).encode('utf-8'), ttl=self.ttl)
+            return counts
+        except Exception as e:
+            print(f"Error sharing audio warm-up selections: {e}")
+            # Keep the counts for the next attempt
+            with self._lock:
+                self._unpublished.update(unpublished)
+            return None
+
+    def top_selections(self) -> List[List[str]]:
+        """The max_variants most requested selections, most popular first"""
+        if self.max_variants <= 0:
+            return []
+        counts = self._publish() if self.backend is not None else None
+        if counts is None:
+            with self._lock:
+                counts = Counter(self._selections)
+        selections = [list(key) for key, _ in counts.most_common(self.max_variants)]
+        if not selections and self.default_selection:
+            selections = [list(self._selection_key(self.default_selection))]
+        return selections
+
+    def record_request(self, texts: List[str]) -> bool:
+        """
+        Record whether the shared audio for a request was already cached.
+
+        Args:
+            texts (List[str]): Texts the request needs, excluding personalized ones
+
+        Returns:
+            bool: Whether every text was cached
+        """
+        voice_agent = self.get_voice_agent()
+        cache = voice_agent.audio_cache
+        warm = cache is not None and all(cache.contains(voice_agent.audio_cache_key(text)) for text in texts)
+        self._count("requests_warm" if warm else "requests_cold")
+        return warm
+
+    def schedule(self, snapshot: Dict) -> None:
+        """
+        Warm up for a new snapshot in a background thread.
+
+        If a warm-up is already running, only the newest snapshot is warmed after it.
+        """
+        with self._lock:
+            self._pending = snapshot
+            if self._running:
+                return
+            self._running = True
+        threading.Thread(target=self._drain, name='audio-warmup', daemon=True).start()
+
+    def _drain(self) -> None:
+        while True:
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+                if snapshot is None:
+                    self._running = False
+                    return
+            try:
+                self.warm(snapshot)
+            except Exception as e:
+                print(f"Error warming audio: {e}")
+                self._count("failures")
+
+    def warm(self, snapshot: Dict) -> None:
+        """
+        Synthesize every not-yet-cached text for the popular selections and the report.
+
+        Args:
+            snapshot (Dict): News snapshot with 'analysis' and 'report'
+        """
+        voice_agent = self.get_voice_agent()
+        if voice_agent.audio_cache is None:
+            return
+
+        texts = []
+        selections = self.top_selections() if snapshot.get('analysis') else []
+        for selection in selections:
+            texts.extend(self.headline_segments(snapshot['analysis'], selection))
+        if self.warm_report and snapshot.get('report'):
+            texts.append(self.report_text(snapshot['report']))
+
+        # Variants share section and closing segments; synthesize each text once
+        texts = list(dict.fromkeys(texts))
+        missing = []
+        for text in texts:
+            if voice_agent.audio_cache.contains(voice_agent.audio_cache_key(text)):
+                self._count("segments_cached")
+            else:
+                missing.append(text)
+
+        print(f"Warming audio for {len(selections)} selections: {len(missing)} of {len(texts)} segments to synthesize")
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(missing)))) as executor:
+                results = list(executor.map(voice_agent.generate_audio, missing))
+            self._count("segments_synthesized", sum(1 for audio in results if audio))
+            self._count("failures", sum(1 for audio in results if not audio))
+        self._count("variants", len(selections))
+        self._count("runs")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get this process's warm-up statistics.
+
+        Returns:
+            Dict[str, float]: Warm-up counters plus warm_hit_rate, the share of
+                audio requests whose shared audio was already cached
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        requests = stats["requests_warm"] + stats["requests_cold"]
+        stats["warm_hit_rate"] = stats["requests_warm"] / requests if requests else 0.0
+        return stats